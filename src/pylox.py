@@ -1,14 +1,42 @@
 import argparse
 import sys
 from pathlib import Path
+from typing import Iterable, Optional
 
 from utils.ast_printer import AstPrinter
+from utils.closure_compiler import ClosureInterpreter
 from utils.interpreter import Interpreter
+from utils.line_profiler import LineProfiler
+from utils.memo import DEFAULT_MAX_ENTRIES, Memo
+from utils.optimizer import Optimizer
 from utils.parser import Parser
+from utils.profiler import Profiler
+from utils.regex_scanner import DEFAULT_CHUNK_SIZE, RegexScanner, read_chunks
 from utils.resolver import Resolver
 from utils.runtime_error import PyLoxRuntimeError
+from utils.sampler import DEFAULT_INTERVAL, SamplingProfiler
 from utils.scanner import Scanner
+from utils.specializer import Specializer
+from utils.stack_interpreter import DEFAULT_MAX_DEPTH, StackInterpreter
+from utils.token import Token
 from utils.token_type import TokenType
+from utils.transpiler import PythonInterpreter
+from utils.vm import VM
+
+# Execution engines selectable with --engine
+ENGINES = {
+    "tree": Interpreter,
+    "closure": ClosureInterpreter,
+    "vm": VM,
+    "python": PythonInterpreter,
+    "stack": StackInterpreter,
+}
+
+# Scanners selectable with --scanner, which produce the same tokens
+SCANNERS = {
+    "regex": RegexScanner,
+    "char": Scanner,
+}
 
 
 def parse_args() -> argparse.Namespace:
@@ -23,18 +51,137 @@ def parse_args() -> argparse.Namespace:
 
     parser.add_argument("-s", "--script", default=None, type=str, help="'.lox' script to interpret")
     parser.add_argument("--ast", action="store_true", help="Run with abstract syntax tree printer")
+    parser.add_argument(
+        "--engine",
+        default="tree",
+        choices=list(ENGINES),
+        help="Execution engine: 'tree' walks the AST, 'closure' compiles it into Python closures first, "
+        "'vm' compiles it to bytecode for a stack-based virtual machine, 'python' transpiles it to Python source, "
+        "'stack' walks it keeping Lox calls off the Python stack",
+    )
+    parser.add_argument(
+        "--scanner",
+        default="regex",
+        choices=list(SCANNERS),
+        help="Scanner: 'regex' matches lexemes with a compiled pattern, 'char' reads a character at a time",
+    )
+    parser.add_argument(
+        "--stream",
+        nargs="?",
+        const=DEFAULT_CHUNK_SIZE,
+        default=None,
+        type=int,
+        metavar="CHUNK_SIZE",
+        help=f"Read the script CHUNK_SIZE characters at a time (default {DEFAULT_CHUNK_SIZE}), scanning and parsing it "
+        "as it is read instead of holding all of its source and tokens (regex scanner only)",
+    )
+    parser.add_argument("--disassemble", action="store_true", help="Print the bytecode instead of running it")
+    parser.add_argument(
+        "--cache-stats",
+        action="store_true",
+        help="Print hit and miss counts of the property inline caches to stderr when done (tree engine only)",
+    )
 
-    return parser.parse_args()
+    parser.add_argument(
+        "--max-depth",
+        default=None,
+        type=int,
+        help=f"Lox call depth past which to report a stack overflow (stack engine only, default {DEFAULT_MAX_DEPTH})",
+    )
+    parser.add_argument(
+        "--profile",
+        nargs="?",
+        const="pylox.folded",
+        default=None,
+        metavar="FOLDED_PATH",
+        help="Profile calls to functions, methods, classes and natives: print a table of call counts and times to "
+        "stderr when done and write collapsed stacks for flame graphs to FOLDED_PATH (default pylox.folded, tree "
+        "engine only)",
+    )
+    parser.add_argument(
+        "--sample",
+        nargs="?",
+        const="pylox-samples.folded",
+        default=None,
+        metavar="FOLDED_PATH",
+        help="Sample the Lox call stack on a CPU timer: print the functions and lines most samples were taken in to "
+        "stderr when done and write collapsed stacks for flame graphs to FOLDED_PATH (default pylox-samples.folded, "
+        "tree engine on Unix only)",
+    )
+    parser.add_argument(
+        "--sample-interval",
+        default=DEFAULT_INTERVAL * 1000,
+        type=float,
+        help="Milliseconds of CPU time between --sample samples",
+    )
+    parser.add_argument(
+        "--line-profile",
+        action="store_true",
+        help="Count and time the statements run on every source line, and print the script annotated with them to "
+        "stderr when done (tree engine only)",
+    )
+    parser.add_argument(
+        "--memoize",
+        action="store_true",
+        help="Cache the results of calls to pure functions with primitive arguments, and print the cache's hit rate "
+        "and memory to stderr when done (tree engine only)",
+    )
+    parser.add_argument(
+        "--memo-size",
+        default=DEFAULT_MAX_ENTRIES,
+        type=int,
+        help="Number of results --memoize keeps before evicting the least recently used",
+    )
+    parser.add_argument(
+        "--py-cache",
+        default=None,
+        type=str,
+        help="Directory to write transpiled modules to and reuse them from on later runs (python engine only)",
+    )
+
+    args = parser.parse_args()
+    if args.cache_stats and args.engine != "tree":
+        parser.error("--cache-stats is only supported by the tree engine")
+    if args.max_depth is not None and args.engine != "stack":
+        parser.error("--max-depth is only supported by the stack engine")
+    if args.profile is not None and args.engine != "tree":
+        parser.error("--profile is only supported by the tree engine")
+    if args.sample is not None and args.engine != "tree":
+        parser.error("--sample is only supported by the tree engine")
+    if args.sample is not None and not SamplingProfiler.is_supported():
+        parser.error("--sample needs timer signals, which this platform doesn't have")
+    if args.line_profile and args.engine != "tree":
+        parser.error("--line-profile is only supported by the tree engine")
+    if args.memoize and args.engine != "tree":
+        parser.error("--memoize is only supported by the tree engine")
+    if args.py_cache is not None and args.engine != "python":
+        parser.error("--py-cache is only supported by the python engine")
+    if args.stream is not None and args.scanner != "regex":
+        parser.error("--stream is only supported by the regex scanner")
+    if args.stream is not None and args.stream < 1:
+        parser.error("--stream needs a CHUNK_SIZE of at least 1")
+    if args.stream is not None and args.py_cache is not None:
+        parser.error("--py-cache needs the whole script to look it up, so it can't be used with --stream")
+    return args
 
 
 class PyLox:
     _had_error = False
     _had_runtime_error = False
-    _interpreter = Interpreter()
+    _interpreters = {}  # engine: interpreter, kept so that REPL state persists between lines
+    _scanner = "regex"  # Scanner selected with --scanner
+    _chunk_size = None  # Characters of the script read at a time with --stream
     _ast_printer = AstPrinter()
+    _profiler = None  # Profiler started by --profile
+    _profile_path = None  # Where to write the profile's collapsed stacks
+    _sampler = None  # SamplingProfiler started by --sample
+    _sample_path = None  # Where to write the samples' collapsed stacks
+    _line_profiler = None  # LineProfiler started by --line-profile
 
     @staticmethod
-    def run_prompt(use_ast_printer: bool) -> None:
+    def run_prompt(
+        use_ast_printer: bool, engine: str = "tree", disassemble: bool = False, cache_stats: bool = False
+    ) -> None:
         """
         Run in REPL mode
         """
@@ -43,38 +190,82 @@ class PyLox:
                 line = input("> ")
                 if line == "quit":
                     break
-                PyLox.run(line, use_ast_printer)
+                PyLox.run(line, use_ast_printer, engine, disassemble)
                 PyLox._had_error = False
             except EOFError:
                 break
 
+        if cache_stats:
+            PyLox._print_cache_stats(engine)
+        PyLox._print_memo_stats(engine)
+        PyLox._print_profile()
+        PyLox._print_samples()
+        PyLox._print_line_profile()
+
     @staticmethod
-    def run_file(path: Path, use_ast_printer: bool) -> None:
+    def run_file(
+        path: Path, use_ast_printer: bool, engine: str = "tree", disassemble: bool = False, cache_stats: bool = False
+    ) -> None:
         """
         Run code from file
         """
         with open(path, "r") as f:
-            PyLox.run(f.read(), use_ast_printer)
+            if PyLox._chunk_size is not None:
+                source = None
+                PyLox.run_stream(read_chunks(f, PyLox._chunk_size), use_ast_printer, engine, disassemble)
+            else:
+                source = f.read()
+                PyLox.run(source, use_ast_printer, engine, disassemble)
+            if cache_stats:
+                PyLox._print_cache_stats(engine)
+            PyLox._print_memo_stats(engine)
+            PyLox._print_profile()
+            PyLox._print_samples()
+            PyLox._print_line_profile(source)
             if PyLox._had_error:
                 sys.exit(65)
             if PyLox._had_runtime_error:
                 sys.exit(70)
 
     @staticmethod
-    def run(source: str, use_ast_printer: bool) -> None:
+    def run(source: str, use_ast_printer: bool, engine: str = "tree", disassemble: bool = False) -> None:
         """
         Run interpreter on a source line
         """
-        scanner = Scanner(PyLox, source)
-        tokens = scanner.scan_tokens()
+        if engine == "python" and not (use_ast_printer or disassemble):
+            if PyLox._get_interpreter(engine).run_cached(PyLox, source):
+                return
+
+        scanner = SCANNERS[PyLox._scanner](PyLox, source)
+        if isinstance(scanner, RegexScanner):
+            # Only the tokens the parser keeps in the tree get an object
+            PyLox._run_tokens(scanner.scan_store(), use_ast_printer, engine, disassemble)
+        else:
+            PyLox._run_tokens(scanner.scan_tokens(), use_ast_printer, engine, disassemble)
+
+    @staticmethod
+    def run_stream(
+        chunks: Iterable[str], use_ast_printer: bool, engine: str = "tree", disassemble: bool = False
+    ) -> None:
+        """
+        Run interpreter on source read in chunks, parsing the tokens as they are scanned
+        """
+        scanner = RegexScanner(PyLox)
+        PyLox._run_tokens(scanner.scan_chunks(chunks), use_ast_printer, engine, disassemble)
+
+    @staticmethod
+    def _run_tokens(
+        tokens: Iterable[Token], use_ast_printer: bool, engine: str = "tree", disassemble: bool = False
+    ) -> None:
+        """
+        Parse, resolve and run tokens
+        """
         parser = Parser(PyLox, tokens)
         statements = parser.parse()
         if PyLox._had_error:
             return
 
-        interpreter = PyLox._interpreter
-
-        resolver = Resolver(PyLox, interpreter)
+        resolver = Resolver(PyLox)
         resolver.resolve(statements)
         if PyLox._had_error:
             return
@@ -82,8 +273,114 @@ class PyLox:
         if use_ast_printer:
             for statement in statements:
                 print(PyLox._ast_printer.print(statement))
+            return
+
+        statements = Optimizer().optimize(statements)
+        Specializer().specialize(statements)
+
+        if disassemble:
+            print(VM().disassemble(statements))
+        else:
+            PyLox._get_interpreter(engine).interpret(PyLox, statements)
+
+    @staticmethod
+    def _get_interpreter(engine: str):
+        """
+        Get the interpreter for an execution engine, creating it on first use
+        """
+        if engine not in PyLox._interpreters:
+            PyLox._interpreters[engine] = ENGINES[engine]()
+        return PyLox._interpreters[engine]
+
+    @staticmethod
+    def _print_cache_stats(engine: str) -> None:
+        """
+        Print inline cache counters of an engine's interpreter, if it ran
+        """
+        if engine in PyLox._interpreters:
+            print(PyLox._interpreters[engine].inline_cache_stats(), file=sys.stderr)
+
+    @staticmethod
+    def _print_memo_stats(engine: str) -> None:
+        """
+        Print the hit rate and memory of an engine's interpreter memo, if it memoizes calls
+        """
+        interpreter = PyLox._interpreters.get(engine)
+        if interpreter is not None and getattr(interpreter, "memo", None) is not None:
+            print(interpreter.memo, file=sys.stderr)
+
+    @staticmethod
+    def start_profile(path: str) -> None:
+        """
+        Profile calls until the program is done, then write collapsed stacks to path
+        """
+        PyLox._profiler = Profiler()
+        PyLox._profile_path = path
+        PyLox._profiler.start()
+
+    @staticmethod
+    def _print_profile() -> None:
+        """
+        Stop the profiler, if started, print its table to stderr and write its collapsed stacks
+        """
+        if PyLox._profiler is None:
+            return
+
+        PyLox._profiler.stop()
+        print(PyLox._profiler.report(), file=sys.stderr)
+        with open(PyLox._profile_path, "w") as f:
+            f.write(PyLox._profiler.folded())
+        print(f"Collapsed stacks written to {PyLox._profile_path}", file=sys.stderr)
+        PyLox._profiler = None
+
+    @staticmethod
+    def start_sampling(engine: str, path: str, interval: float) -> None:
+        """
+        Sample the Lox call stack of an engine's interpreter every interval seconds until the program is done, then
+        write collapsed stacks to path
+        """
+        PyLox._sampler = SamplingProfiler(PyLox._get_interpreter(engine), interval)
+        PyLox._sample_path = path
+        PyLox._sampler.start()
+
+    @staticmethod
+    def _print_samples() -> None:
+        """
+        Stop the sampling profiler, if started, print its tables to stderr and write its collapsed stacks
+        """
+        if PyLox._sampler is None:
+            return
+
+        PyLox._sampler.stop()
+        print(PyLox._sampler.report(), file=sys.stderr)
+        with open(PyLox._sample_path, "w") as f:
+            f.write(PyLox._sampler.folded())
+        print(f"Collapsed stacks written to {PyLox._sample_path}", file=sys.stderr)
+        PyLox._sampler = None
+
+    @staticmethod
+    def start_line_profile() -> None:
+        """
+        Count and time the statements run on every line until the program is done
+        """
+        PyLox._line_profiler = LineProfiler()
+        PyLox._line_profiler.start()
+
+    @staticmethod
+    def _print_line_profile(source: Optional[str] = None) -> None:
+        """
+        Stop the line profiler, if started, and print source annotated with its counters to stderr, or its hottest
+        lines without a source
+        """
+        if PyLox._line_profiler is None:
+            return
+
+        PyLox._line_profiler.stop()
+        if source is not None:
+            print(PyLox._line_profiler.listing(source), file=sys.stderr)
         else:
-            interpreter.interpret(PyLox, statements)
+            print(PyLox._line_profiler.report(), file=sys.stderr)
+        PyLox._line_profiler = None
 
     @staticmethod
     def error_line(line: int, message: str) -> None:
@@ -120,8 +417,22 @@ class PyLox:
 
 if __name__ == "__main__":
     args = parse_args()
+    PyLox._scanner = args.scanner
+    PyLox._chunk_size = args.stream
+    if args.py_cache is not None:
+        PyLox._get_interpreter(args.engine).cache_dir = Path(args.py_cache)
+    if args.max_depth is not None:
+        PyLox._get_interpreter(args.engine).max_depth = args.max_depth
+    if args.memoize:
+        PyLox._get_interpreter(args.engine).memo = Memo(args.memo_size)
+    if args.profile is not None:
+        PyLox.start_profile(args.profile)
+    if args.line_profile:
+        PyLox.start_line_profile()
+    if args.sample is not None:
+        PyLox.start_sampling(args.engine, args.sample, args.sample_interval / 1000)
 
     if args.script is not None:
-        PyLox.run_file(Path(args.script), args.ast)
+        PyLox.run_file(Path(args.script), args.ast, args.engine, args.disassemble, args.cache_stats)
     else:
-        PyLox.run_prompt(args.ast)
+        PyLox.run_prompt(args.ast, args.engine, args.disassemble, args.cache_stats)
@@ -0,0 +1,129 @@
+"""
+Lox programs and helpers shared by the tests comparing execution engines
+"""
+
+import io
+import unittest.mock
+
+from pylox import PyLox
+from utils.optimizer import Optimizer
+from utils.parser import Parser
+from utils.resolver import Resolver
+from utils.scanner import Scanner
+from utils.specializer import Specializer
+
+PROGRAMS = [
+    """
+    fun fib(n) {
+      if (n < 2) return n;
+      return fib(n - 1) + fib(n - 2);
+    }
+    print fib(15);
+    """,
+    """
+    fun makeCounter() {
+      var i = 0;
+      fun count() {
+        i = i + 1;
+        return i;
+      }
+      return count;
+    }
+    var counter = makeCounter();
+    counter();
+    print counter();
+    var s = "";
+    for (var k = 0; k < 3; k = k + 1) s = s + "ab";
+    print s;
+    print nil or "x"; print false and 1; print !nil; print 1 == true; print 3 / 2;
+    """,
+    """
+    class A {
+      init(n) { this.n = n; }
+      name() { return "a"; }
+      describe() { return this.name() + this.n; }
+    }
+    class B < A {
+      init(n) { super.init(n + "!"); }
+      name() { return "b" + super.name(); }
+    }
+    var b = B("x");
+    print b.describe();
+    print b.init("y");
+    print B;
+    var method = b.name;
+    print method();
+    """,
+    """
+    var fns = nil;
+    fun chain(prev, v) {
+      fun get() {
+        if (prev == nil) return v;
+        return prev() + v;
+      }
+      return get;
+    }
+    for (var i = 0; i < 4; i = i + 1) {
+      var j = i * 2;
+      fns = chain(fns, j);
+    }
+    print fns();
+    fun outer() {
+      var x = "before";
+      fun middle() {
+        fun inner() { return x; }
+        x = "after";
+        return inner;
+      }
+      return middle();
+    }
+    print outer()();
+    """,
+    """
+    fun find(limit) {
+      var i = 0;
+      while (true) {
+        {
+          var j = i * i;
+          if (j > limit) return i;
+        }
+        i = i + 1;
+      }
+    }
+    fun firstEven(n) {
+      for (var k = 1; k < n; k = k + 1) if (k / 2 == 2) { return k; }
+      return nil;
+    }
+    fun noReturn() { var unused = 1; }
+    var i = "global";
+    print find(50);
+    print firstEven(10);
+    print firstEven(2);
+    print noReturn();
+    print i;
+    """,
+    """
+    print "before";
+    print 1 - "a";
+    print "after";
+    """,
+    """
+    fun f() { return undefined; }
+    f();
+    """,
+]
+
+
+def run(interpreter, source: str, specialize: bool = True, optimize: bool = True) -> str:
+    """
+    Run source through the front end and the given interpreter, returning what was printed
+    """
+    with unittest.mock.patch("sys.stdout", new_callable=io.StringIO) as mock_stdout:
+        statements = Parser(PyLox, Scanner(PyLox, source).scan_tokens()).parse()
+        Resolver(PyLox).resolve(statements)
+        if optimize:
+            statements = Optimizer().optimize(statements)
+        if specialize:
+            Specializer().specialize(statements)
+        interpreter.interpret(PyLox, statements)
+        return mock_stdout.getvalue()
@@ -0,0 +1,22 @@
+import unittest
+
+from pylox import PyLox
+from tests.programs import PROGRAMS, run
+from utils.closure_compiler import ClosureInterpreter
+from utils.interpreter import Interpreter
+
+
+class TestClosureCompiler(unittest.TestCase):
+    def tearDown(self):
+        PyLox._had_runtime_error = False
+
+    def test_matches_tree_walking_interpreter(self):
+        for source in PROGRAMS:
+            with self.subTest(source=source):
+                self.assertEqual(run(ClosureInterpreter(), source), run(Interpreter(), source))
+
+    def test_runtime_error(self):
+        self.assertEqual(
+            run(ClosureInterpreter(), 'print "before";\nprint -"a";'),
+            "before\n[line 2]: [Interpreter] Operand must be a number \n",
+        )
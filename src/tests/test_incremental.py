@@ -0,0 +1,143 @@
+import io
+import unittest
+import unittest.mock
+from pathlib import Path
+
+from pylox import PyLox
+from utils.expr import Expr
+from utils.incremental import IncrementalParser, split_declarations
+from utils.parser import Parser
+from utils.regex_scanner import RegexScanner
+from utils.resolver import Resolver
+from utils.scanner import Scanner
+from utils.stmt import Stmt
+from utils.token import Token
+
+EXAMPLES = Path(__file__).parent.parent.parent / "examples"
+
+SOURCE = """fun add(a, b) {
+  return a + b;
+}
+var x = add(1, 2);
+if (x > 2) print x; else print "small";
+class A {
+  get() { return this; }
+}
+"""
+
+
+def dump(node):
+    """
+    Everything in a tree, including what the resolver annotated it with, to compare trees by
+    """
+    if isinstance(node, list):
+        return [dump(child) for child in node]
+    if isinstance(node, (Expr, Stmt)):
+        return type(node).__name__, getattr(node, "line", None), {key: dump(value) for key, value in vars(node).items()}
+    if isinstance(node, Token):
+        return node.token_type, node.lexeme, node.literal, node.line
+    return node
+
+
+def parse(source: str):
+    statements = Parser(PyLox, Scanner(PyLox, source).scan_tokens()).parse()
+    Resolver(PyLox).resolve(statements)
+    return statements
+
+
+class TestIncremental(unittest.TestCase):
+    def setUp(self):
+        self.parser = IncrementalParser(PyLox)
+
+    def tearDown(self):
+        PyLox._had_error = False
+
+    def assert_same_as_parse(self, program):
+        self.assertFalse(program.had_error)
+        self.assertEqual(dump(program.statements), dump(parse(program.source)))
+
+    def test_parse(self):
+        program = self.parser.parse(SOURCE)
+        self.assert_same_as_parse(program)
+        self.assertEqual([declaration.line for declaration in program.declarations], [1, 4, 5, 6])
+        self.assertEqual((program.reused, program.parsed), (0, 4))
+
+    def test_examples(self):
+        for path in sorted(EXAMPLES.glob("*.lox")):
+            with self.subTest(path=path.name):
+                with unittest.mock.patch("sys.stdout", new_callable=io.StringIO):
+                    program = self.parser.parse(path.read_text())
+                if not program.had_error:
+                    self.assert_same_as_parse(program)
+
+    def test_reuses_unchanged_declarations(self):
+        program = self.parser.parse(SOURCE)
+        statements = program.statements
+
+        program = self.parser.parse(SOURCE.replace("add(1, 2)", "add(1, 3)"), program)
+        self.assert_same_as_parse(program)
+        self.assertEqual([declaration.reused for declaration in program.declarations], [True, False, True, True])
+        self.assertIs(program.statements[0], statements[0])
+        self.assertEqual(program.summary(), "3 of 4 declarations reused, 1 parsed")
+
+    def test_moves_lines_of_reused_declarations(self):
+        program = self.parser.parse(SOURCE)
+        program = self.parser.parse("// Comment\n\n" + SOURCE.replace("x > 2", "x >\n 2"), program)
+        self.assert_same_as_parse(program)
+        self.assertEqual([declaration.line for declaration in program.declarations], [3, 6, 7, 9])
+        self.assertEqual(program.reused, 3)
+
+    def test_repeated_declarations(self):
+        program = self.parser.parse("print 1;\nprint 1;\n")
+        program = self.parser.parse("print 1;\nprint 1;\nprint 1;\n", program)
+        self.assert_same_as_parse(program)
+        self.assertEqual((program.reused, program.parsed), (2, 1))
+        self.assertIsNot(program.statements[0], program.statements[1])
+
+    def test_comment_swallowing_declarations(self):
+        program = self.parser.parse(SOURCE)
+        program = self.parser.parse(SOURCE.replace("var x", "/* var x").replace("class A", "*/ class A"), program)
+        self.assert_same_as_parse(program)
+        self.assertEqual(len(program.declarations), 2)
+
+    @unittest.mock.patch("sys.stdout", new_callable=io.StringIO)
+    def test_errors(self, stdout):
+        program = self.parser.parse(SOURCE.replace("add(1, 2)", "add(1, 2) +"))
+        self.assertTrue(program.had_error)
+        self.assertTrue(PyLox._had_error)
+        self.assertIn("Expect expression.", stdout.getvalue())
+
+        # The declaration with the error is parsed again even though it didn't change
+        PyLox._had_error = False
+        program = self.parser.parse(SOURCE.replace("add(1, 2)", "add(1, 2) +"), program)
+        self.assertTrue(program.had_error)
+        self.assertEqual((program.reused, program.parsed), (3, 1))
+
+        PyLox._had_error = False
+        program = self.parser.parse(SOURCE, program)
+        self.assert_same_as_parse(program)
+        self.assertEqual((program.reused, program.parsed), (3, 1))
+
+    @unittest.mock.patch("sys.stdout", new_callable=io.StringIO)
+    def test_unclosed_parenthesis(self, stdout):
+        # Everything after it is one declaration until the parenthesis is closed
+        program = self.parser.parse(SOURCE.replace("add(1, 2)", "add(1, 2"))
+        self.assertTrue(program.had_error)
+        self.assertEqual(len(program.declarations), 2)
+
+        PyLox._had_error = False
+        program = self.parser.parse(SOURCE, program)
+        self.assert_same_as_parse(program)
+        self.assertEqual((program.reused, program.parsed), (1, 3))
+
+    def test_split_declarations(self):
+        store = RegexScanner(PyLox, "if (a) { b; } else c; { d; } e(f(g));").scan_store()
+        lexemes = [[store.lexeme(i) for i in range(start, stop)] for start, stop in split_declarations(store)]
+        self.assertEqual(
+            lexemes,
+            [
+                ["if", "(", "a", ")", "{", "b", ";", "}", "else", "c", ";"],
+                ["{", "d", ";", "}"],
+                ["e", "(", "f", "(", "g", ")", ")", ";"],
+            ],
+        )
@@ -0,0 +1,60 @@
+import unittest
+
+from pylox import PyLox
+from tests.programs import run
+from utils.inline_cache import MAX_ENTRIES
+from utils.interpreter import Interpreter
+
+SHAPES = """
+class A { m() { return "m"; } }
+class B < A {}
+fun get(o) { return o.m; }
+var a = A();
+print get(a)();
+print get(a)();
+a.m = "field";
+print get(a);
+print get(B())();
+"""
+
+
+class TestInlineCache(unittest.TestCase):
+    def tearDown(self):
+        PyLox._had_runtime_error = False
+
+    def test_monomorphic(self):
+        interpreter = Interpreter()
+        self.assertEqual(
+            run(interpreter, "class A {}\nvar a = A();\nfor (var i = 0; i < 10; i = i + 1) a.x = i;\nprint a.x;"), "9\n"
+        )
+
+        stats = interpreter.inline_cache_stats()
+        self.assertEqual(stats.sites, 2)
+        # The set site sees the shape without x once, when it adds the field, and then only the shape with x
+        self.assertEqual(stats.polymorphic, 1)
+        self.assertEqual((stats.hits, stats.misses), (8, 3))
+
+    def test_field_shadowing_cached_method(self):
+        interpreter = Interpreter()
+        self.assertEqual(run(interpreter, SHAPES), "m\nm\nfield\nm\n")
+
+        stats = interpreter.inline_cache_stats()
+        self.assertEqual(stats.polymorphic, 1)  # o.m sees A without and with the field, then B
+        self.assertEqual((stats.hits, stats.misses), (1, 4))
+
+    def test_megamorphic(self):
+        classes = "".join(f"class C{i} {{ init() {{ this.x = {i}; }} }}\n" for i in range(MAX_ENTRIES + 2))
+        calls = "".join(f"print get(C{i}());\n" for i in range(MAX_ENTRIES + 2))
+        interpreter = Interpreter()
+        output = run(interpreter, classes + "fun get(o) { return o.x; }\n" + calls)
+
+        self.assertEqual(output, "".join(f"{i}\n" for i in range(MAX_ENTRIES + 2)))
+        stats = interpreter.inline_cache_stats()
+        self.assertEqual(stats.megamorphic, 1)
+        self.assertEqual(stats.hits, 0)
+
+    def test_errors(self):
+        self.assertEqual(
+            run(Interpreter(), "class A {}\nvar a = A();\nprint a.x;"),
+            "[line 3]: [Interpreter] Undefined property x. \n",
+        )
@@ -0,0 +1,87 @@
+import sys
+import unittest
+
+from pylox import PyLox
+from tests.programs import run
+from utils.interpreter import Interpreter
+
+
+class TestInterpreter(unittest.TestCase):
+    def tearDown(self):
+        PyLox._had_runtime_error = False
+
+    def test_tail_calls_run_in_constant_stack(self):
+        depth = sys.getrecursionlimit() * 10
+        source = f"""
+        fun count(n, acc) {{
+          if (n == 0) return acc;
+          return count(n - 1, acc + 1);
+        }}
+        fun isEven(n) {{ if (n == 0) return true; return isOdd(n - 1); }}
+        fun isOdd(n) {{ if (n == 0) return false; return isEven(n - 1); }}
+        class Node {{
+          init(next) {{ this.next = next; }}
+          length(acc) {{
+            if (this.next == nil) return acc + 1;
+            return this.next.length(acc + 1);
+          }}
+        }}
+        var list = nil;
+        for (var i = 0; i < {depth}; i = i + 1) list = Node(list);
+        print count({depth}, 0);
+        print isEven({depth});
+        print list.length(0);
+        """
+        self.assertEqual(run(Interpreter(), source), f"{depth}\nTrue\n{depth}\n")
+
+    def test_tail_calls_keep_closures(self):
+        source = """
+        var fns = nil;
+        fun collect(n) {
+          if (n == 0) return nil;
+          fun get() { return n; }
+          fns = get;
+          return collect(n - 1);
+        }
+        collect(3);
+        print fns();
+        fun keep(n, f) {
+          if (n == 0) return f();
+          fun next() { return n + f(); }
+          return keep(n - 1, next);
+        }
+        fun zero() { return 0; }
+        print keep(4, zero);
+        """
+        self.assertEqual(run(Interpreter(), source), "1\n10\n")
+
+    def test_tail_calls_to_other_callables(self):
+        source = """
+        class A { init(n) { this.n = n; } }
+        fun make(n) { return A(n); }
+        fun time() { return clock(); }
+        fun again(a) { return a.init(2); }
+        print make(1).n;
+        print time() > 0;
+        print again(make(1)).n;
+        fun wrong() { return make(); }
+        wrong();
+        """
+        self.assertEqual(
+            run(Interpreter(), source), "1\nTrue\n2\n[line 9]: [Interpreter] Expected 1 arguments but got 0. \n"
+        )
+
+    def test_global_cells(self):
+        source = """
+        fun get() { return later; }
+        fun set() { later = "assigned"; }
+        print "start";
+        set();
+        """
+        interpreter = Interpreter()
+        self.assertEqual(run(interpreter, source), "start\n[line 3]: Undefined variable later \n")
+        self.assertEqual(run(interpreter, "get();"), "[line 2]: Undefined variable later \n")
+
+        # Functions that looked the cell up before see the definition
+        source = 'var later = "defined";\nprint get();\nset();\nprint later;'
+        self.assertEqual(run(interpreter, source), "defined\nassigned\n")
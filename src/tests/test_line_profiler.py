@@ -0,0 +1,69 @@
+import unittest
+
+from pylox import PyLox
+from tests.programs import run
+from utils.interpreter import Interpreter
+from utils.line_profiler import LineProfiler
+
+SOURCE = """var total = 0;
+for (var i = 0; i < 10; i = i + 1) {
+  if (i < 3) total = total + 1;
+  else {}
+}
+fun twice(n) {
+  return n * 2;
+}
+class A { m() { return twice(total); } }
+print A().m();
+"""
+
+
+class TestLineProfiler(unittest.TestCase):
+    def tearDown(self):
+        PyLox._had_runtime_error = False
+
+    def profile(self, source: str) -> LineProfiler:
+        profiler = LineProfiler()
+        profiler.start()
+        try:
+            run(Interpreter(), source)
+        finally:
+            profiler.stop()
+        return profiler
+
+    def test_hits(self):
+        profiler = self.profile(SOURCE)
+
+        hits = {line: profile.hits for line, profile in profiler.lines.items()}
+        # The for line runs its block, initializer and loop once, and every iteration runs the block desugared around
+        # the body and increment, the body's own block that starts on it, and the increment
+        self.assertEqual(hits, {1: 1, 2: 3 + 10 * 3, 3: 10 + 3, 4: 7, 6: 1, 7: 1, 9: 2, 10: 1})
+
+    def test_times(self):
+        profiler = self.profile(SOURCE)
+
+        for line, profile in profiler.lines.items():
+            with self.subTest(line=line):
+                self.assertGreaterEqual(profile.time, 0)
+        self.assertAlmostEqual(profiler.total_time, sum(profile.time for profile in profiler.lines.values()))
+
+    def test_listing(self):
+        profiler = self.profile(SOURCE)
+        listing = profiler.listing(SOURCE).splitlines()
+
+        self.assertTrue(listing[0].startswith("Total time: "))
+        rows = listing[4:]
+        self.assertEqual(len(rows), len(SOURCE.splitlines()))
+        self.assertEqual(rows[4].split(), ["5", "}"])
+        self.assertEqual(rows[2].split()[:2], ["3", "13"])
+        self.assertTrue(rows[2].endswith("  if (i < 3) total = total + 1;"))
+
+    def test_runtime_errors_unwind(self):
+        profiler = self.profile("fun f() {\n  return 1 + nil;\n}\nf();\nprint 1;")
+        self.assertEqual({line: profile.hits for line, profile in profiler.lines.items()}, {1: 1, 2: 1, 4: 1})
+        self.assertEqual(profiler._frames, [])
+
+    def test_stop_restores_interpreter(self):
+        visit = Interpreter.visit_while_stmt
+        self.profile("print 1;")
+        self.assertIs(Interpreter.visit_while_stmt, visit)
@@ -0,0 +1,61 @@
+import unittest
+
+from utils.lox_class import LoxClass
+from utils.lox_instance import LoxInstance
+from utils.runtime_error import PyLoxRuntimeError
+from utils.token import Token
+from utils.token_type import TokenType
+
+
+def name(lexeme: str) -> Token:
+    return Token(TokenType.IDENTIFIER, lexeme, None, 1)
+
+
+class TestLoxInstance(unittest.TestCase):
+    def setUp(self):
+        self.klass = LoxClass("A", None, {})
+
+    def test_same_fields_share_shape(self):
+        a = LoxInstance(self.klass)
+        b = LoxInstance(self.klass)
+        self.assertIs(a.shape, self.klass.instance_shape)
+
+        for instance in [a, b]:
+            instance.sett(name("x"), 1.0)
+            instance.sett(name("y"), 2.0)
+
+        self.assertIs(a.shape, b.shape)
+        self.assertEqual(a.values, [1.0, 2.0])
+
+    def test_insertion_order_gives_different_shapes(self):
+        a = LoxInstance(self.klass)
+        a.sett(name("x"), 1.0)
+        a.sett(name("y"), 2.0)
+        b = LoxInstance(self.klass)
+        b.sett(name("y"), 2.0)
+        b.sett(name("x"), 1.0)
+
+        self.assertIsNot(a.shape, b.shape)
+        self.assertEqual(a.fields, b.fields)
+
+    def test_overwrite_keeps_shape(self):
+        a = LoxInstance(self.klass)
+        a.sett(name("x"), 1.0)
+        shape = a.shape
+        a.sett(name("x"), "two")
+
+        self.assertIs(a.shape, shape)
+        self.assertEqual(a.get(name("x")), "two")
+
+    def test_field_shadows_method(self):
+        klass = LoxClass("A", None, {"m": "method"})
+        a = LoxInstance(klass)
+        a.sett(name("m"), "field")
+
+        self.assertEqual(a.get(name("m")), "field")
+
+    def test_undefined_property(self):
+        with self.assertRaises(PyLoxRuntimeError) as context:
+            LoxInstance(self.klass).get(name("x"))
+
+        self.assertEqual(context.exception.message, "[Interpreter] Undefined property x.")
@@ -0,0 +1,107 @@
+import unittest
+
+from pylox import PyLox
+from tests.programs import PROGRAMS, run
+from utils.interpreter import Interpreter
+from utils.memo import MISSING, Memo, memo_key
+from utils.parser import Parser
+from utils.purity import PurityAnalyzer
+from utils.resolver import Resolver
+from utils.scanner import Scanner
+
+
+def parse(source: str):
+    statements = Parser(PyLox, Scanner(PyLox, source).scan_tokens()).parse()
+    Resolver(PyLox).resolve(statements)
+    return statements
+
+
+def memoizing_interpreter(max_entries: int = 100) -> Interpreter:
+    interpreter = Interpreter()
+    interpreter.memo = Memo(max_entries)
+    return interpreter
+
+
+class TestPurityAnalyzer(unittest.TestCase):
+    def test_pure_functions(self):
+        source = """
+        fun fib(n) { if (n < 2) return n; return fib(n - 1) + fib(n - 2); }
+        fun isEven(n) { if (n == 0) return true; return isOdd(n - 1); }
+        fun isOdd(n) { if (n == 0) return false; return isEven(n - 1); }
+        fun sum(n) { var total = 0; for (var i = 0; i < n; i = i + 1) total = total + fib(i); return total; }
+        fun printer(n) { print n; }
+        fun timer() { return clock(); }
+        fun callsPrinter(n) { return printer(n) or fib(n); }
+        fun assigns() { counter = 1; }
+        fun readsVariable() { return counter; }
+        fun makesClosure() { fun inner() {} return inner; }
+        fun makesInstance() { return A(); }
+        var counter = 0;
+        class A {}
+        """
+        statements = parse(source)
+        PurityAnalyzer().analyze(statements)
+
+        pure = [statement.name.lexeme for statement in statements if getattr(statement, "pure", False)]
+        self.assertEqual(pure, ["fib", "isEven", "isOdd", "sum"])
+
+    def test_later_programs_make_functions_impure(self):
+        analyzer = PurityAnalyzer()
+        first = parse("fun f(n) { return n; }\nfun g(n) { return f(n); }")
+        analyzer.analyze(first)
+        self.assertTrue(first[1].pure)
+
+        # f still only depends on its argument, but g calls whatever f now is
+        analyzer.analyze(parse('f = "not a function";'))
+        self.assertTrue(first[0].pure)
+        self.assertFalse(first[1].pure)
+
+
+class TestMemo(unittest.TestCase):
+    def tearDown(self):
+        PyLox._had_runtime_error = False
+
+    def test_memo_keys(self):
+        declaration = parse("fun f(a) {}")[0]
+        keys = [memo_key(declaration, [value]) for value in [1.0, True, "1", None, 0.0, -0.0]]
+        self.assertEqual(len(set(keys)), len(keys))
+        self.assertIsNone(memo_key(declaration, [Interpreter()]))
+
+    def test_least_recently_used_evicted(self):
+        memo = Memo(2)
+        memo.put(("a",), 1)
+        memo.put(("b",), 2)
+        self.assertEqual(memo.get(("a",)), 1)
+        memo.put(("c",), 3)
+
+        self.assertIs(memo.get(("b",)), MISSING)
+        self.assertEqual(memo.get(("a",)), 1)
+        self.assertEqual((memo.hits, memo.misses, memo.evictions, len(memo)), (2, 1, 1, 2))
+
+    def test_memoized_calls(self):
+        source = """
+        fun fib(n) { if (n < 2) return n; return fib(n - 1) + fib(n - 2); }
+        print fib(30);
+        print fib(30);
+        """
+        interpreter = memoizing_interpreter()
+        self.assertEqual(run(interpreter, source), "832040\n832040\n")
+        self.assertEqual((interpreter.memo.misses, len(interpreter.memo)), (31, 31))
+        self.assertEqual(interpreter.memo.hits, 29)
+
+    def test_memoized_tail_calls(self):
+        source = """
+        fun down(n) { if (n == 0) return 0; return down(n - 1); }
+        print down(5);
+        print down(7);
+        print down(3);
+        """
+        interpreter = memoizing_interpreter()
+        self.assertEqual(run(interpreter, source), "0\n0\n0\n")
+        # down(5) misses for 5 to 0, down(7) for 7 and 6 then hits 5, down(3) hits
+        self.assertEqual((interpreter.memo.misses, interpreter.memo.hits, len(interpreter.memo)), (8, 2, 8))
+
+    def test_matches_without_memo(self):
+        for source in PROGRAMS:
+            with self.subTest(source=source):
+                self.assertEqual(run(memoizing_interpreter(2), source), run(Interpreter(), source))
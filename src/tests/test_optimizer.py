@@ -0,0 +1,102 @@
+import unittest
+
+from pylox import PyLox
+from tests.programs import PROGRAMS, run
+from utils.expr import Binary, Call, Literal, Logical, Unary, Variable
+from utils.interpreter import Interpreter
+from utils.optimizer import Optimizer
+from utils.parser import Parser
+from utils.resolver import Resolver
+from utils.scanner import Scanner
+from utils.stmt import Block, Expression, If, Print, While
+
+
+def optimize(source: str):
+    statements = Parser(PyLox, Scanner(PyLox, source).scan_tokens()).parse()
+    Resolver(PyLox).resolve(statements)
+    return Optimizer().optimize(statements)
+
+
+class TestOptimizer(unittest.TestCase):
+    def tearDown(self):
+        PyLox._had_runtime_error = False
+
+    def assertFolds(self, expression: str, value: object):
+        statements = optimize(f"print {expression};")
+        self.assertIsInstance(statements[0].expression, Literal, expression)
+        self.assertEqual(statements[0].expression.value, value, expression)
+        self.assertIs(type(statements[0].expression.value), type(value), expression)
+
+    def test_fold(self):
+        self.assertFolds("1 + 2 * 3", 7.0)
+        self.assertFolds("(1 + 2) * 3", 9.0)
+        self.assertFolds('"a" + "b" + "c"', "abc")
+        self.assertFolds("7 / 2 - -1", 4.5)
+        self.assertFolds("1 < 2 == !nil", True)
+        self.assertFolds("2 >= 3 != 1 <= 0", False)
+        self.assertFolds("1 == true", True)
+        self.assertFolds('nil == "a"', False)
+        self.assertFolds("!0", False)
+        self.assertFolds("nil or 2", 2.0)
+        self.assertFolds("false and 1", False)
+        self.assertFolds('1 and "b"', "b")
+
+    def test_no_fold(self):
+        statements = optimize("var a = 1;\nprint a + 1;\nprint nil or a;\nprint a and 1;\nprint -a;")
+        self.assertIsInstance(statements[1].expression, Binary)
+        self.assertIsInstance(statements[2].expression, Variable)
+        self.assertIsInstance(statements[3].expression, Logical)
+        self.assertIsInstance(statements[4].expression, Unary)
+
+    def test_errors_not_folded(self):
+        for expression in ['"a" - 1', '1 + "a"', "nil * 2", '1 < "a"', '-"a"', "1 / 0"]:
+            with self.subTest(expression=expression):
+                statements = optimize(f"print {expression};")
+                self.assertNotIsInstance(statements[0].expression, Literal)
+
+    def test_errors_at_same_line(self):
+        source = 'print "before";\nif (false) print "a" - 1;\nprint 1 + 2;\nprint ("a" - 1) + 2;'
+        self.assertEqual(run(Interpreter(), source), "before\n3\n[line 4]: [Interpreter] Operands must be numbers \n")
+
+    def test_dead_branches(self):
+        statements = optimize(
+            """
+            if (true) print 1; else print 2;
+            if (!true) print 3; else { print 4; }
+            if (nil) print 5;
+            while (false) print 6;
+            while (1 > 2) print 7;
+            var a = 1;
+            if (a) print 8;
+            while (a) { if (false) print 9; }
+            """
+        )
+        self.assertIsInstance(statements[0], Print)
+        self.assertIsInstance(statements[1], Block)
+        self.assertEqual(len(statements), 5)
+        self.assertIsInstance(statements[3], If)
+        self.assertIsInstance(statements[4], While)
+        self.assertEqual(statements[4].body.statements, [])
+
+    def test_unreachable_after_return(self):
+        statements = optimize("fun f() { print 1; return 2; print 3; }")
+        self.assertEqual(len(statements[0].body), 2)
+
+    def test_drops_pure_expression_statements(self):
+        statements = optimize(
+            """
+            1 + 2;
+            fun f(a) { a; a == nil; !a and "x"; a + 1; -a; }
+            undefined;
+            f(1);
+            """
+        )
+        self.assertEqual(len(statements), 3)
+        self.assertEqual([type(stmt.expression) for stmt in statements[0].body], [Binary, Unary])
+        self.assertIsInstance(statements[2].expression, Call)
+        self.assertIsInstance(statements[1], Expression)
+
+    def test_matches_unoptimized(self):
+        for source in PROGRAMS:
+            with self.subTest(source=source):
+                self.assertEqual(run(Interpreter(), source), run(Interpreter(), source, optimize=False))
@@ -1,11 +1,19 @@
+import io
 import unittest
+import unittest.mock
 
 from pylox import PyLox
+from utils.expr import Assign, Binary, Call, Expr, Get, Logical, Set, Unary, Variable
 from utils.parser import ParseError, Parser
+from utils.scanner import Scanner
 from utils.token import Token
 from utils.token_type import TokenType
 
 
+def parse_expression(source: str) -> Expr:
+    return Parser(PyLox, Scanner(PyLox, source + ";").scan_tokens()).parse()[0].expression
+
+
 class TestParser(unittest.TestCase):
     def test_parse_equality(self):
         tokens = [
@@ -102,3 +110,63 @@ class TestParser(unittest.TestCase):
         self.assertEqual(len(statements), 1)
         expression = statements[0].expression
         self.assertEqual(expression.value, 10)
+
+    def test_statement_lines(self):
+        source = "var a = 1;\nfor (var i = 0;\n  i < 2;\n  i = i + 1)\n  print i;\n{\n}\n"
+        statements = Parser(PyLox, Scanner(PyLox, source).scan_tokens()).parse()
+        self.assertEqual([statement.line for statement in statements], [1, 2, 6])
+
+        # for desugars into { initializer; while (condition) { body; increment; } }
+        loop = statements[1]
+        initializer, while_loop = loop.statements
+        body, increment = while_loop.body.statements
+        self.assertEqual([initializer.line, while_loop.line, while_loop.body.line], [2, 2, 2])
+        self.assertEqual([body.line, increment.line], [5, 4])
+
+    def test_precedence(self):
+        expression = parse_expression("1 + 2 * -x.y(3) - 4")
+        self.assertIsInstance(expression, Binary)
+        self.assertEqual(expression.operator.lexeme, "-")
+        self.assertEqual(expression.right.value, 4)
+
+        left = expression.left
+        self.assertEqual([left.operator.lexeme, left.left.value], ["+", 1])
+        product = left.right
+        self.assertEqual([product.operator.lexeme, product.left.value], ["*", 2])
+        negation = product.right
+        self.assertIsInstance(negation, Unary)
+        self.assertIsInstance(negation.right, Call)
+        self.assertIsInstance(negation.right.callee, Get)
+        self.assertEqual([argument.value for argument in negation.right.arguments], [3])
+
+    def test_logical_precedence(self):
+        expression = parse_expression("a or b and !c == d < e")
+        self.assertIsInstance(expression, Logical)
+        self.assertEqual(expression.operator.lexeme, "or")
+        conjunction = expression.right
+        self.assertEqual(conjunction.operator.lexeme, "and")
+        equality = conjunction.right
+        self.assertEqual(equality.operator.lexeme, "==")
+        self.assertIsInstance(equality.left, Unary)
+        self.assertEqual(equality.right.operator.lexeme, "<")
+
+    def test_associativity(self):
+        expression = parse_expression("a - b - c")
+        self.assertEqual(expression.left.operator.lexeme, "-")
+        self.assertEqual(expression.right.name.lexeme, "c")
+
+        expression = parse_expression("a = b.c = d")
+        self.assertIsInstance(expression, Assign)
+        self.assertIsInstance(expression.value, Set)
+        self.assertIsInstance(expression.value.value, Variable)
+
+    @unittest.mock.patch("sys.stdout", new_callable=io.StringIO)
+    def test_expression_errors(self, stdout):
+        expression = parse_expression("a + b = c")
+        self.assertEqual(expression.operator.lexeme, "+")
+        self.assertIn("[Parser] Invalid assignment target", stdout.getvalue())
+
+        with self.assertRaises(ParseError):
+            Parser(PyLox, Scanner(PyLox, "1 + ;").scan_tokens())._expression()
+        self.assertIn("at ';' : [Parser] Expect expression.", stdout.getvalue())
+        PyLox._had_error = False
@@ -0,0 +1,183 @@
+"""
+Microbenchmarks of each phase of the pipeline on generated programs of increasing size. They are skipped unless the
+PYLOX_BENCHMARK environment variable names a file to write the results to as JSON, e.g.
+
+    PYLOX_BENCHMARK=phases.json python -m unittest tests.test_phase_benchmarks
+
+run from src. Besides measuring throughput, each benchmark fails if the time per unit of input grows by more than
+MAX_SLOWDOWN from the smallest to the largest input, which catches accidentally quadratic phases.
+"""
+
+import contextlib
+import io
+import json
+import os
+import time
+import unittest
+from typing import Callable, Dict, List, Union
+
+from pylox import PyLox
+from utils.expr import Expr
+from utils.interpreter import Interpreter
+from utils.parser import Parser
+from utils.regex_scanner import RegexScanner
+from utils.resolver import Resolver
+from utils.scanner import Scanner
+from utils.stmt import Stmt
+
+OUTPUT = os.environ.get("PYLOX_BENCHMARK")
+
+# Numbers of units in the generated programs, each twice the previous
+SIZES = [25, 50, 100, 200, 400]
+
+# Best of this many runs is kept for each size
+REPEATS = 3
+
+# Factor by which the time per unit may grow from the smallest input to the largest: 16 times the input should take
+# about 16 times as long, a quadratic phase would take 256 times
+MAX_SLOWDOWN = 3.0
+
+UNIT = """
+// Unit {i}
+class Base{i} {{
+  init(x) {{ this.x = x; }}
+  get() {{ return this.x; }}
+}}
+class Derived{i} < Base{i} {{
+  get() {{ return super.get() * 2; }}
+}}
+fun work{i}(a, b) {{
+  var total = a;
+  for (var j = 0; j < b; j = j + 1) {{
+    total = total + j * 2 - (j / 4);
+  }}
+  if (total > 10 and a != nil) name{i} = "big " + "unit"; else total = -total;
+  while (b > 0) b = b - 1;
+  return total;
+}}
+var name{i} = "unit {i}";
+var value{i} = work{i}({i}, 3) + Derived{i}({i}).get();
+"""
+
+
+def generate(units: int) -> str:
+    """
+    Lox program made of units that each declare classes, a function and globals, and use them
+    """
+    return "".join(UNIT.format(i=i) for i in range(units))
+
+
+def count_nodes(node: Union[Expr, Stmt, list, None]) -> int:
+    """
+    Number of Expr and Stmt nodes in a tree
+    """
+    if isinstance(node, list):
+        return sum(count_nodes(child) for child in node)
+    if not isinstance(node, (Expr, Stmt)):
+        return 0
+    return 1 + sum(count_nodes(value) for value in vars(node).values())
+
+
+def best_time(run: Callable[[object], object], setup: Callable[[], object] = lambda: None) -> float:
+    """
+    Best time of run over REPEATS, each called with the result of an untimed call to setup
+    """
+    best = float("inf")
+    for _ in range(REPEATS):
+        argument = setup()
+        start = time.perf_counter()
+        run(argument)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+@unittest.skipUnless(OUTPUT, "set PYLOX_BENCHMARK to the file to write results to")
+class TestPhaseBenchmarks(unittest.TestCase):
+    results: Dict[str, List[Dict[str, float]]] = {}
+
+    @classmethod
+    def tearDownClass(cls):
+        with open(OUTPUT, "w") as f:
+            json.dump({"sizes": SIZES, "phases": cls.results}, f, indent=2)
+            f.write("\n")
+
+    def tearDown(self):
+        PyLox._had_error = False
+        PyLox._had_runtime_error = False
+
+    def record(self, phase: str, units: int, seconds: float, **counts: int) -> None:
+        """
+        Keep the result of a phase at a size, with the rate of each count
+        """
+        result = {"units": units, "seconds": seconds}
+        for name, count in counts.items():
+            result[name] = count
+            result[f"{name}_per_second"] = count / seconds
+        self.results.setdefault(phase, []).append(result)
+
+    def assert_scales_linearly(self, phase: str) -> None:
+        results = self.results[phase]
+        first, last = results[0], results[-1]
+        slowdown = (last["seconds"] / last["units"]) / (first["seconds"] / first["units"])
+        message = f"{phase} takes {slowdown:.1f} times longer per unit at {last['units']} units"
+        self.assertLess(slowdown, MAX_SLOWDOWN, message)
+
+    def test_scanner(self):
+        for units in SIZES:
+            source = generate(units)
+            tokens = Scanner(PyLox, source).scan_tokens()
+            seconds = best_time(lambda _: Scanner(PyLox, source).scan_tokens())
+            self.record("scan", units, seconds, tokens=len(tokens), bytes=len(source.encode()))
+            self.assertFalse(PyLox._had_error)
+
+        self.assert_scales_linearly("scan")
+
+    def test_regex_scanner(self):
+        for units in SIZES:
+            source = generate(units)
+            tokens = RegexScanner(PyLox, source).scan_tokens()
+            seconds = best_time(lambda _: RegexScanner(PyLox, source).scan_tokens())
+            self.record("scan_regex", units, seconds, tokens=len(tokens), bytes=len(source.encode()))
+            self.assertFalse(PyLox._had_error)
+
+        self.assert_scales_linearly("scan_regex")
+
+    def test_parser(self):
+        for units in SIZES:
+            tokens = Scanner(PyLox, generate(units)).scan_tokens()
+            nodes = count_nodes(Parser(PyLox, tokens).parse())
+            seconds = best_time(lambda _: Parser(PyLox, tokens).parse())
+            self.record("parse", units, seconds, tokens=len(tokens), nodes=nodes)
+            self.assertFalse(PyLox._had_error)
+
+        self.assert_scales_linearly("parse")
+
+    def test_resolver(self):
+        for units in SIZES:
+            tokens = Scanner(PyLox, generate(units)).scan_tokens()
+            statements = Parser(PyLox, tokens).parse()
+            seconds = best_time(lambda _: Resolver(PyLox).resolve(statements))
+            self.record("resolve", units, seconds, nodes=count_nodes(statements))
+            self.assertFalse(PyLox._had_error)
+
+        self.assert_scales_linearly("resolve")
+
+    def test_interpreter(self):
+        for units in SIZES:
+            source = generate(units)
+
+            def parse() -> List[Stmt]:
+                # Interpreters cache their globals on the nodes, so each one gets its own tree
+                statements = Parser(PyLox, Scanner(PyLox, source).scan_tokens()).parse()
+                Resolver(PyLox).resolve(statements)
+                return statements
+
+            def interpret(statements: List[Stmt]) -> None:
+                with contextlib.redirect_stdout(io.StringIO()):
+                    Interpreter().interpret(PyLox, statements)
+
+            seconds = best_time(interpret, parse)
+            self.record("interpret", units, seconds, statements=len(parse()))
+            self.assertFalse(PyLox._had_runtime_error)
+
+        self.assert_scales_linearly("interpret")
@@ -0,0 +1,93 @@
+import unittest
+
+from pylox import PyLox
+from tests.programs import run
+from utils.interpreter import Interpreter
+from utils.lox_class import LoxClass
+from utils.lox_function import LoxFunction
+from utils.profiler import SCRIPT, Profiler
+
+SOURCE = """
+class Shape {
+  init(n) { this.n = n; }
+  area() { return this.n * this.n; }
+}
+class Square < Shape {
+  area() { var area = super.area(); return area; }
+}
+fun fib(n) { if (n < 2) return n; return fib(n - 1) + fib(n - 2); }
+var total = 0;
+for (var i = 0; i < 3; i = i + 1) total = total + Square(i).area();
+print fib(5) + total;
+print clock() > 0;
+"""
+
+
+class TestProfiler(unittest.TestCase):
+    def tearDown(self):
+        PyLox._had_runtime_error = False
+
+    def profile(self, source: str) -> Profiler:
+        profiler = Profiler()
+        profiler.start()
+        try:
+            run(Interpreter(), source)
+        finally:
+            profiler.stop()
+        return profiler
+
+    def test_counts_calls(self):
+        profiler = self.profile(SOURCE)
+
+        calls = {name: profile.calls for name, profile in profiler.functions.items()}
+        expected = {SCRIPT: 1, "Square": 3, "Shape.init": 3, "Square.area": 3, "Shape.area": 3, "fib": 15}
+        self.assertEqual(calls, {**expected, "<native fn clock>": 1})
+
+    def test_times(self):
+        profiler = self.profile(SOURCE)
+
+        for name, profile in profiler.functions.items():
+            with self.subTest(name=name):
+                self.assertGreaterEqual(profile.inclusive, profile.exclusive)
+                self.assertGreaterEqual(profile.exclusive, 0)
+
+        # Recursive calls count once towards inclusive time
+        script = profiler.functions[SCRIPT]
+        self.assertLessEqual(profiler.functions["fib"].inclusive, script.inclusive)
+
+    def test_stacks(self):
+        profiler = self.profile(SOURCE)
+        stacks = profiler.stacks()
+
+        self.assertIn((SCRIPT, "Square", "Shape.init"), stacks)
+        self.assertIn((SCRIPT, "Square.area", "Shape.area"), stacks)
+        self.assertIn((SCRIPT, "fib", "fib", "fib", "fib", "fib"), stacks)
+        self.assertAlmostEqual(sum(stacks.values()), profiler.functions[SCRIPT].inclusive)
+
+    def test_folded(self):
+        for line in self.profile(SOURCE).folded().splitlines():
+            with self.subTest(line=line):
+                stack, microseconds = line.rsplit(" ", 1)
+                self.assertTrue(stack.startswith(SCRIPT))
+                self.assertGreater(int(microseconds), 0)
+
+    def test_tail_calls(self):
+        source = """
+        fun work(n) { var s = 0; while (n > 0) { s = s + n; n = n - 1; } return s; }
+        fun count(n) { if (n == 0) return work(100); return count(n - 1); }
+        fun a() { return count(3); }
+        print a();
+        """
+        profiler = self.profile(source)
+
+        # A tail call to another function replaces the caller's frame, to itself it stays in the same one
+        calls = {name: profile.calls for name, profile in profiler.functions.items()}
+        self.assertEqual(calls, {SCRIPT: 1, "a": 1, "count": 1, "work": 1})
+        self.assertEqual(set(profiler.stacks()), {(SCRIPT,), (SCRIPT, "a"), (SCRIPT, "count"), (SCRIPT, "work")})
+
+    def test_stop_restores_calls(self):
+        call, invoke, klass_call = LoxFunction.call, LoxFunction.invoke, LoxClass.call
+        tail_call_into = LoxFunction._tail_call_into
+        self.profile("print 1;")
+        self.assertEqual((LoxFunction.call, LoxFunction.invoke, LoxClass.call), (call, invoke, klass_call))
+        self.assertIs(LoxFunction._tail_call_into, tail_call_into)
@@ -0,0 +1,145 @@
+import io
+import random
+import unittest
+import unittest.mock
+from pathlib import Path
+
+from pylox import PyLox
+from utils.regex_scanner import RegexScanner, read_chunks
+from utils.scanner import Scanner
+from utils.token import Token
+from utils.token_type import TokenType
+
+EXAMPLES = Path(__file__).parent.parent.parent / "examples"
+
+# Sources on which scanning has quirks the regex scanner has to keep
+SOURCES = [
+    "var a = 1.5; print a >= 2 and !nil or a != 3.;",
+    'print "multi\nline" + "";\n"unterminated\n',
+    "(= /= *= {= .5 1.2.3 _a1 a_ IDENTIFIER EOF NUMBER STRING",
+    "a // comment ( \n b /* block \n /* nested */ \n */ c",
+    "/* a /* b */ /* c \n d",
+    "/* /* */\n/*",
+    "a */ b * / c",
+    "@ ? é \0 #",
+    "/*",
+    "x /*\n/* */",
+    "",
+]
+
+FRAGMENTS = "( ) { } , . - + ; / * ! = < > /* */ // a _x1 and EOF 123 4.5 ? é".split() + ["\n", " ", "\t", '"']
+
+
+def scan(scanner_class: type, source: str):
+    with unittest.mock.patch("sys.stdout", new_callable=io.StringIO) as stdout:
+        tokens = scanner_class(PyLox, source).scan_tokens()
+    PyLox._had_error = False
+    return [(token.token_type, token.lexeme, token.literal, token.line) for token in tokens], stdout.getvalue()
+
+
+def scan_chunks(source: str, size: int):
+    chunks = [source[i : i + size] for i in range(0, len(source), size)]
+    with unittest.mock.patch("sys.stdout", new_callable=io.StringIO) as stdout:
+        tokens = list(RegexScanner(PyLox).scan_chunks(chunks))
+    PyLox._had_error = False
+    return [(token.token_type, token.lexeme, token.literal, token.line) for token in tokens], stdout.getvalue()
+
+
+class TestRegexScanner(unittest.TestCase):
+    def assert_same_as_scanner(self, source: str) -> None:
+        self.assertEqual(scan(RegexScanner, source), scan(Scanner, source))
+
+    def test_matches_scanner(self):
+        for source in SOURCES:
+            with self.subTest(source=source):
+                self.assert_same_as_scanner(source)
+
+    def test_matches_scanner_on_examples(self):
+        for path in sorted(EXAMPLES.glob("*.lox")):
+            with self.subTest(path=path.name):
+                self.assert_same_as_scanner(path.read_text())
+
+    def test_matches_scanner_on_random_sources(self):
+        generator = random.Random(0)
+        for _ in range(2000):
+            source = "".join(generator.choice(FRAGMENTS) for _ in range(generator.randint(1, 20)))
+            with self.subTest(source=source):
+                self.assert_same_as_scanner(source)
+
+    def test_tokens(self):
+        tokens, errors = scan(RegexScanner, 'class A < B {}\nprint "hi" + 2.5 == x_1;')
+        self.assertEqual(errors, "")
+        self.assertEqual(
+            [(token_type, lexeme) for token_type, lexeme, _, _ in tokens],
+            [
+                (TokenType.CLASS, "class"),
+                (TokenType.IDENTIFIER, "A"),
+                (TokenType.LESS, "<"),
+                (TokenType.IDENTIFIER, "B"),
+                (TokenType.LEFT_BRACE, "{"),
+                (TokenType.RIGHT_BRACE, "}"),
+                (TokenType.PRINT, "print"),
+                (TokenType.STRING, '"hi"'),
+                (TokenType.PLUS, "+"),
+                (TokenType.NUMBER, "2.5"),
+                (TokenType.EQUAL_EQUAL, "=="),
+                (TokenType.IDENTIFIER, "x_1"),
+                (TokenType.SEMICOLON, ";"),
+                (TokenType.EOF, ""),
+            ],
+        )
+        self.assertEqual(tokens[-1], (TokenType.EOF, "", None, 2))
+
+    def test_token_objects(self):
+        self.assertEqual(RegexScanner(PyLox, "1").scan_tokens()[0], Token(TokenType.NUMBER, "1", 1.0, 1))
+
+    def test_chunks_match_scanner(self):
+        sources = SOURCES + [path.read_text() for path in sorted(EXAMPLES.glob("*.lox"))]
+        for source in sources:
+            for size in [1, 2, 7, 1 << 16]:
+                with self.subTest(source=source[:40], size=size):
+                    self.assertEqual(scan_chunks(source, size), scan(Scanner, source))
+
+    def test_chunks_match_scanner_on_random_sources(self):
+        generator = random.Random(1)
+        for _ in range(1000):
+            source = "".join(generator.choice(FRAGMENTS) for _ in range(generator.randint(1, 20)))
+            size = generator.randint(1, 8)
+            with self.subTest(source=source, size=size):
+                self.assertEqual(scan_chunks(source, size), scan(Scanner, source))
+
+    def test_chunks_yield_tokens_as_lines_are_read(self):
+        read = []
+
+        def chunks():
+            for chunk in ["var a = 1;\nprint ", '"across\n', 'lines";\n/* open \n', "*/ a;"]:
+                read.append(chunk)
+                yield chunk
+
+        tokens = RegexScanner(PyLox).scan_chunks(chunks())
+        self.assertEqual([next(tokens).lexeme for _ in range(5)], ["var", "a", "=", "1", ";"])
+        self.assertEqual(len(read), 1)
+        self.assertEqual([next(tokens).lexeme for _ in range(3)], ["print", '"across\nlines"', ";"])
+        self.assertEqual(len(read), 3)
+        self.assertEqual([(token.lexeme, token.line) for token in tokens], [("a", 5), (";", 5), ("", 5)])
+
+    def test_chunks_without_new_lines(self):
+        source = "var a=1.5;print a/2;" * 50 + "// no new line" + 'print "x' + "y" * 100 + '";'
+        for size in [1, 3]:
+            with self.subTest(size=size):
+                self.assertEqual(scan_chunks(source, size), scan(Scanner, source))
+
+        read = []
+
+        def chunks():
+            for i in range(0, len(source), 3):
+                read.append(source[i : i + 3])
+                yield read[-1]
+
+        tokens = RegexScanner(PyLox).scan_chunks(chunks())
+        self.assertEqual([next(tokens).lexeme for _ in range(5)], ["var", "a", "=", "1.5", ";"])
+        self.assertLess(len(read), 5)
+
+    def test_read_chunks(self):
+        self.assertEqual(list(read_chunks(io.StringIO("abcdefg"), 3)), ["abc", "def", "g"])
+        self.assertEqual(list(read_chunks(io.StringIO(""), 3)), [])
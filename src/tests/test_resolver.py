@@ -0,0 +1,71 @@
+import unittest
+
+from pylox import PyLox
+from utils.parser import Parser
+from utils.resolver import Resolver
+from utils.scanner import Scanner
+
+
+class TestResolver(unittest.TestCase):
+    def test_resolve_slots(self):
+        source = """
+        fun f(a, b) {
+          var c = a;
+          {
+            var d = b;
+            print c + d;
+          }
+        }
+        """
+        statements = Parser(PyLox, Scanner(PyLox, source).scan_tokens()).parse()
+        Resolver(PyLox).resolve(statements)
+
+        body = statements[0].body
+        c = body[0].initializer
+        d = body[1].statements[0].initializer
+        print_expr = body[1].statements[1].expression
+        self.assertEqual((c.depth, c.slot), (0, 0))
+        self.assertEqual((d.depth, d.slot), (1, 1))
+        self.assertEqual((print_expr.left.depth, print_expr.left.slot), (1, 2))
+        self.assertEqual((print_expr.right.depth, print_expr.right.slot), (0, 0))
+
+    def test_globals_unresolved(self):
+        statements = Parser(PyLox, Scanner(PyLox, "var a = 1;\nprint a;").scan_tokens()).parse()
+        Resolver(PyLox).resolve(statements)
+        self.assertIsNone(statements[1].expression.depth)
+
+    def test_tail_calls(self):
+        source = """
+        fun f(n) {
+          if (n == 0) return g(n);
+          return f(n - 1) + 1;
+        }
+        class A {
+          init() { return; }
+          m() { return this.m(); }
+        }
+        """
+        statements = Parser(PyLox, Scanner(PyLox, source).scan_tokens()).parse()
+        Resolver(PyLox).resolve(statements)
+
+        body = statements[0].body
+        self.assertTrue(body[0].then_branch.tail_call)
+        self.assertFalse(body[1].tail_call)
+        init, method = statements[1].methods
+        self.assertFalse(init.body[0].tail_call)
+        self.assertTrue(method.body[0].tail_call)
+
+    def test_has_closures(self):
+        source = """
+        fun leaf() { var a = 1; { var b = a; } }
+        fun outer() { fun inner() {} }
+        fun withClass() { if (true) { class A { m() {} } } }
+        """
+        statements = Parser(PyLox, Scanner(PyLox, source).scan_tokens()).parse()
+        Resolver(PyLox).resolve(statements)
+
+        leaf, outer, with_class = statements
+        self.assertFalse(leaf.has_closures)
+        self.assertTrue(outer.has_closures)
+        self.assertFalse(outer.body[0].has_closures)
+        self.assertTrue(with_class.has_closures)
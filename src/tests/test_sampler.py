@@ -0,0 +1,106 @@
+import unittest
+from typing import List
+
+from pylox import PyLox
+from tests.programs import run
+from utils.interpreter import Interpreter
+from utils.lox_callable import LoxCallable
+from utils.lox_class import LoxClass
+from utils.profiler import SCRIPT
+from utils.sampler import SamplingProfiler
+
+SOURCE = """
+class Shape {
+  init(n) { this.n = n; }
+  area() {
+    return this.n * sample();
+  }
+}
+fun twice(shape) {
+  var area = shape.area();
+  return area + shape.area();
+}
+fun tail(n) { return twice(Shape(n)); }
+print tail(2);
+sample();
+"""
+
+
+class Sample(LoxCallable):
+    """
+    Native function taking a sample of the running program, so that tests know where samples are taken
+    """
+
+    def __init__(self, sampler: SamplingProfiler):
+        self._sampler = sampler
+
+    def call(self, interpreter, arguments: List[object]) -> object:
+        self._sampler._sample(None, None)
+        return 1.0
+
+    def arity(self):
+        return 0
+
+    def __str__(self):
+        return "<native fn sample>"
+
+
+class TestSamplingProfiler(unittest.TestCase):
+    def tearDown(self):
+        PyLox._had_runtime_error = False
+
+    def sampler(self) -> SamplingProfiler:
+        interpreter = Interpreter()
+        sampler = SamplingProfiler(interpreter)
+        interpreter.globals.define("sample", Sample(sampler))
+        return sampler
+
+    def test_stacks(self):
+        sampler = self.sampler()
+        sampler.start()
+        try:
+            self.assertEqual(run(sampler._interpreter, SOURCE), "4\n")
+        finally:
+            sampler.stop()
+
+        # The tail call to twice replaces the frame of tail
+        first = (f"{SCRIPT}:13", "twice:9", "Shape.area:5")
+        second = (f"{SCRIPT}:13", "twice:10", "Shape.area:5")
+        self.assertEqual(sampler.stacks(), {first: 1, second: 1, (f"{SCRIPT}:14",): 1})
+        self.assertEqual(sampler.folded(), f"{';'.join(second)} 1\n{';'.join(first)} 1\n{SCRIPT}:14 1\n")
+
+    def test_report(self):
+        sampler = self.sampler()
+        sampler.start()
+        try:
+            run(sampler._interpreter, SOURCE)
+        finally:
+            sampler.stop()
+
+        report = sampler.report().splitlines()
+        self.assertEqual(report[0], "3 samples every 1 ms of CPU time")
+        self.assertEqual(report[2].split(), ["2", "66.7", "66.7", "Shape.area"])
+        self.assertIn(["1", "33.3", "100.0", SCRIPT], [line.split() for line in report])
+        self.assertIn(["2", "66.7", "Shape.area:5"], [line.split() for line in report])
+
+    def test_frames_cleared_by_runtime_errors(self):
+        interpreter = Interpreter()
+        run(interpreter, "fun f() { return 1 + nil; }\nf();")
+        self.assertEqual(interpreter.frames, [])
+
+    @unittest.skipUnless(SamplingProfiler.is_supported(), "needs timer signals")
+    def test_timer_samples(self):
+        init = LoxClass.__init__
+        sampler = SamplingProfiler(Interpreter(), interval=0.0005)
+        sampler.start()
+        try:
+            run(sampler._interpreter, "fun fib(n) { if (n < 2) return n; return fib(n - 1) + fib(n - 2); }\nfib(18);")
+        finally:
+            sampler.stop()
+
+        self.assertIs(LoxClass.__init__, init)
+        self.assertGreater(sampler.sample_count, 0)
+        for stack in sampler.stacks():
+            with self.subTest(stack=stack):
+                self.assertEqual(stack[0], f"{SCRIPT}:2")
+                self.assertTrue(all(label.startswith("fib:") for label in stack[1:]))
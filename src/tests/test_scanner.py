@@ -229,3 +229,16 @@ This is another nested comment \n
         self.assertFalse(Scanner._is_alpha("-"))
         self.assertFalse(Scanner._is_alpha(""))
         self.assertFalse(Scanner._is_alpha("566"))
+
+    @unittest.mock.patch("sys.stdout", new_callable=io.StringIO)
+    def test_scan_unterminated_multiline_comment_at_end(self, mock_stdout):
+        for source in ["/*", "/* /*", "/*\n/* */"]:
+            with self.subTest(source=source):
+                tokens = Scanner(PyLox, source).scan_tokens()
+                self.assertEqual(tokens, [Token(TokenType.EOF, "", None, source.count("\n") + 1)])
+        self.assertEqual(
+            mock_stdout.getvalue(),
+            "[line 1] Error  : [Scanner] Unterminated multi-line comment\n"
+            "[line 1] Error  : [Scanner] Unterminated multi-line comment\n"
+            "[line 1] Error  : [Scanner] Unterminated multi-line comment\n",
+        )
@@ -0,0 +1,121 @@
+import unittest
+
+from pylox import PyLox
+from tests.programs import PROGRAMS, run
+from utils.ast_printer import AstPrinter
+from utils.expr import (
+    Add,
+    And,
+    Binary,
+    Call,
+    Get,
+    Grouping,
+    Invoke,
+    Less,
+    Logical,
+    Negate,
+    Not,
+    Or,
+    Unary,
+)
+from utils.interpreter import Interpreter
+from utils.parser import Parser
+from utils.resolver import Resolver
+from utils.scanner import Scanner
+from utils.specializer import Specializer
+
+OPERATORS = """
+print 1 + 2; print "a" + "b"; print 5 - 3; print 2 * 3; print 7 / 2;
+print 1 > 2; print 2 >= 2; print 1 < 2; print 3 <= 2;
+print nil == nil; print nil == false; print 1 == 1; print "a" != "b"; print 1 == true;
+print nil and 1; print 1 and 2; print nil or "x"; print 1 or 2;
+print -(3); print !nil; print !0; print !!false;
+"""
+
+METHODS = """
+class A {
+  init(f) { this.f = f; }
+  m(n) { return n + 1; }
+}
+fun g(n) { return n * 2; }
+var a = A(g);
+print a.m(1); print a.f(2);
+a.m = g;
+print a.m(3);
+print a.init(nil).f;
+"""
+
+ERRORS = [
+    'print 1 + "a";',
+    'print "a" - 1;',
+    "print nil * 2;",
+    "print 1 / true;",
+    'print 1 < "a";',
+    'print "a" >= 1;',
+    'print -"a";',
+    "class A { m(a) {} }\nA().m();",
+    "class A {}\nA().m();",
+    "var a = 1;\na.m();",
+]
+
+
+def parse(source: str):
+    statements = Parser(PyLox, Scanner(PyLox, source).scan_tokens()).parse()
+    Resolver(PyLox).resolve(statements)
+    return statements
+
+
+class TestSpecializer(unittest.TestCase):
+    def tearDown(self):
+        PyLox._had_runtime_error = False
+
+    def test_rewrites_operators(self):
+        statements = parse("var a = -(1 + 2) < 3 and !false or nil;")
+        Specializer().specialize(statements)
+
+        expr = statements[0].initializer
+        self.assertIsInstance(expr, Or)
+        self.assertIsInstance(expr.left, And)
+        self.assertIsInstance(expr.left.left, Less)
+        self.assertIsInstance(expr.left.left.left, Negate)
+        self.assertIsInstance(expr.left.left.left.right, Grouping)
+        self.assertIsInstance(expr.left.left.left.right.expression, Add)
+        self.assertIsInstance(expr.left.right, Not)
+
+    def test_rewrites_method_calls(self):
+        statements = parse("a.b(c.d)(); a();")
+        Specializer().specialize(statements)
+
+        expr = statements[0].expression
+        self.assertIs(type(expr), Call)
+        self.assertIsInstance(expr.callee, Invoke)
+        self.assertIsInstance(expr.callee.callee, Get)
+        self.assertIs(type(expr.callee.arguments[0]), Get)
+        self.assertIs(type(statements[1].expression), Call)
+
+    def test_specializations_are_generic_nodes(self):
+        statements = parse("fun f(a) { while (a < 1) { print a + 1; } return !a and a; }")
+        Specializer().specialize(statements)
+
+        body = statements[0].body
+        self.assertIsInstance(body[0].condition, Binary)
+        self.assertIsInstance(body[1].value, Logical)
+        self.assertIsInstance(body[1].value.left, Unary)
+
+    def test_ast_printer_output_unchanged(self):
+        ast_printer = AstPrinter()
+        statements = parse(OPERATORS)
+        expected = [ast_printer.print(statement) for statement in statements]
+
+        Specializer().specialize(statements)
+        self.assertEqual([ast_printer.print(statement) for statement in statements], expected)
+
+    def test_matches_generic_nodes(self):
+        for source in PROGRAMS + [OPERATORS, METHODS]:
+            with self.subTest(source=source):
+                self.assertEqual(run(Interpreter(), source), run(Interpreter(), source, specialize=False))
+
+    def test_same_errors(self):
+        for source in ERRORS:
+            with self.subTest(source=source):
+                self.assertEqual(run(Interpreter(), source), run(Interpreter(), source, specialize=False))
@@ -0,0 +1,49 @@
+import sys
+import unittest
+
+from pylox import PyLox
+from tests.programs import PROGRAMS, run
+from utils.interpreter import Interpreter
+from utils.stack_interpreter import StackInterpreter
+
+
+class TestStackInterpreter(unittest.TestCase):
+    def tearDown(self):
+        PyLox._had_runtime_error = False
+
+    def test_matches_tree_walking_interpreter(self):
+        for source in PROGRAMS:
+            with self.subTest(source=source):
+                self.assertEqual(run(StackInterpreter(), source), run(Interpreter(), source))
+
+    def test_recursion_deeper_than_python_stack(self):
+        depth = sys.getrecursionlimit() * 5
+        source = f"""
+        fun depth(n) {{ if (n == 0) return 0; return depth(n - 1) + 1; }}
+        class Node {{
+          init(n) {{ this.next = nil; if (n > 0) this.next = Node(n - 1); }}
+          length() {{ if (this.next == nil) return 1; return 1 + this.next.length(); }}
+        }}
+        print depth({depth});
+        print Node({depth}).length();
+        """
+        self.assertEqual(run(StackInterpreter(), source), f"{depth}\n{depth + 1}\n")
+
+    def test_stack_overflow(self):
+        interpreter = StackInterpreter(max_depth=50)
+        source = """
+        fun count(n) { if (n == 0) return 0; return 1 + count(n - 1); }
+        print count(49);
+        print count(50);
+        """
+        self.assertEqual(run(interpreter, source), "49\n[line 2]: [Interpreter] Stack overflow. \n")
+
+        # The next program starts from an empty stack
+        self.assertEqual(run(interpreter, "var a = 1;\n{ var b = count(10); }\nprint a;"), "1\n")
+
+    def test_tail_calls_dont_count(self):
+        source = """
+        fun count(n, acc) { if (n == 0) return acc; return count(n - 1, acc + 1); }
+        print count(1000, 0);
+        """
+        self.assertEqual(run(StackInterpreter(max_depth=10), source), "1000\n")
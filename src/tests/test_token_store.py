@@ -0,0 +1,60 @@
+import io
+import unittest
+import unittest.mock
+from pathlib import Path
+
+from pylox import PyLox
+from utils.regex_scanner import RegexScanner
+from utils.scanner import Scanner
+from utils.token import Token
+from utils.token_store import TokenStore
+from utils.token_type import TokenType
+
+EXAMPLES = Path(__file__).parent.parent.parent / "examples"
+
+
+def scan_store(source: str) -> TokenStore:
+    with unittest.mock.patch("sys.stdout", new_callable=io.StringIO):
+        store = RegexScanner(PyLox, source).scan_store()
+    PyLox._had_error = False
+    return store
+
+
+class TestTokenStore(unittest.TestCase):
+    def test_tokens_match_scanner(self):
+        sources = ['var a = 1.5; print "two\nlines" + a;', 'NUMBER STRING EOF (= "open', ""]
+        sources += [path.read_text() for path in sorted(EXAMPLES.glob("*.lox"))]
+        for source in sources:
+            with self.subTest(source=source[:40]):
+                with unittest.mock.patch("sys.stdout", new_callable=io.StringIO):
+                    expected = Scanner(PyLox, source).scan_tokens()
+                PyLox._had_error = False
+                store = scan_store(source)
+                self.assertEqual(list(store), expected)
+                self.assertEqual([store[i] for i in range(len(store))], expected)
+
+    def test_lexemes_are_sliced_from_source(self):
+        store = scan_store('print "hi" >= 12.5;')
+        self.assertEqual(len(store), 6)
+        self.assertEqual([store.lexeme(i) for i in range(len(store))], ["print", '"hi"', ">=", "12.5", ";", ""])
+        self.assertEqual(store[1], Token(TokenType.STRING, '"hi"', "hi", 1))
+        self.assertEqual(store[3].literal, 12.5)
+        self.assertEqual(store[-1], Token(TokenType.EOF, "", None, 1))
+
+    def test_identifiers_are_interned(self):
+        store = scan_store("var counter = 0;\ncounter = counter + 1;")
+        names = [token.lexeme for token in store if token.token_type == TokenType.IDENTIFIER]
+        self.assertEqual(len(names), 3)
+        self.assertTrue(all(name is names[0] for name in names))
+        self.assertIs(store.lexeme(1), store[5].lexeme)
+
+    def test_columns_are_compact(self):
+        store = scan_store("a + b;\n" * 100)
+        self.assertEqual(len(store), 401)
+        self.assertLess(store.nbytes(), 401 * 32)
+
+    def test_token_has_slots(self):
+        token = Token(TokenType.AND, "and", None, 1)
+        self.assertFalse(hasattr(token, "__dict__"))
+        with self.assertRaises(AttributeError):
+            token.extra = 1
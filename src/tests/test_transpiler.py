@@ -0,0 +1,65 @@
+import io
+import tempfile
+import unittest
+import unittest.mock
+from pathlib import Path
+
+from pylox import PyLox
+from tests.programs import PROGRAMS, run
+from utils.interpreter import Interpreter
+from utils.transpiler import PythonInterpreter
+
+
+class TestTranspiler(unittest.TestCase):
+    def tearDown(self):
+        PyLox._had_runtime_error = False
+
+    def test_matches_tree_walking_interpreter(self):
+        for source in PROGRAMS:
+            with self.subTest(source=source):
+                self.assertEqual(run(PythonInterpreter(), source), run(Interpreter(), source))
+
+    def test_closures_in_loop_get_own_variables(self):
+        source = """
+        var first = nil;
+        for (var i = 0; i < 3; i = i + 1) {
+          var j = i;
+          fun f() { j = j + 10; return j; }
+          if (first == nil) first = f;
+          print f();
+        }
+        print first();
+        """
+        self.assertEqual(run(PythonInterpreter(), source), "10\n11\n12\n20\n")
+
+    def test_globals_persist_between_runs(self):
+        interpreter = PythonInterpreter()
+        run(interpreter, "var a = 1; fun f() { return a + 1; }")
+        self.assertEqual(run(interpreter, "a = f(); print a;"), "2\n")
+
+    def test_runtime_errors(self):
+        sources = {
+            'print "before";\nprint -"a";': "before\n[line 2]: [Interpreter] Operand must be a number \n",
+            "var a = 1;\na();": "[line 2]: [Interpreter] Can only call functions and classes. \n",
+            "fun f(a) {}\nf();": "[line 2]: [Interpreter] Expected 1 arguments but got 0. \n",
+            "var a = 1;\n\na.b = c;": "[line 3]: [Interpreter] Only instances have fields. \n",
+            "x = 1;": "[line 1]: Undefined variable x \n",
+        }
+        for source, expected in sources.items():
+            with self.subTest(source=source):
+                self.assertEqual(run(PythonInterpreter(), source), expected)
+
+    def test_module_cached_on_disk(self):
+        source = 'fun greet(name) { return "hi " + name; }\nprint greet("lox");'
+        with tempfile.TemporaryDirectory() as cache_dir:
+            interpreter = PythonInterpreter()
+            interpreter.cache_dir = Path(cache_dir)
+            self.assertFalse(interpreter.run_cached(PyLox, source))
+            self.assertEqual(run(interpreter, source), "hi lox\n")
+            self.assertEqual(len(list(Path(cache_dir).glob("lox_*.py"))), 1)
+
+            interpreter = PythonInterpreter()
+            interpreter.cache_dir = Path(cache_dir)
+            with unittest.mock.patch("sys.stdout", new_callable=io.StringIO) as mock_stdout:
+                self.assertTrue(interpreter.run_cached(PyLox, source))
+            self.assertEqual(mock_stdout.getvalue(), "hi lox\n")
@@ -0,0 +1,57 @@
+import unittest
+
+from pylox import PyLox
+from tests.programs import PROGRAMS, run
+from utils.interpreter import Interpreter
+from utils.parser import Parser
+from utils.scanner import Scanner
+from utils.vm import VM
+
+
+class TestVM(unittest.TestCase):
+    def tearDown(self):
+        PyLox._had_runtime_error = False
+
+    def test_matches_tree_walking_interpreter(self):
+        for source in PROGRAMS:
+            with self.subTest(source=source):
+                self.assertEqual(run(VM(), source), run(Interpreter(), source))
+
+    def test_deep_recursion(self):
+        source = """
+        fun count(n) {
+          if (n == 0) return 0;
+          return count(n - 1) + 1;
+        }
+        print count(5000);
+        """
+        self.assertEqual(run(VM(), source), "5000\n")
+
+    def test_stack_overflow(self):
+        source = "fun f() {\n  return f();\n}\nf();"
+        self.assertEqual(run(VM(), source), "[line 2]: [Interpreter] Stack overflow. \n")
+
+    def test_negative_zero_constant(self):
+        # Folding -0 makes a -0.0 constant, which equals 0.0 but must not take its slot
+        source = "print -0;\nprint 0;\nvar z = 0;\nprint z;"
+        self.assertEqual(run(VM(), source), "-0\n0\n0\n")
+        self.assertEqual(run(VM(), source), run(Interpreter(), source))
+
+    def test_disassemble(self):
+        statements = Parser(PyLox, Scanner(PyLox, "var a = 1;\nprint a + 2;").scan_tokens()).parse()
+        self.assertEqual(
+            VM().disassemble(statements),
+            "\n".join(
+                [
+                    "== <script> ==",
+                    "0000    1 CONSTANT            0 1.0",
+                    '0002    | DEFINE_GLOBAL       1 "a"',
+                    '0004    2 GET_GLOBAL          1 "a"',
+                    "0006    | CONSTANT            2 2.0",
+                    "0008    | ADD",
+                    "0009    | PRINT",
+                    "0010    | NIL",
+                    "0011    | RETURN",
+                ]
+            ),
+        )
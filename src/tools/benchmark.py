@@ -0,0 +1,214 @@
+"""
+Script to run the Lox programs in benchmarks/ and track their performance. Each program is run a number of times after
+warming up, timing every phase of the pipeline, and once more to measure its peak memory. The results are written to
+JSON and compared to a stored baseline, flagging programs that got slower by more than a threshold.
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import platform
+import statistics
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Dict, List, Optional
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from pylox import ENGINES, SCANNERS, PyLox  # noqa: E402
+from utils.optimizer import Optimizer  # noqa: E402
+from utils.parser import Parser  # noqa: E402
+from utils.regex_scanner import RegexScanner  # noqa: E402
+from utils.resolver import Resolver  # noqa: E402
+from utils.specializer import Specializer  # noqa: E402
+
+BENCHMARKS_DIR = Path(__file__).parent.parent.parent / "benchmarks"
+
+PHASES = ["scan", "parse", "resolve", "optimize", "interpret"]
+
+
+def parse_args() -> argparse.Namespace:
+    """
+    Parse arguments
+    """
+    parser = argparse.ArgumentParser(prog="benchmark", description="Lox benchmark runner")
+
+    parser.add_argument("names", nargs="*", help="Benchmarks to run, by file name without '.lox' (default all)")
+    parser.add_argument("--engine", default="tree", choices=list(ENGINES), help="Execution engine to run them on")
+    parser.add_argument("--scanner", default="regex", choices=list(SCANNERS), help="Scanner to scan them with")
+    parser.add_argument("--runs", default=5, type=int, help="Timed runs of each benchmark")
+    parser.add_argument("--warmup", default=1, type=int, help="Untimed runs of each benchmark before the timed ones")
+    parser.add_argument(
+        "--output", default=str(BENCHMARKS_DIR / "results.json"), type=str, help="JSON file to write the results to"
+    )
+    parser.add_argument(
+        "--baseline", default=str(BENCHMARKS_DIR / "baseline.json"), type=str, help="JSON results to compare with"
+    )
+    parser.add_argument(
+        "--threshold",
+        default=0.1,
+        type=float,
+        help="Fraction by which the median wall time can exceed the baseline's before it is flagged as a regression",
+    )
+    parser.add_argument(
+        "--save-baseline", action="store_true", help="Write the results to the baseline instead of comparing them"
+    )
+
+    return parser.parse_args()
+
+
+def run_once(source: str, engine: str, scanner: str) -> Dict[str, float]:
+    """
+    Run source through the pipeline on a new interpreter, returning the seconds each phase took
+    """
+    times = {}
+
+    start = time.perf_counter()
+    if scanner == "regex":
+        tokens = RegexScanner(PyLox, source).scan_store()
+    else:
+        tokens = SCANNERS[scanner](PyLox, source).scan_tokens()
+    times["scan"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    statements = Parser(PyLox, tokens).parse()
+    times["parse"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    Resolver(PyLox).resolve(statements)
+    times["resolve"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    statements = Optimizer().optimize(statements)
+    Specializer().specialize(statements)
+    times["optimize"] = time.perf_counter() - start
+
+    interpreter = ENGINES[engine]()
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        interpreter.interpret(PyLox, statements)
+    times["interpret"] = time.perf_counter() - start
+
+    if PyLox._had_error or PyLox._had_runtime_error:
+        raise RuntimeError("the benchmark reported an error")
+
+    times["wall"] = sum(times.values())
+    return times
+
+
+def run_benchmark(path: Path, engine: str, scanner: str, runs: int, warmup: int) -> Dict[str, object]:
+    """
+    Time a benchmark over runs after warming up, then measure its peak memory on one more run
+    """
+    source = path.read_text()
+    for _ in range(warmup):
+        run_once(source, engine, scanner)
+
+    samples = [run_once(source, engine, scanner) for _ in range(runs)]
+
+    tracemalloc.start()
+    try:
+        run_once(source, engine, scanner)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    walls = [sample["wall"] for sample in samples]
+    return {
+        "runs": runs,
+        "wall": {
+            "min": min(walls),
+            "median": statistics.median(walls),
+            "mean": statistics.mean(walls),
+            "stdev": statistics.stdev(walls) if runs > 1 else 0.0,
+        },
+        "phases": {phase: statistics.median(sample[phase] for sample in samples) for phase in PHASES},
+        "peak_memory": peak,
+    }
+
+
+def compare(results: Dict[str, object], baseline: Dict[str, object], threshold: float) -> List[str]:
+    """
+    Print how the median wall time of every benchmark changed from the baseline, returning the ones that regressed
+    """
+    regressions = []
+    print(f"\n{'benchmark':<16} {'baseline ms':>12} {'median ms':>12} {'change':>8}")
+    for name, result in results["benchmarks"].items():
+        previous = baseline["benchmarks"].get(name)
+        if previous is None:
+            print(f"{name:<16} {'-':>12} {result['wall']['median'] * 1000:>12.2f} {'new':>8}")
+            continue
+
+        change = result["wall"]["median"] / previous["wall"]["median"] - 1
+        flag = ""
+        if change > threshold:
+            regressions.append(name)
+            flag = "  REGRESSION"
+        print(
+            f"{name:<16} {previous['wall']['median'] * 1000:>12.2f} {result['wall']['median'] * 1000:>12.2f} "
+            f"{change:>+8.1%}{flag}"
+        )
+    return regressions
+
+
+def load(path: Path) -> Optional[Dict[str, object]]:
+    if not path.exists():
+        return None
+    with open(path, "r") as f:
+        return json.load(f)
+
+
+def save(results: Dict[str, object], path: Path) -> None:
+    with open(path, "w") as f:
+        json.dump(results, f, indent=2)
+        f.write("\n")
+
+
+if __name__ == "__main__":
+    args = parse_args()
+
+    paths = sorted(BENCHMARKS_DIR.glob("*.lox"))
+    if args.names:
+        paths = [path for path in paths if path.stem in args.names]
+
+    results = {
+        "engine": args.engine,
+        "scanner": args.scanner,
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "benchmarks": {},
+    }
+
+    print(f"{'benchmark':<16} {'median ms':>12} {'stdev ms':>10} {'peak KiB':>10}  " + " ".join(PHASES))
+    for path in paths:
+        result = run_benchmark(path, args.engine, args.scanner, args.runs, args.warmup)
+        results["benchmarks"][path.stem] = result
+        phases = " ".join(f"{result['phases'][phase] * 1000:.2f}" for phase in PHASES)
+        print(
+            f"{path.stem:<16} {result['wall']['median'] * 1000:>12.2f} {result['wall']['stdev'] * 1000:>10.2f} "
+            f"{result['peak_memory'] / 1024:>10.0f}  {phases}"
+        )
+
+    if args.save_baseline:
+        save(results, Path(args.baseline))
+        print(f"Baseline written to {args.baseline}")
+        sys.exit(0)
+
+    save(results, Path(args.output))
+    print(f"Results written to {args.output}")
+
+    baseline = load(Path(args.baseline))
+    if baseline is None:
+        print(f"No baseline at {args.baseline} to compare with, save one with --save-baseline")
+        sys.exit(0)
+    if baseline["engine"] != args.engine:
+        print(f"The baseline ran on the {baseline['engine']} engine, not {args.engine}")
+        sys.exit(0)
+
+    regressions = compare(results, baseline, args.threshold)
+    if regressions:
+        print(f"{len(regressions)} benchmark(s) regressed by more than {args.threshold:.0%}: {', '.join(regressions)}")
+        sys.exit(1)
@@ -45,9 +45,14 @@ class {base_name}(ABC):
     with open(out_path, "w") as f:
         f.write(base_class_str)
         for t in types:
-            class_name = t.split("=")[0].strip()
-            fields = t.split("=")[1].strip()
-            f.write(define_type(base_name, class_name, fields))
+            if "<" in t:
+                class_name, parent_name = t.split("<")
+                f.write(define_specialization(base_name, class_name.strip(), parent_name.strip()))
+                f.write("\n")
+                continue
+            class_name, fields = t.split("=", 1)
+            fields, _, annotations = fields.partition("|")
+            f.write(define_type(base_name, class_name.strip(), fields.strip(), annotations.strip()))
             f.write("\n")
 
 
@@ -59,8 +64,14 @@ def define_visitor(base_name, types) -> str:
     lines.append("    class Visitor(ABC):")
 
     for t in types:
-        class_name = t.split("=")[0].strip()
         lines.append("")
+        if "<" in t:
+            # Specializations default to the visit function of the type they specialize
+            class_name, parent_name = [name.strip().lower() for name in t.split("<")]
+            lines.append(f"        def visit_{class_name}_{base_name.lower()}(self, {base_name.lower()}):")
+            lines.append(f"            return self.visit_{parent_name}_{base_name.lower()}({base_name.lower()})")
+            continue
+        class_name = t.split("=")[0].strip()
         lines.append("        @abstractmethod")
         lines.append(f"        def visit_{class_name.lower()}_{base_name.lower()}(self, {base_name.lower()}):")
         lines.append("            pass")
@@ -69,9 +80,10 @@ def define_visitor(base_name, types) -> str:
     return out_str
 
 
-def define_type(base_name: str, class_name: str, field_list: str) -> str:
+def define_type(base_name: str, class_name: str, field_list: str, annotation_list: str = "") -> str:
     """
-    Generate expr type classes
+    Generate expr type classes. Annotations are attributes filled in after parsing, e.g. by the Resolver, and start
+    out with their default value.
     """
     lines = []
     lines.append(f"class {class_name}({base_name}):")
@@ -79,6 +91,10 @@ def define_type(base_name: str, class_name: str, field_list: str) -> str:
     for field in field_list.split(", "):
         name = field.split(": ")[0].lower()
         lines.append(f"        self.{name} = {name}")
+    if annotation_list:
+        for annotation in annotation_list.split(", "):
+            name, default = annotation.split(" = ")
+            lines.append(f"        self.{name.split(': ')[0].lower()} = {default}")
     lines.append("")
     lines.append("    def accept(self, visitor: Expr.Visitor):")
     lines.append(f"        return visitor.visit_{class_name.lower()}_{base_name.lower()}(self)")
@@ -89,40 +105,81 @@ def define_type(base_name: str, class_name: str, field_list: str) -> str:
         """
 
 
+def define_specialization(base_name: str, class_name: str, parent_name: str) -> str:
+    """
+    Generate a specialization of an expr type. It has the same fields as the type it specializes but is visited by
+    its own visit function, so visitors can handle it on a tighter path.
+    """
+    lines = []
+    lines.append(f"class {class_name}({parent_name}):")
+    lines.append("    def accept(self, visitor: Expr.Visitor):")
+    lines.append(f"        return visitor.visit_{class_name.lower()}_{base_name.lower()}(self)")
+
+    out_str = "\n".join(lines)
+    return f"""
+{out_str}
+        """
+
+
 if __name__ == "__main__":
     args = parse_args()
 
-    # Expr
+    # Expr. Variables resolved to a local get the depth of its scope and its slot in that scope, globals keep None.
+    # Globals get the cell of the variable once the interpreter first looks it up. Property sites get an inline cache
+    # once the interpreter first runs them.
     types = [
-        "Assign   = name: Token, value: Expr",
+        "Assign   = name: Token, value: Expr | depth: int = None, slot: int = None, cell: GlobalCell = None",
         "Binary   = left: Expr, operator: Token, right: Expr",
         "Call     = callee: Expr, paren: Token, arguments: List[Expr]",
-        "Get      = obj: Expr, name: Token",
+        "Get      = obj: Expr, name: Token | cache: InlineCache = None",
         "Grouping = expression: Expr",
         "Literal  = value: object",
         "Logical  = left: Expr, operator: Token, right: Expr",
-        "Set      = obj: Expr, name: Token, value: Expr",
-        "Super    = keyword: Token, method: Token",
-        "This     = keyword: Token",
+        "Set      = obj: Expr, name: Token, value: Expr | cache: InlineCache = None",
+        "Super    = keyword: Token, method: Token | depth: int = None, slot: int = None",
+        "This     = keyword: Token | depth: int = None, slot: int = None",
         "Unary    = operator: Token, right: Expr",
-        "Variable = name: Token",
+        "Variable = name: Token | depth: int = None, slot: int = None, cell: GlobalCell = None",
+    ]
+
+    # Operator specializations of Binary, Logical and Unary, and method invocations: calls of a property. The
+    # Specializer swaps them in after resolving.
+    types += [
+        "Add          < Binary",
+        "Subtract     < Binary",
+        "Multiply     < Binary",
+        "Divide       < Binary",
+        "Greater      < Binary",
+        "GreaterEqual < Binary",
+        "Less         < Binary",
+        "LessEqual    < Binary",
+        "Equal        < Binary",
+        "NotEqual     < Binary",
+        "And          < Logical",
+        "Or           < Logical",
+        "Negate       < Unary",
+        "Not          < Unary",
+        "Invoke       < Call",
     ]
 
     imports = ["from utils.token import Token", "from typing import List"]
 
     define_ast(args.out_dir, "Expr", types, imports)
 
-    # Stmt
+    # Stmt. The Parser records the line each statement starts on, including the ones it desugars for loops into. The
+    # Resolver records whether a function declares functions or classes that could capture its environment, and
+    # which returns return a call. The PurityAnalyzer marks functions whose calls can be memoized.
     types = [
-        "Block      = statements: List[Stmt]",
-        "Expression = expression: Expr",
-        "Function   = name: Token, params: List[Token], body: List[Stmt]",
-        "Class      = name: Token, superclass: Variable,  methods: List[Function]",
-        "If         = condition: Expr, then_branch: Stmt, else_branch: Stmt",
-        "Print      = expression: Expr",
-        "Return     = keyword: Token, value: Expr",
-        "Var        = name: Token, initializer: Expr",
-        "While      = condition: Expr, body: Stmt",
+        "Block      = statements: List[Stmt] | line: int = None",
+        "Expression = expression: Expr | line: int = None",
+        "Function   = name: Token, params: List[Token], body: List[Stmt]"
+        " | line: int = None, has_closures: bool = True, pure: bool = False",
+        "Class      = name: Token, superclass: Variable,  methods: List[Function] | line: int = None",
+        "If         = condition: Expr, then_branch: Stmt, else_branch: Stmt | line: int = None",
+        "Print      = expression: Expr | line: int = None",
+        "Return     = keyword: Token, value: Expr | line: int = None, tail_call: bool = False",
+        "Var        = name: Token, initializer: Expr | line: int = None",
+        "While      = condition: Expr, body: Stmt | line: int = None",
     ]
 
     imports = ["from typing import List", "from utils.expr import Expr, Variable", "from utils.token import Token"]
@@ -0,0 +1,431 @@
+from enum import Enum
+from typing import List, Optional
+
+from utils.chunk import OpCode
+from utils.expr import (
+    Assign,
+    Binary,
+    Call,
+    Expr,
+    Get,
+    Grouping,
+    Literal,
+    Logical,
+    Set,
+    Super,
+    This,
+    Unary,
+    Variable,
+)
+from utils.stmt import (
+    Block,
+    Class,
+    Expression,
+    Function,
+    If,
+    Print,
+    Return,
+    Stmt,
+    Var,
+    While,
+)
+from utils.token import Token
+from utils.token_type import TokenType
+from utils.vm_objects import VMFunction
+
+
+class FunctionType(Enum):
+    SCRIPT = 0
+    FUNCTION = 1
+    INITIALIZER = 2
+    METHOD = 3
+
+
+class Local:
+    """
+    Local variable living in a stack slot of the function being compiled
+    """
+
+    def __init__(self, name: str, depth: int):
+        self.name = name
+        self.depth = depth
+        self.is_captured = False  # Captured by a closure so it must be closed over when it goes out of scope
+
+
+class FunctionState:
+    """
+    Compiler state for the function currently being compiled
+    """
+
+    def __init__(self, enclosing: Optional["FunctionState"], function: VMFunction, function_type: FunctionType):
+        self.enclosing = enclosing
+        self.function = function
+        self.function_type = function_type
+        self.upvalues: List[tuple] = []  # (is_local, index) for each captured variable
+        self.scope_depth = 0
+
+        # Slot 0 holds the function being called, or "this" for methods and initializers
+        slot_zero = "this" if function_type in [FunctionType.METHOD, FunctionType.INITIALIZER] else ""
+        self.locals: List[Local] = [Local(slot_zero, 0)]
+
+
+class BytecodeCompiler(Expr.Visitor, Stmt.Visitor):
+    """
+    Compiles resolved statements into bytecode for the VM. Locals are assigned stack slots and variables captured by
+    closures become upvalues, everything not found in an enclosing scope is a global.
+    """
+
+    _BINARY_OPS = {
+        TokenType.PLUS: OpCode.ADD,
+        TokenType.MINUS: OpCode.SUBTRACT,
+        TokenType.STAR: OpCode.MULTIPLY,
+        TokenType.SLASH: OpCode.DIVIDE,
+        TokenType.EQUAL_EQUAL: OpCode.EQUAL,
+        TokenType.BANG_EQUAL: OpCode.NOT_EQUAL,
+        TokenType.GREATER: OpCode.GREATER,
+        TokenType.GREATER_EQUAL: OpCode.GREATER_EQUAL,
+        TokenType.LESS: OpCode.LESS,
+        TokenType.LESS_EQUAL: OpCode.LESS_EQUAL,
+    }
+
+    def __init__(self):
+        self._state: FunctionState = None
+        self._token: Token = None  # Most recent token seen, attached to instructions compiled without one
+
+    def compile(self, statements: List[Stmt]) -> VMFunction:
+        """
+        Compile a program into the function for the top-level script
+        """
+        self._state = FunctionState(None, VMFunction(None, 0), FunctionType.SCRIPT)
+        self._compile(statements)
+        return self._end_function()
+
+    def _compile(self, target) -> None:
+        if isinstance(target, list):
+            for x in target:
+                self._compile(x)
+        else:
+            if isinstance(target, Stmt) and target.line is not None:
+                self._set_line(target.line)
+            target.accept(self)
+
+    def _set_line(self, line: int) -> None:
+        """
+        Attach the instructions compiled from here on to line, until a token is seen
+        """
+        if self._token is None or self._token.line != line:
+            self._token = Token(TokenType.EOF, "", None, line)
+
+    @property
+    def _chunk(self):
+        return self._state.function.chunk
+
+    def _emit(self, *code: int, token: Token = None) -> int:
+        """
+        Append instructions and operands to the current chunk and return the offset of the last one
+        """
+        if token is not None:
+            self._token = token
+
+        for byte in code:
+            offset = self._chunk.write(byte, self._token)
+        return offset
+
+    def _emit_constant(self, value: object, token: Token = None) -> None:
+        self._emit(OpCode.CONSTANT, self._chunk.add_constant(value), token=token)
+
+    def _emit_jump(self, instruction: OpCode) -> int:
+        """
+        Emit a jump with a placeholder offset and return the operand offset to patch later
+        """
+        return self._emit(instruction, 0)
+
+    def _patch_jump(self, offset: int) -> None:
+        """
+        Make the jump operand at offset land on the next instruction
+        """
+        self._chunk.code[offset] = len(self._chunk.code) - offset - 1
+
+    def _emit_loop(self, loop_start: int) -> None:
+        self._emit(OpCode.LOOP, 0)
+        self._chunk.code[-1] = len(self._chunk.code) - loop_start
+
+    def _emit_return(self) -> None:
+        if self._state.function_type == FunctionType.INITIALIZER:
+            self._emit(OpCode.GET_LOCAL, 0)
+        else:
+            self._emit(OpCode.NIL)
+        self._emit(OpCode.RETURN)
+
+    def _end_function(self) -> VMFunction:
+        self._emit_return()
+        function = self._state.function
+        function.upvalue_count = len(self._state.upvalues)
+        return function
+
+    def _begin_scope(self) -> None:
+        self._state.scope_depth += 1
+
+    def _end_scope(self) -> None:
+        """
+        Pop the scope's locals off the stack, moving captured ones into their upvalues
+        """
+        state = self._state
+        state.scope_depth -= 1
+
+        while state.locals and state.locals[-1].depth > state.scope_depth:
+            if state.locals[-1].is_captured:
+                self._emit(OpCode.CLOSE_UPVALUE)
+            else:
+                self._emit(OpCode.POP)
+            state.locals.pop()
+
+    def _add_local(self, name: str) -> None:
+        self._state.locals.append(Local(name, self._state.scope_depth))
+
+    def _define_variable(self, name: Token) -> None:
+        """
+        Bind the value on top of the stack to a new variable
+        """
+        if self._state.scope_depth > 0:
+            # The value is already in the slot the local refers to
+            self._add_local(name.lexeme)
+            return
+
+        self._emit(OpCode.DEFINE_GLOBAL, self._chunk.add_constant(name.lexeme), token=name)
+
+    @staticmethod
+    def _resolve_local(state: FunctionState, name: str) -> int:
+        for i in reversed(range(len(state.locals))):
+            if state.locals[i].name == name:
+                return i
+        return -1
+
+    def _add_upvalue(self, state: FunctionState, is_local: bool, index: int) -> int:
+        upvalue = (is_local, index)
+        if upvalue in state.upvalues:
+            return state.upvalues.index(upvalue)
+
+        state.upvalues.append(upvalue)
+        return len(state.upvalues) - 1
+
+    def _resolve_upvalue(self, state: FunctionState, name: str) -> int:
+        """
+        Find name in the enclosing functions, threading it through each of them as an upvalue
+        """
+        if state.enclosing is None:
+            return -1
+
+        local = self._resolve_local(state.enclosing, name)
+        if local != -1:
+            state.enclosing.locals[local].is_captured = True
+            return self._add_upvalue(state, True, local)
+
+        upvalue = self._resolve_upvalue(state.enclosing, name)
+        if upvalue != -1:
+            return self._add_upvalue(state, False, upvalue)
+
+        return -1
+
+    def _named_variable(self, name: Token, assign: bool) -> None:
+        """
+        Emit a read, or a write of the value on top of the stack, of a local, upvalue or global variable
+        """
+        slot = self._resolve_local(self._state, name.lexeme)
+        if slot != -1:
+            self._emit(OpCode.SET_LOCAL if assign else OpCode.GET_LOCAL, slot, token=name)
+            return
+
+        upvalue = self._resolve_upvalue(self._state, name.lexeme)
+        if upvalue != -1:
+            self._emit(OpCode.SET_UPVALUE if assign else OpCode.GET_UPVALUE, upvalue, token=name)
+            return
+
+        constant = self._chunk.add_constant(name.lexeme)
+        self._emit(OpCode.SET_GLOBAL if assign else OpCode.GET_GLOBAL, constant, token=name)
+
+    def _function(self, stmt: Function, function_type: FunctionType) -> None:
+        """
+        Compile a function body in its own state and emit the closure creation in the enclosing function
+        """
+        self._state = FunctionState(self._state, VMFunction(stmt.name.lexeme, len(stmt.params)), function_type)
+        self._begin_scope()
+
+        for param in stmt.params:
+            self._add_local(param.lexeme)
+
+        self._compile(stmt.body)
+
+        state = self._state
+        function = self._end_function()
+        self._state = state.enclosing
+
+        self._emit(OpCode.CLOSURE, self._chunk.add_constant(function), token=stmt.name)
+        for is_local, index in state.upvalues:
+            self._emit(1 if is_local else 0, index)
+
+    def visit_block_stmt(self, stmt: Block) -> None:
+        self._begin_scope()
+        self._compile(stmt.statements)
+        self._end_scope()
+
+    def visit_class_stmt(self, stmt: Class) -> None:
+        if stmt.superclass is not None:
+            self._compile(stmt.superclass)
+        else:
+            self._emit(OpCode.NIL)
+
+        # Pops the superclass and leaves the class in its place, reporting errors at the superclass name
+        token = stmt.superclass.name if stmt.superclass is not None else stmt.name
+        self._emit(OpCode.CLASS, self._chunk.add_constant(stmt.name.lexeme), token=token)
+        self._define_variable(stmt.name)
+
+        if stmt.superclass is not None:
+            self._begin_scope()
+            self._compile(stmt.superclass)
+            self._add_local("super")
+
+        # Load the class again so that methods can be attached to it
+        self._named_variable(stmt.name, False)
+        for method in stmt.methods:
+            function_type = FunctionType.INITIALIZER if method.name.lexeme == "init" else FunctionType.METHOD
+            self._function(method, function_type)
+            self._emit(OpCode.METHOD, self._chunk.add_constant(method.name.lexeme), token=method.name)
+        self._emit(OpCode.POP)
+
+        if stmt.superclass is not None:
+            self._end_scope()
+
+    def visit_expression_stmt(self, stmt: Expression) -> None:
+        self._compile(stmt.expression)
+        self._emit(OpCode.POP)
+
+    def visit_function_stmt(self, stmt: Function) -> None:
+        if self._state.scope_depth > 0:
+            # Declare the local first so that the function can refer to itself
+            self._add_local(stmt.name.lexeme)
+            self._function(stmt, FunctionType.FUNCTION)
+            return
+
+        self._function(stmt, FunctionType.FUNCTION)
+        self._define_variable(stmt.name)
+
+    def visit_if_stmt(self, stmt: If) -> None:
+        self._compile(stmt.condition)
+
+        then_jump = self._emit_jump(OpCode.JUMP_IF_FALSE)
+        self._emit(OpCode.POP)
+        self._compile(stmt.then_branch)
+
+        else_jump = self._emit_jump(OpCode.JUMP)
+        self._patch_jump(then_jump)
+        self._emit(OpCode.POP)
+
+        if stmt.else_branch is not None:
+            self._compile(stmt.else_branch)
+        self._patch_jump(else_jump)
+
+    def visit_print_stmt(self, stmt: Print) -> None:
+        self._compile(stmt.expression)
+        self._emit(OpCode.PRINT)
+
+    def visit_return_stmt(self, stmt: Return) -> None:
+        if stmt.value is None:
+            self._token = stmt.keyword
+            self._emit_return()
+            return
+
+        self._compile(stmt.value)
+        self._emit(OpCode.RETURN, token=stmt.keyword)
+
+    def visit_var_stmt(self, stmt: Var) -> None:
+        if stmt.initializer is not None:
+            self._compile(stmt.initializer)
+        else:
+            self._emit(OpCode.NIL, token=stmt.name)
+
+        self._define_variable(stmt.name)
+
+    def visit_while_stmt(self, stmt: While) -> None:
+        loop_start = len(self._chunk.code)
+        self._compile(stmt.condition)
+
+        exit_jump = self._emit_jump(OpCode.JUMP_IF_FALSE)
+        self._emit(OpCode.POP)
+        self._compile(stmt.body)
+        self._emit_loop(loop_start)
+
+        self._patch_jump(exit_jump)
+        self._emit(OpCode.POP)
+
+    def visit_assign_expr(self, expr: Assign) -> None:
+        self._compile(expr.value)
+        self._named_variable(expr.name, True)
+
+    def visit_binary_expr(self, expr: Binary) -> None:
+        self._compile(expr.left)
+        self._compile(expr.right)
+        self._emit(self._BINARY_OPS[expr.operator.token_type], token=expr.operator)
+
+    def visit_call_expr(self, expr: Call) -> None:
+        self._compile(expr.callee)
+        self._compile(expr.arguments)
+        self._emit(OpCode.CALL, len(expr.arguments), token=expr.paren)
+
+    def visit_get_expr(self, expr: Get) -> None:
+        self._compile(expr.obj)
+        self._emit(OpCode.GET_PROPERTY, self._chunk.add_constant(expr.name.lexeme), token=expr.name)
+
+    def visit_grouping_expr(self, expr: Grouping) -> None:
+        self._compile(expr.expression)
+
+    def visit_literal_expr(self, expr: Literal) -> None:
+        if expr.value is None:
+            self._emit(OpCode.NIL)
+        elif expr.value is True:
+            self._emit(OpCode.TRUE)
+        elif expr.value is False:
+            self._emit(OpCode.FALSE)
+        else:
+            self._emit_constant(expr.value)
+
+    def visit_logical_expr(self, expr: Logical) -> None:
+        self._compile(expr.left)
+
+        if expr.operator.token_type == TokenType.AND:
+            end_jump = self._emit_jump(OpCode.JUMP_IF_FALSE)
+            self._emit(OpCode.POP)
+            self._compile(expr.right)
+            self._patch_jump(end_jump)
+            return
+
+        else_jump = self._emit_jump(OpCode.JUMP_IF_FALSE)
+        end_jump = self._emit_jump(OpCode.JUMP)
+        self._patch_jump(else_jump)
+        self._emit(OpCode.POP)
+        self._compile(expr.right)
+        self._patch_jump(end_jump)
+
+    def visit_set_expr(self, expr: Set) -> None:
+        self._compile(expr.obj)
+        self._compile(expr.value)
+        self._emit(OpCode.SET_PROPERTY, self._chunk.add_constant(expr.name.lexeme), token=expr.name)
+
+    def visit_super_expr(self, expr: Super) -> None:
+        self._named_variable(Token(TokenType.THIS, "this", None, expr.keyword.line), False)
+        self._named_variable(Token(TokenType.SUPER, "super", None, expr.keyword.line), False)
+        self._emit(OpCode.GET_SUPER, self._chunk.add_constant(expr.method.lexeme), token=expr.method)
+
+    def visit_this_expr(self, expr: This) -> None:
+        self._named_variable(expr.keyword, False)
+
+    def visit_unary_expr(self, expr: Unary) -> None:
+        self._compile(expr.right)
+
+        if expr.operator.token_type == TokenType.MINUS:
+            self._emit(OpCode.NEGATE, token=expr.operator)
+        else:
+            self._emit(OpCode.NOT, token=expr.operator)
+
+    def visit_variable_expr(self, expr: Variable) -> None:
+        self._named_variable(expr.name, False)
@@ -0,0 +1,83 @@
+from enum import IntEnum
+from typing import Dict, List, Tuple
+
+from utils.token import Token
+
+
+class OpCode(IntEnum):
+    """
+    Bytecode instructions. Operands, if any, follow the instruction in the next code slots.
+    """
+
+    CONSTANT = 0  # constant index
+    NIL = 1
+    TRUE = 2
+    FALSE = 3
+    POP = 4
+    GET_LOCAL = 5  # slot
+    SET_LOCAL = 6  # slot
+    GET_GLOBAL = 7  # constant index of name
+    DEFINE_GLOBAL = 8  # constant index of name
+    SET_GLOBAL = 9  # constant index of name
+    GET_UPVALUE = 10  # upvalue index
+    SET_UPVALUE = 11  # upvalue index
+    GET_PROPERTY = 12  # constant index of name
+    SET_PROPERTY = 13  # constant index of name
+    GET_SUPER = 14  # constant index of name
+    EQUAL = 15
+    NOT_EQUAL = 16
+    GREATER = 17
+    GREATER_EQUAL = 18
+    LESS = 19
+    LESS_EQUAL = 20
+    ADD = 21
+    SUBTRACT = 22
+    MULTIPLY = 23
+    DIVIDE = 24
+    NOT = 25
+    NEGATE = 26
+    PRINT = 27
+    JUMP = 28  # forward offset
+    JUMP_IF_FALSE = 29  # forward offset
+    LOOP = 30  # backward offset
+    CALL = 31  # argument count
+    CLOSURE = 32  # constant index of function, then (is_local, index) for each upvalue
+    CLOSE_UPVALUE = 33
+    RETURN = 34
+    CLASS = 35  # constant index of name
+    METHOD = 36  # constant index of name
+
+
+class Chunk:
+    """
+    Bytecode for a single function: a flat list of instructions and operands, one per slot, with a constants pool
+    """
+
+    def __init__(self):
+        self.code: List[int] = []
+        self.tokens: List[Token] = []  # Token each code slot was compiled from, used for errors and line numbers
+        self.constants: List[object] = []
+        self._constant_indices: Dict[Tuple[type, object], int] = {}  # (type, value): index of a primitive constant
+
+    def write(self, byte: int, token: Token) -> int:
+        """
+        Append an instruction or operand and return its offset
+        """
+        self.code.append(int(byte))
+        self.tokens.append(token)
+        return len(self.code) - 1
+
+    def add_constant(self, value: object) -> int:
+        """
+        Add value to the constants pool and return its index. Numbers and strings are only stored once.
+        """
+        if not isinstance(value, (float, str)):
+            self.constants.append(value)
+            return len(self.constants) - 1
+
+        # Key on the type too as 1.0 and "1" must not share a slot, and on the repr of numbers as -0.0 == 0.0
+        key = (float, repr(value)) if isinstance(value, float) else (str, value)
+        if key not in self._constant_indices:
+            self.constants.append(value)
+            self._constant_indices[key] = len(self.constants) - 1
+        return self._constant_indices[key]
@@ -0,0 +1,490 @@
+import operator
+from typing import Callable, List, Optional, Tuple, Union
+
+from utils.environment import UNDEFINED, Environment
+from utils.expr import (
+    Assign,
+    Binary,
+    Call,
+    Expr,
+    Get,
+    Grouping,
+    Literal,
+    Logical,
+    Set,
+    Super,
+    This,
+    Unary,
+    Variable,
+)
+from utils.interpreter import Interpreter
+from utils.lox_callable import LoxCallable
+from utils.lox_class import LoxClass
+from utils.lox_instance import LoxInstance
+from utils.runtime_error import PyLoxRuntimeError
+from utils.stmt import (
+    Block,
+    Class,
+    Expression,
+    Function,
+    If,
+    Print,
+    Return,
+    Stmt,
+    Var,
+    While,
+)
+from utils.token import Token
+from utils.token_type import TokenType
+
+# Compiled expressions take the current environment and return a value. Compiled statements take the current
+# environment and return None on normal completion or a 1-tuple holding the value of an executed return statement.
+ExprCode = Callable[[Environment], object]
+StmtCode = Callable[[Environment], Optional[Tuple[object]]]
+
+
+class CompiledFunction(LoxCallable):
+    """
+    LoxCallable whose body has already been compiled into closures
+    """
+
+    def __init__(self, declaration: Function, body: List[StmtCode], closure: Environment, is_initializer: bool):
+        self._declaration = declaration
+        self._body = body
+        self._closure = closure
+        self._is_initializer = is_initializer
+
+    def call(self, interpreter, arguments: List[object]) -> object:
+        environment = Environment(self._closure)
+        environment._values.extend(arguments)
+
+        for statement in self._body:
+            completion = statement(environment)
+            if completion is not None:
+                if self._is_initializer:
+                    return self._closure.get_at(0, 0)
+                return completion[0]
+
+        if self._is_initializer:
+            return self._closure.get_at(0, 0)
+
+    def arity(self) -> int:
+        return len(self._declaration.params)
+
+    def bind(self, instance: LoxInstance):
+        environment = Environment(self._closure)
+        environment.define(instance)
+        return CompiledFunction(self._declaration, self._body, environment, self._is_initializer)
+
+    def invoke(self, interpreter, instance: LoxInstance, arguments: List[object]) -> object:
+        """
+        Call the method bound to instance
+        """
+        return self.bind(instance).call(interpreter, arguments)
+
+    def __str__(self) -> str:
+        return f"<fn {self._declaration.name.lexeme}"
+
+
+class ClosureCompiler(Expr.Visitor, Stmt.Visitor):
+    """
+    Compiles resolved statements into a tree of specialized Python closures
+    """
+
+    def __init__(self, interpreter: Interpreter):
+        self._interpreter = interpreter
+        self._scope_depth = 0  # Number of scopes enclosing the code being compiled, 0 for globals
+
+    def compile(self, target):
+        if isinstance(target, list):
+            return [self.compile(x) for x in target]
+        return target.accept(self)
+
+    def _number_operands(self, token: Token, op: Callable[[float, float], object], left: ExprCode, right: ExprCode):
+        """
+        Compile a binary operator that only accepts numbers
+        """
+
+        def number_operands(env):
+            a = left(env)
+            b = right(env)
+            if a.__class__ is float and b.__class__ is float:
+                return op(a, b)
+            raise PyLoxRuntimeError(token, "[Interpreter] Operands must be numbers")
+
+        return number_operands
+
+    def _compile_body(self, statements: List[Stmt]) -> List[StmtCode]:
+        """
+        Compile statements executing in a new local scope
+        """
+        self._scope_depth += 1
+        code = self.compile(statements)
+        self._scope_depth -= 1
+        return code
+
+    def _define(self, name: Token) -> Callable[[Environment, object], None]:
+        """
+        Compile the definition of a variable declared in the current scope
+        """
+        if self._scope_depth == 0:
+            cell = self._interpreter.globals.cell(name.lexeme)
+
+            def define_global(env, value):
+                cell.value = value
+
+            return define_global
+
+        return lambda env, value: env._values.append(value)
+
+    def _lookup_variable(self, name: Token, expr: Union[This, Variable]) -> ExprCode:
+        """
+        Compile a read of a local variable at a known depth and slot or of a global variable
+        """
+        if expr.depth is None:
+            cell = self._interpreter.globals.cell(name.lexeme)
+
+            def global_variable(env):
+                value = cell.value
+                if value is UNDEFINED:
+                    raise PyLoxRuntimeError(name, f"Undefined variable {name.lexeme}")
+                return value
+
+            return global_variable
+
+        distance = expr.depth
+        slot = expr.slot
+        if distance == 0:
+            return lambda env: env._values[slot]
+
+        if distance == 1:
+            return lambda env: env._enclosing._values[slot]
+
+        return lambda env: env.get_at(distance, slot)
+
+    def visit_assign_expr(self, expr: Assign) -> ExprCode:
+        value = self.compile(expr.value)
+        name = expr.name
+
+        if expr.depth is None:
+            cell = self._interpreter.globals.cell(name.lexeme)
+
+            def assign_global(env):
+                result = value(env)
+                if cell.value is UNDEFINED:
+                    raise PyLoxRuntimeError(name, f"Undefined variable {name.lexeme}")
+                cell.value = result
+                return result
+
+            return assign_global
+
+        distance = expr.depth
+        slot = expr.slot
+
+        def assign_local(env):
+            result = value(env)
+            env.assign_at(distance, slot, result)
+            return result
+
+        return assign_local
+
+    def visit_binary_expr(self, expr: Binary) -> ExprCode:  # noqa C901
+        left = self.compile(expr.left)
+        right = self.compile(expr.right)
+        token = expr.operator
+        token_type = token.token_type
+
+        if token_type == TokenType.MINUS:
+            return self._number_operands(token, operator.sub, left, right)
+        if token_type == TokenType.SLASH:
+            return self._number_operands(token, operator.truediv, left, right)
+        if token_type == TokenType.STAR:
+            return self._number_operands(token, operator.mul, left, right)
+        if token_type == TokenType.GREATER:
+            return self._number_operands(token, operator.gt, left, right)
+        if token_type == TokenType.GREATER_EQUAL:
+            return self._number_operands(token, operator.ge, left, right)
+        if token_type == TokenType.LESS:
+            return self._number_operands(token, operator.lt, left, right)
+        if token_type == TokenType.LESS_EQUAL:
+            return self._number_operands(token, operator.le, left, right)
+
+        if token_type == TokenType.PLUS:
+
+            def plus(env):
+                a = left(env)
+                b = right(env)
+                if a.__class__ is float and b.__class__ is float:
+                    return a + b
+                if a.__class__ is str and b.__class__ is str:
+                    return a + b
+                raise PyLoxRuntimeError(token, "[Interpreter] Operands must be two numbers or two strings")
+
+            return plus
+
+        # Python equality matches Interpreter._is_equal for every Lox value
+        if token_type == TokenType.BANG_EQUAL:
+            return lambda env: not left(env) == right(env)
+        if token_type == TokenType.EQUAL_EQUAL:
+            return lambda env: left(env) == right(env)
+
+    def visit_call_expr(self, expr: Call) -> ExprCode:
+        callee = self.compile(expr.callee)
+        arguments = self.compile(expr.arguments)
+        paren = expr.paren
+        interpreter = self._interpreter
+
+        def call(env):
+            function = callee(env)
+            values = [argument(env) for argument in arguments]
+
+            if not isinstance(function, LoxCallable):
+                raise PyLoxRuntimeError(paren, "[Interpreter] Can only call functions and classes.")
+
+            if len(values) != function.arity():
+                raise PyLoxRuntimeError(
+                    paren, f"[Interpreter] Expected {function.arity()} arguments but got {len(values)}."
+                )
+
+            return function.call(interpreter, values)
+
+        return call
+
+    def visit_get_expr(self, expr: Get) -> ExprCode:
+        obj = self.compile(expr.obj)
+        name = expr.name
+
+        def get(env):
+            instance = obj(env)
+            if isinstance(instance, LoxInstance):
+                return instance.get(name)
+            raise PyLoxRuntimeError(name, "[Interpreter] Only instances have properties.")
+
+        return get
+
+    def visit_grouping_expr(self, expr: Grouping) -> ExprCode:
+        # A grouping only affects parsing so it compiles to its inner expression
+        return self.compile(expr.expression)
+
+    def visit_literal_expr(self, expr: Literal) -> ExprCode:
+        value = expr.value
+        return lambda env: value
+
+    def visit_logical_expr(self, expr: Logical) -> ExprCode:
+        left = self.compile(expr.left)
+        right = self.compile(expr.right)
+
+        if expr.operator.token_type == TokenType.OR:
+
+            def logical_or(env):
+                value = left(env)
+                if value is not None and value is not False:
+                    return value
+                return right(env)
+
+            return logical_or
+
+        def logical_and(env):
+            value = left(env)
+            if value is None or value is False:
+                return value
+            return right(env)
+
+        return logical_and
+
+    def visit_set_expr(self, expr: Set) -> ExprCode:
+        obj = self.compile(expr.obj)
+        value = self.compile(expr.value)
+        name = expr.name
+
+        def set_property(env):
+            instance = obj(env)
+            if not isinstance(instance, LoxInstance):
+                raise PyLoxRuntimeError(name, "[Interpreter] Only instances have fields.")
+
+            result = value(env)
+            instance.sett(name, result)
+            return result
+
+        return set_property
+
+    def visit_super_expr(self, expr: Super) -> ExprCode:
+        distance = expr.depth
+        slot = expr.slot
+        method_name = expr.method
+
+        def super_method(env):
+            superclass = env.get_at(distance, slot)
+            obj = env.get_at(distance - 1, 0)  # "this" is the only variable in its scope
+            method = superclass.find_method(method_name.lexeme)
+
+            if method is None:
+                raise PyLoxRuntimeError(method_name, f"[Interpreter] Undefined property {method_name.lexeme}.")
+
+            return method.bind(obj)
+
+        return super_method
+
+    def visit_this_expr(self, expr: This) -> ExprCode:
+        return self._lookup_variable(expr.keyword, expr)
+
+    def visit_unary_expr(self, expr: Unary) -> ExprCode:
+        right = self.compile(expr.right)
+        operator = expr.operator
+
+        if operator.token_type == TokenType.MINUS:
+
+            def negate(env):
+                value = right(env)
+                if value.__class__ is float:
+                    return -value
+                raise PyLoxRuntimeError(operator, "[Interpreter] Operand must be a number")
+
+            return negate
+
+        def bang(env):
+            value = right(env)
+            return value is None or value is False
+
+        return bang
+
+    def visit_variable_expr(self, expr: Variable) -> ExprCode:
+        return self._lookup_variable(expr.name, expr)
+
+    def visit_block_stmt(self, stmt: Block) -> StmtCode:
+        statements = self._compile_body(stmt.statements)
+
+        def block(env):
+            environment = Environment(env)
+            for statement in statements:
+                completion = statement(environment)
+                if completion is not None:
+                    return completion
+
+        return block
+
+    def visit_class_stmt(self, stmt: Class) -> StmtCode:
+        superclass_code = self.compile(stmt.superclass) if stmt.superclass is not None else None
+        methods_code = [(method, self._compile_body(method.body)) for method in stmt.methods]
+        define = self._define(stmt.name)
+
+        def klass(env):
+            superclass = None
+            if superclass_code is not None:
+                superclass = superclass_code(env)
+                if not isinstance(superclass, LoxClass):
+                    raise PyLoxRuntimeError(stmt.superclass.name, "[Interpreter] Superclass must be a class")
+
+            closure = env
+            if superclass_code is not None:
+                closure = Environment(env)
+                closure.define(superclass)
+
+            methods = {}
+            for method, body in methods_code:
+                methods[method.name.lexeme] = CompiledFunction(method, body, closure, method.name.lexeme == "init")
+
+            define(env, LoxClass(stmt.name.lexeme, superclass, methods))
+
+        return klass
+
+    def visit_expression_stmt(self, stmt: Expression) -> StmtCode:
+        expression = self.compile(stmt.expression)
+
+        def expression_statement(env):
+            expression(env)
+
+        return expression_statement
+
+    def visit_function_stmt(self, stmt: Function) -> StmtCode:
+        body = self._compile_body(stmt.body)
+        define = self._define(stmt.name)
+
+        def function(env):
+            define(env, CompiledFunction(stmt, body, env, False))
+
+        return function
+
+    def visit_if_stmt(self, stmt: If) -> StmtCode:
+        condition = self.compile(stmt.condition)
+        then_branch = self.compile(stmt.then_branch)
+        else_branch = self.compile(stmt.else_branch) if stmt.else_branch is not None else None
+
+        if else_branch is None:
+
+            def if_then(env):
+                value = condition(env)
+                if value is not None and value is not False:
+                    return then_branch(env)
+
+            return if_then
+
+        def if_then_else(env):
+            value = condition(env)
+            if value is not None and value is not False:
+                return then_branch(env)
+            return else_branch(env)
+
+        return if_then_else
+
+    def visit_print_stmt(self, stmt: Print) -> StmtCode:
+        expression = self.compile(stmt.expression)
+        stringify = self._interpreter._stringify
+
+        def print_statement(env):
+            print(stringify(expression(env)))
+
+        return print_statement
+
+    def visit_return_stmt(self, stmt: Return) -> StmtCode:
+        if stmt.value is None:
+            return lambda env: (None,)
+
+        value = self.compile(stmt.value)
+        return lambda env: (value(env),)
+
+    def visit_var_stmt(self, stmt: Var) -> StmtCode:
+        define = self._define(stmt.name)
+
+        if stmt.initializer is None:
+            return lambda env: define(env, None)
+
+        initializer = self.compile(stmt.initializer)
+
+        def var(env):
+            define(env, initializer(env))
+
+        return var
+
+    def visit_while_stmt(self, stmt: While) -> StmtCode:
+        condition = self.compile(stmt.condition)
+        body = self.compile(stmt.body)
+
+        def while_loop(env):
+            value = condition(env)
+            while value is not None and value is not False:
+                completion = body(env)
+                if completion is not None:
+                    return completion
+                value = condition(env)
+
+        return while_loop
+
+
+class ClosureInterpreter(Interpreter):
+    """
+    Executes statements by compiling them into closures once and then calling the closures
+    """
+
+    def interpret(self, pylox, statements: List[Stmt]) -> None:
+        """
+        Compiles and executes a list of statements
+        """
+        code = ClosureCompiler(self).compile(statements)
+
+        try:
+            for statement in code:
+                statement(self.globals)
+
+        except PyLoxRuntimeError as error:
+            pylox.runtime_error(error)
@@ -0,0 +1,11 @@
+from enum import Enum
+
+
+class Completion(Enum):
+    """
+    Signal returned by executing a statement that stops the statements after it from running. Executing a statement
+    normally returns None, so only statements that can contain a return need to check for it.
+    """
+
+    RETURN = 1  # A return statement ran, the value is stored on the interpreter
+    TAIL_CALL = 2  # A return statement returns a call to a LoxFunction, the callee and arguments are stored instead
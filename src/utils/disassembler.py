@@ -0,0 +1,92 @@
+from typing import List
+
+from utils.chunk import Chunk, OpCode
+from utils.vm_objects import VMFunction
+
+# Instructions whose operand is an index into the constants pool
+_CONSTANT_OPS = [
+    OpCode.CONSTANT,
+    OpCode.GET_GLOBAL,
+    OpCode.DEFINE_GLOBAL,
+    OpCode.SET_GLOBAL,
+    OpCode.GET_PROPERTY,
+    OpCode.SET_PROPERTY,
+    OpCode.GET_SUPER,
+    OpCode.CLASS,
+    OpCode.METHOD,
+]
+
+# Instructions with a single plain operand
+_OPERAND_OPS = [OpCode.GET_LOCAL, OpCode.SET_LOCAL, OpCode.GET_UPVALUE, OpCode.SET_UPVALUE, OpCode.CALL]
+
+
+def disassemble(function: VMFunction) -> str:
+    """
+    Disassemble a compiled function followed by every function nested in it
+    """
+    out = [disassemble_chunk(function.chunk, str(function))]
+    for constant in function.chunk.constants:
+        if isinstance(constant, VMFunction):
+            out.append(disassemble(constant))
+    return "\n".join(out)
+
+
+def disassemble_chunk(chunk: Chunk, name: str) -> str:
+    """
+    Disassemble every instruction in a chunk
+    """
+    lines = [f"== {name} =="]
+    offset = 0
+    while offset < len(chunk.code):
+        offset = disassemble_instruction(chunk, offset, lines)
+    return "\n".join(lines)
+
+
+def _format_constant(value: object) -> str:
+    if isinstance(value, str):
+        return f'"{value}"'
+    return str(value)
+
+
+def disassemble_instruction(chunk: Chunk, offset: int, lines: List[str]) -> int:
+    """
+    Append the instruction at offset to lines and return the offset of the next instruction
+    """
+    token = chunk.tokens[offset]
+    line = str(token.line) if token is not None else "?"
+    if offset > 0 and chunk.tokens[offset - 1] is not None and token is not None:
+        if chunk.tokens[offset - 1].line == token.line:
+            line = "|"
+    prefix = f"{offset:04d} {line:>4} "
+
+    instruction = OpCode(chunk.code[offset])
+    name = f"{instruction.name:<16}"
+
+    if instruction in _CONSTANT_OPS:
+        constant = chunk.code[offset + 1]
+        lines.append(f"{prefix}{name} {constant:4d} {_format_constant(chunk.constants[constant])}")
+        return offset + 2
+
+    if instruction in _OPERAND_OPS:
+        lines.append(f"{prefix}{name} {chunk.code[offset + 1]:4d}")
+        return offset + 2
+
+    if instruction in [OpCode.JUMP, OpCode.JUMP_IF_FALSE, OpCode.LOOP]:
+        jump = chunk.code[offset + 1]
+        target = offset + 2 - jump if instruction == OpCode.LOOP else offset + 2 + jump
+        lines.append(f"{prefix}{name} {offset:4d} -> {target}")
+        return offset + 2
+
+    if instruction == OpCode.CLOSURE:
+        constant = chunk.code[offset + 1]
+        function = chunk.constants[constant]
+        lines.append(f"{prefix}{name} {constant:4d} {function}")
+        offset += 2
+        for _ in range(function.upvalue_count):
+            is_local, index = chunk.code[offset], chunk.code[offset + 1]
+            lines.append(f"{offset:04d}    |                     {'local' if is_local else 'upvalue'} {index}")
+            offset += 2
+        return offset
+
+    lines.append(f"{prefix}{instruction.name}")
+    return offset + 1
@@ -1,4 +1,4 @@
-from typing import Dict
+from typing import Dict, List
 
 from utils.runtime_error import PyLoxRuntimeError
 from utils.token import Token
@@ -6,37 +6,30 @@ from utils.token import Token
 
 class Environment:
     """
-    Storage for bindings of associated variables to _values
+    Storage for the local variables of a scope. Variables live in the slot the Resolver assigned them, which is the
+    order they are declared in, so they are defined by appending and found by index.
     """
 
-    def __init__(self, environment=None):
-        self._values: Dict[str, object] = {}
-        self._enclosing: Environment = environment  # enclosing scope
-
-    def define(self, name: str, value: object) -> None:
-        self._values[name] = value
+    __slots__ = ("_values", "_enclosing")
 
-    def get(self, name: Token) -> object:
-        if name.lexeme in self._values:
-            return self._values[name.lexeme]
-
-        if self._enclosing is not None:
-            return self._enclosing.get(name)
+    def __init__(self, environment=None):
+        self._values: List[object] = []
+        self._enclosing = environment  # enclosing scope
 
-        raise PyLoxRuntimeError(name, f"Undefined variable {name.lexeme}")
+    def define(self, value: object) -> None:
+        self._values.append(value)
 
-    def get_at(self, distance: int, name: str) -> object:
+    def get_at(self, distance: int, slot: int) -> object:
         """
         Get variable value at a given scope depth
         """
-        if name in self._ancestor(distance)._values:
-            return self._ancestor(distance)._values[name]
+        return self._ancestor(distance)._values[slot]
 
-    def assign_at(self, distance: int, name: Token, value: object) -> None:
+    def assign_at(self, distance: int, slot: int, value: object) -> None:
         """
         Assign value to variable at a given scope depth
         """
-        self._ancestor(distance)._values[name.lexeme] = value
+        self._ancestor(distance)._values[slot] = value
 
     def _ancestor(self, distance: int):
         """
@@ -47,15 +40,55 @@ class Environment:
             environment = environment._enclosing
         return environment
 
-    def assign(self, name: Token, value: object) -> None:
+
+# Value of a global cell until its variable is defined, None is a valid Lox value
+UNDEFINED = object()
+
+
+class GlobalCell:
+    """
+    Storage for a single global variable. Nodes referring to a global keep a reference to its cell once they first
+    look it up, so reading or assigning it no longer goes through the name.
+    """
+
+    __slots__ = ("value",)
+
+    def __init__(self):
+        self.value = UNDEFINED
+
+
+class GlobalEnvironment:
+    """
+    Table of the cells of global variables, looked up by name as they are not resolved. A cell is created the first
+    time its name is looked up, even before the variable is defined, so that it can be handed out early.
+    """
+
+    def __init__(self):
+        self._cells: Dict[str, GlobalCell] = {}
+
+    def cell(self, name: str) -> GlobalCell:
         """
-        Assign variable to value and save in _values
+        Get the cell of a global variable, defined or not
         """
-        if name.lexeme in self._values:
-            self._values[name.lexeme] = value
-            return
+        cell = self._cells.get(name)
+        if cell is None:
+            cell = self._cells[name] = GlobalCell()
+        return cell
 
-        if self._enclosing is not None:
-            return self._enclosing.assign(name, value)
+    def define(self, name: str, value: object) -> None:
+        self.cell(name).value = value
+
+    def get(self, name: Token) -> object:
+        value = self.cell(name.lexeme).value
+        if value is UNDEFINED:
+            raise PyLoxRuntimeError(name, f"Undefined variable {name.lexeme}")
+        return value
 
-        raise PyLoxRuntimeError(name, f"Undefined variable {name.lexeme}")
+    def assign(self, name: Token, value: object) -> None:
+        """
+        Assign a value to a defined variable
+        """
+        cell = self.cell(name.lexeme)
+        if cell.value is UNDEFINED:
+            raise PyLoxRuntimeError(name, f"Undefined variable {name.lexeme}")
+        cell.value = value
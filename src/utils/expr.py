@@ -55,6 +55,51 @@ class Expr(ABC):
         @abstractmethod
         def visit_variable_expr(self, expr):
             pass
+
+        def visit_add_expr(self, expr):
+            return self.visit_binary_expr(expr)
+
+        def visit_subtract_expr(self, expr):
+            return self.visit_binary_expr(expr)
+
+        def visit_multiply_expr(self, expr):
+            return self.visit_binary_expr(expr)
+
+        def visit_divide_expr(self, expr):
+            return self.visit_binary_expr(expr)
+
+        def visit_greater_expr(self, expr):
+            return self.visit_binary_expr(expr)
+
+        def visit_greaterequal_expr(self, expr):
+            return self.visit_binary_expr(expr)
+
+        def visit_less_expr(self, expr):
+            return self.visit_binary_expr(expr)
+
+        def visit_lessequal_expr(self, expr):
+            return self.visit_binary_expr(expr)
+
+        def visit_equal_expr(self, expr):
+            return self.visit_binary_expr(expr)
+
+        def visit_notequal_expr(self, expr):
+            return self.visit_binary_expr(expr)
+
+        def visit_and_expr(self, expr):
+            return self.visit_logical_expr(expr)
+
+        def visit_or_expr(self, expr):
+            return self.visit_logical_expr(expr)
+
+        def visit_negate_expr(self, expr):
+            return self.visit_unary_expr(expr)
+
+        def visit_not_expr(self, expr):
+            return self.visit_unary_expr(expr)
+
+        def visit_invoke_expr(self, expr):
+            return self.visit_call_expr(expr)
     @abstractmethod
     def accept(self, visitor: Visitor):
         pass
@@ -64,6 +109,9 @@ class Assign(Expr):
     def __init__(self, name: Token, value: Expr):
         self.name = name
         self.value = value
+        self.depth = None
+        self.slot = None
+        self.cell = None
 
     def accept(self, visitor: Expr.Visitor):
         return visitor.visit_assign_expr(self)
@@ -93,6 +141,7 @@ class Get(Expr):
     def __init__(self, obj: Expr, name: Token):
         self.obj = obj
         self.name = name
+        self.cache = None
 
     def accept(self, visitor: Expr.Visitor):
         return visitor.visit_get_expr(self)
@@ -129,6 +178,7 @@ class Set(Expr):
         self.obj = obj
         self.name = name
         self.value = value
+        self.cache = None
 
     def accept(self, visitor: Expr.Visitor):
         return visitor.visit_set_expr(self)
@@ -138,6 +188,8 @@ class Super(Expr):
     def __init__(self, keyword: Token, method: Token):
         self.keyword = keyword
         self.method = method
+        self.depth = None
+        self.slot = None
 
     def accept(self, visitor: Expr.Visitor):
         return visitor.visit_super_expr(self)
@@ -146,6 +198,8 @@ class Super(Expr):
 class This(Expr):
     def __init__(self, keyword: Token):
         self.keyword = keyword
+        self.depth = None
+        self.slot = None
 
     def accept(self, visitor: Expr.Visitor):
         return visitor.visit_this_expr(self)
@@ -163,7 +217,85 @@ class Unary(Expr):
 class Variable(Expr):
     def __init__(self, name: Token):
         self.name = name
+        self.depth = None
+        self.slot = None
+        self.cell = None
 
     def accept(self, visitor: Expr.Visitor):
         return visitor.visit_variable_expr(self)
         
+
+class Add(Binary):
+    def accept(self, visitor: Expr.Visitor):
+        return visitor.visit_add_expr(self)
+        
+
+class Subtract(Binary):
+    def accept(self, visitor: Expr.Visitor):
+        return visitor.visit_subtract_expr(self)
+        
+
+class Multiply(Binary):
+    def accept(self, visitor: Expr.Visitor):
+        return visitor.visit_multiply_expr(self)
+        
+
+class Divide(Binary):
+    def accept(self, visitor: Expr.Visitor):
+        return visitor.visit_divide_expr(self)
+        
+
+class Greater(Binary):
+    def accept(self, visitor: Expr.Visitor):
+        return visitor.visit_greater_expr(self)
+        
+
+class GreaterEqual(Binary):
+    def accept(self, visitor: Expr.Visitor):
+        return visitor.visit_greaterequal_expr(self)
+        
+
+class Less(Binary):
+    def accept(self, visitor: Expr.Visitor):
+        return visitor.visit_less_expr(self)
+        
+
+class LessEqual(Binary):
+    def accept(self, visitor: Expr.Visitor):
+        return visitor.visit_lessequal_expr(self)
+        
+
+class Equal(Binary):
+    def accept(self, visitor: Expr.Visitor):
+        return visitor.visit_equal_expr(self)
+        
+
+class NotEqual(Binary):
+    def accept(self, visitor: Expr.Visitor):
+        return visitor.visit_notequal_expr(self)
+        
+
+class And(Logical):
+    def accept(self, visitor: Expr.Visitor):
+        return visitor.visit_and_expr(self)
+        
+
+class Or(Logical):
+    def accept(self, visitor: Expr.Visitor):
+        return visitor.visit_or_expr(self)
+        
+
+class Negate(Unary):
+    def accept(self, visitor: Expr.Visitor):
+        return visitor.visit_negate_expr(self)
+        
+
+class Not(Unary):
+    def accept(self, visitor: Expr.Visitor):
+        return visitor.visit_not_expr(self)
+        
+
+class Invoke(Call):
+    def accept(self, visitor: Expr.Visitor):
+        return visitor.visit_invoke_expr(self)
+        
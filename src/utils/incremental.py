@@ -0,0 +1,192 @@
+import hashlib
+from itertools import chain
+from typing import Dict, List, Optional, Tuple
+
+from utils.expr import Expr
+from utils.parser import Parser
+from utils.regex_scanner import RegexScanner
+from utils.resolver import Resolver
+from utils.stmt import Stmt
+from utils.token import Token
+from utils.token_store import TOKEN_CODES, TokenStore
+from utils.token_type import TokenType
+
+OPENERS = {TOKEN_CODES[TokenType.LEFT_PAREN], TOKEN_CODES[TokenType.LEFT_BRACE]}
+CLOSERS = {TOKEN_CODES[TokenType.RIGHT_PAREN], TOKEN_CODES[TokenType.RIGHT_BRACE]}
+# Tokens a declaration ends with, when they aren't nested in parentheses or braces
+ENDS = {TOKEN_CODES[TokenType.SEMICOLON], TOKEN_CODES[TokenType.RIGHT_BRACE]}
+ELSE = TOKEN_CODES[TokenType.ELSE]
+
+# Type: whether it is a kind of Expr or Stmt, for the types of the values in trees
+NODE_TYPES: Dict[type, bool] = {}
+
+
+class Declaration:
+    """
+    A top-level declaration of a program: the statements parsed and resolved from its source, the fingerprint of that
+    source and the line it starts on
+    """
+
+    __slots__ = ("statements", "fingerprint", "line", "reused")
+
+    def __init__(self, statements: List[Stmt], fingerprint: Optional[str], line: int, reused: bool):
+        self.statements = statements
+        self.fingerprint = fingerprint  # None if it had errors, so that it is parsed again
+        self.line = line
+        self.reused = reused  # Whether its statements came from the previous program
+
+
+class Program:
+    """
+    Statements of a source parsed and resolved by IncrementalParser, by top-level declaration
+    """
+
+    def __init__(self, source: str, declarations: List[Declaration], had_error: bool):
+        self.source = source
+        self.declarations = declarations
+        self.had_error = had_error
+
+    @property
+    def statements(self) -> List[Stmt]:
+        return [statement for declaration in self.declarations for statement in declaration.statements]
+
+    @property
+    def reused(self) -> int:
+        """
+        Number of declarations whose statements came from the previous program
+        """
+        return sum(declaration.reused for declaration in self.declarations)
+
+    @property
+    def parsed(self) -> int:
+        """
+        Number of declarations that were parsed and resolved
+        """
+        return len(self.declarations) - self.reused
+
+    def summary(self) -> str:
+        return f"{self.reused} of {len(self.declarations)} declarations reused, {self.parsed} parsed"
+
+
+class IncrementalParser:
+    """
+    Parses and resolves a source that is edited over and over, such as a file open in an editor, doing only the work
+    its edits call for. The source is split into top-level declarations, and a declaration whose text is the same as
+    one of the previous program's takes its statements instead of being parsed and resolved again, with their lines
+    moved if it moved. Resolving a top-level declaration doesn't depend on the others, since they only share globals.
+
+    The whole source is still scanned, scanning is quick and it is what finds where declarations start and end, as a
+    comment or string can swallow or free them. Scanner errors are reported on every parse, parser and resolver errors
+    only when the declarations they are in are parsed, as declarations with errors are never reused.
+
+    The statements of a program are reused in place: the previous program shouldn't be used after it is passed to
+    parse, and statements that will be optimized or interpreted, which changes them, should be copies.
+    """
+
+    def __init__(self, pylox):
+        """
+        :param pylox: PyLox object
+        """
+        self._pylox = pylox
+
+    def parse(self, source: str, previous: Optional[Program] = None) -> Program:
+        """
+        Parse and resolve source, reusing the statements of previous declarations with the same text
+        """
+        cache: Dict[str, List[Declaration]] = {}
+        if previous is not None:
+            for declaration in previous.declarations:
+                if declaration.fingerprint is not None:
+                    cache.setdefault(declaration.fingerprint, []).append(declaration)
+
+        had_error = self._pylox._had_error
+        self._pylox._had_error = False
+        store = RegexScanner(self._pylox, source).scan_store()
+        errors = self._pylox._had_error
+
+        declarations = []
+        for start, stop in split_declarations(store):
+            text = source[store.starts[start] : store.starts[stop - 1] + store.lengths[stop - 1]]
+            fingerprint = hashlib.sha256(text.encode()).hexdigest()
+            line = store.lines[start]
+
+            cached = cache.get(fingerprint)
+            if cached:
+                declaration = cached.pop()
+                shift_lines(declaration.statements, line - declaration.line)
+                declarations.append(Declaration(declaration.statements, fingerprint, line, True))
+                continue
+
+            self._pylox._had_error = False
+            eof = Token(TokenType.EOF, "", None, store.lines[stop])
+            statements = Parser(self._pylox, chain(store.tokens(start, stop), [eof])).parse()
+            if not self._pylox._had_error:
+                Resolver(self._pylox).resolve(statements)
+            if self._pylox._had_error:
+                errors = True
+                fingerprint = None
+            declarations.append(Declaration(statements, fingerprint, line, False))
+
+        self._pylox._had_error = had_error or errors
+        return Program(source, declarations, errors)
+
+
+def split_declarations(store: TokenStore) -> List[Tuple[int, int]]:
+    """
+    Ranges of the indexes of the tokens of each top-level declaration in store, the last of which is EOF. A
+    declaration ends with a ";" or "}" outside any parentheses or braces, unless an "else" follows it.
+    """
+    types = store.types
+    last = len(types) - 1
+    ranges = []
+    depth = 0
+    start = 0
+    for index in range(last):
+        code = types[index]
+        if code in OPENERS:
+            depth += 1
+        elif code in CLOSERS and depth > 0:
+            depth -= 1
+
+        if depth == 0 and code in ENDS and types[index + 1] != ELSE:
+            ranges.append((start, index + 1))
+            start = index + 1
+
+    if start < last:
+        ranges.append((start, last))
+    return ranges
+
+
+def shift_lines(statements: List[Stmt], delta: int) -> None:
+    """
+    Move the lines of the statements and tokens in trees by delta, once each
+    """
+    if delta == 0:
+        return
+
+    seen = set()
+    stack = list(statements)
+    while stack:
+        node = stack.pop()
+        if id(node) in seen:
+            continue
+        seen.add(id(node))
+
+        if type(node) is Token:
+            node.line += delta
+            continue
+        if getattr(node, "line", None) is not None:
+            node.line += delta
+        for value in vars(node).values():
+            kind = type(value)
+            if kind is list:
+                stack.extend(value)
+            elif kind is Token:
+                stack.append(value)
+            else:
+                # Expr and Stmt are abstract, so checking for their subclasses is slow without remembering them
+                is_node = NODE_TYPES.get(kind)
+                if is_node is None:
+                    is_node = NODE_TYPES[kind] = issubclass(kind, (Expr, Stmt))
+                if is_node:
+                    stack.append(value)
@@ -0,0 +1,86 @@
+from typing import Dict, List, Union
+
+from utils.lox_function import LoxFunction
+from utils.lox_instance import LoxInstance
+from utils.shape import Shape
+from utils.token import Token
+
+# Number of receiver layouts a site remembers before it is megamorphic and stops caching
+MAX_ENTRIES = 4
+
+
+class InlineCache:
+    """
+    Cache of property lookups at a single Get or Set site, keyed by the receiver's shape. Shapes are per class, so the
+    key covers both where a field lives and which method a name finds, and neither changes once created. A site that
+    sees one shape is monomorphic, up to MAX_ENTRIES polymorphic, and beyond that megamorphic, where it gives up
+    caching and always takes the generic path.
+
+    For a Get, an entry is the slot of the field or the method the name finds. For a Set, it is the slot of the field
+    or, when the field is added, the shape the instance moves to. The interpreter reads entries itself and only calls
+    into the cache on a miss.
+    """
+
+    __slots__ = ("entries", "megamorphic", "hits", "misses")
+
+    def __init__(self):
+        self.entries: Dict[Shape, Union[int, LoxFunction, Shape]] = {}
+        self.megamorphic = False
+        self.hits = 0
+        self.misses = 0
+
+    def get_miss(self, instance: LoxInstance, name: Token) -> object:
+        """
+        Look up a property the generic way and remember where it was found
+        """
+        self.misses += 1
+        value = instance.get(name)  # Raises for undefined properties, which are never cached
+
+        slot = instance.shape.slots.get(name.lexeme)
+        self._add(instance.shape, slot if slot is not None else instance.klass.find_method(name.lexeme))
+        return value
+
+    def set_miss(self, instance: LoxInstance, name: Token, value: object) -> None:
+        """
+        Set a field the generic way and remember where it went
+        """
+        self.misses += 1
+        shape = instance.shape
+        instance.sett(name, value)
+
+        slot = shape.slots.get(name.lexeme)
+        self._add(shape, slot if slot is not None else instance.shape)
+
+    def _add(self, shape: Shape, entry: Union[int, LoxFunction, Shape]) -> None:
+        if self.megamorphic:
+            return
+
+        if len(self.entries) == MAX_ENTRIES:
+            self.megamorphic = True
+            self.entries = {}
+            return
+
+        self.entries[shape] = entry
+
+
+class InlineCacheStats:
+    """
+    Hit and miss counts summed over inline caches
+    """
+
+    def __init__(self, caches: List[InlineCache]):
+        self.sites = len(caches)
+        self.hits = sum(cache.hits for cache in caches)
+        self.misses = sum(cache.misses for cache in caches)
+        self.polymorphic = sum(1 for cache in caches if len(cache.entries) > 1)
+        self.megamorphic = sum(1 for cache in caches if cache.megamorphic)
+
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def __str__(self) -> str:
+        return (
+            f"Inline caches: {self.sites} sites ({self.polymorphic} polymorphic, {self.megamorphic} megamorphic), "
+            f"{self.hits} hits, {self.misses} misses, {self.hit_rate():.1%} hit rate"
+        )
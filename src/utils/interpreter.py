@@ -1,27 +1,45 @@
-from typing import Any, Dict, List
+from typing import Any, List, Optional, Union
 
-from utils.environment import Environment
+from utils.completion import Completion
+from utils.environment import UNDEFINED, Environment, GlobalEnvironment
 from utils.expr import (
+    Add,
+    And,
     Assign,
     Binary,
     Call,
+    Divide,
+    Equal,
     Expr,
     Get,
+    Greater,
+    GreaterEqual,
     Grouping,
+    Invoke,
+    Less,
+    LessEqual,
     Literal,
     Logical,
+    Multiply,
+    Negate,
+    Not,
+    NotEqual,
+    Or,
     Set,
+    Subtract,
     Super,
     This,
     Unary,
     Variable,
 )
+from utils.inline_cache import InlineCache, InlineCacheStats
 from utils.lox_callable import LoxCallable
 from utils.lox_class import LoxClass
 from utils.lox_function import LoxFunction
 from utils.lox_instance import LoxInstance
 from utils.lox_native import Clock
-from utils.return_exception import ReturnException
+from utils.memo import Memo, MemoizedFunction
+from utils.purity import PurityAnalyzer
 from utils.runtime_error import PyLoxRuntimeError
 from utils.stmt import (
     Block,
@@ -45,45 +63,73 @@ class Interpreter(Expr.Visitor, Stmt.Visitor):
     """
 
     def __init__(self):
-        self.globals = Environment()  # Fixed reference to the outermost environment
+        self.globals = GlobalEnvironment()  # Fixed reference to the outermost environment
         self._environment = self.globals  # Changes as we enter and exit local scopes
-        self._locals: Dict[Expr, int] = {}  # Expr: scope depth
+        self._return_value = None  # Value of the last return statement, read by the function it returned from
+        self._tail_call = None  # (function, arguments) of the last tail call, made by the function it returned from
+        self._inline_caches: List[InlineCache] = []  # Caches of every Get and Set site that ran
+        self.frames: List[List] = []  # [function, statement running in its caller] of each Lox call in progress
+        self.current_statement: Optional[Stmt] = None  # Statement running in the innermost frame, for sampling
+        self.memo: Optional[Memo] = None  # Results of pure function calls, when memoizing them
+        self._purity = PurityAnalyzer()
 
         # Define native functions
-        self._environment.define("clock", Clock())
+        self.globals.define("clock", Clock())
 
     def interpret(self, pylox, statements: List[Stmt]) -> None:
         """
         Executes a list of statements
         """
+        if self.memo is not None:
+            self._purity.analyze(statements)
+
         try:
             for statement in statements:
+                self.current_statement = statement
                 self._execute(statement)
 
         except PyLoxRuntimeError as error:
+            self.frames.clear()  # Calls in progress were abandoned
             pylox.runtime_error(error)
 
-    def _execute(self, stmt: Stmt) -> None:
+    def inline_cache_stats(self) -> InlineCacheStats:
+        """
+        Get hit and miss counts of the property inline caches
+        """
+        return InlineCacheStats(self._inline_caches)
+
+    def _new_inline_cache(self) -> InlineCache:
+        cache = InlineCache()
+        self._inline_caches.append(cache)
+        return cache
+
+    def _execute(self, stmt: Stmt) -> Optional[Completion]:
         """
         Call corresponding visitor  function
         """
-        stmt.accept(self)
+        return stmt.accept(self)
 
-    def resolve(self, expr: Expr, depth: int) -> None:
+    def _define(self, name: str, value: object) -> None:
         """
-        Resolve by updating expression given scope depth
+        Define a variable in the current scope. Locals take the next slot, globals are stored by name.
         """
-        self._locals.update({expr: depth})
+        if self._environment is self.globals:
+            self.globals.define(name, value)
+        else:
+            self._environment.define(value)
 
-    def _execute_block(self, statements: List[Stmt], environment: Environment) -> None:
+    def _execute_block(self, statements: List[Stmt], environment: Environment) -> Optional[Completion]:
         previous = self._environment
 
         try:
             self._environment = environment  # Set environment to enclosing
 
             for statement in statements:
-                self._execute(statement)
-        # Don't except Exceptions here as it would override ReturnException
+                self.current_statement = statement
+                completion = statement.accept(self)
+                if completion is not None:
+                    return completion  # Stop at a return, the finally still restores the environment
+        # Don't except Exceptions here, runtime errors have to reach interpret
         finally:
             self._environment = previous  # Set environment back to original
 
@@ -140,29 +186,39 @@ class Interpreter(Expr.Visitor, Stmt.Visitor):
     def _evaluate(self, expr) -> Any:
         return expr.accept(self)
 
-    def _lookup_variable(self, name: Token, expr: Expr) -> object:
+    def _lookup_variable(self, name: Token, expr: Union[This, Variable]) -> object:
         """
         Get object value given variable
         """
-        # Get from corresponding scope if expr is found in locals
-        if expr in self._locals:
-            distance = self._locals[expr]
-            return self._environment.get_at(distance, name.lexeme)
-
-        return self.globals.get(name)
+        # Get from corresponding scope if the Resolver found it in a local scope
+        if expr.depth is not None:
+            return self._environment.get_at(expr.depth, expr.slot)
+
+        cell = expr.cell
+        if cell is None:
+            cell = expr.cell = self.globals.cell(name.lexeme)
+        value = cell.value
+        if value is UNDEFINED:
+            raise PyLoxRuntimeError(name, f"Undefined variable {name.lexeme}")
+        return value
 
     def visit_assign_expr(self, expr: Assign) -> Any:
         value = self._evaluate(expr.value)
 
-        if expr in self._locals:
-            distance = self._locals[expr]
-            self._environment.assign_at(distance, expr.name, value)
-        else:
-            self.globals.assign(expr.name, value)
+        if expr.depth is not None:
+            self._environment.assign_at(expr.depth, expr.slot, value)
+            return value
+
+        cell = expr.cell
+        if cell is None:
+            cell = expr.cell = self.globals.cell(expr.name.lexeme)
+        if cell.value is UNDEFINED:
+            raise PyLoxRuntimeError(expr.name, f"Undefined variable {expr.name.lexeme}")
+        cell.value = value
         return value
 
-    def visit_block_stmt(self, stmt: Block) -> None:
-        self._execute_block(stmt.statements, Environment(self._environment))
+    def visit_block_stmt(self, stmt: Block) -> Optional[Completion]:
+        return self._execute_block(stmt.statements, Environment(self._environment))
 
     def visit_class_stmt(self, stmt: Class) -> None:
         superclass = None
@@ -171,11 +227,9 @@ class Interpreter(Expr.Visitor, Stmt.Visitor):
             if not isinstance(superclass, LoxClass):
                 raise PyLoxRuntimeError(stmt.superclass.name, "[Interpreter] Superclass must be a class")
 
-        self._environment.define(stmt.name.lexeme, None)
-
         if stmt.superclass is not None:
             self._environment = Environment(self._environment)
-            self._environment.define("super", superclass)
+            self._environment.define(superclass)
 
         methods = {}
         for method in stmt.methods:
@@ -187,42 +241,61 @@ class Interpreter(Expr.Visitor, Stmt.Visitor):
         if superclass is not None:
             self._environment = self._environment._enclosing
 
-        self._environment.assign(stmt.name, klass)
+        # Nothing can observe the class name before this so define it once the class exists
+        self._define(stmt.name.lexeme, klass)
 
     def visit_expression_stmt(self, stmt: Expression) -> None:
         self._evaluate(stmt.expression)
 
     def visit_function_stmt(self, stmt: Function) -> None:
-        function = LoxFunction(stmt, self._environment, False)
-        self._environment.define(stmt.name.lexeme, function)
+        if stmt.pure and self.memo is not None:
+            function = MemoizedFunction(stmt, self._environment, self.memo)
+        else:
+            function = LoxFunction(stmt, self._environment, False)
+        self._define(stmt.name.lexeme, function)
 
-    def visit_if_stmt(self, stmt: If) -> None:
+    def visit_if_stmt(self, stmt: If) -> Optional[Completion]:
         if self._is_truthy(self._evaluate(stmt.condition)):
-            self._execute(stmt.then_branch)
+            return self._execute(stmt.then_branch)
         elif stmt.else_branch is not None:
-            self._execute(stmt.else_branch)
+            return self._execute(stmt.else_branch)
 
     def visit_print_stmt(self, stmt: Print) -> None:
         value = self._evaluate(stmt.expression)
         print(self._stringify(value))
 
-    def visit_return_stmt(self, stmt: Return) -> None:
+    def visit_return_stmt(self, stmt: Return) -> Completion:
+        if stmt.tail_call:
+            # Leave calls to Lox functions to the returning function, which makes them without nesting
+            expr = stmt.value
+            callee = self._evaluate(expr.callee)
+            arguments = [self._evaluate(argument) for argument in expr.arguments]
+            if isinstance(callee, LoxFunction) and len(arguments) == callee.arity():
+                self._tail_call = (callee, arguments)
+                return Completion.TAIL_CALL
+
+            self._return_value = self._call(expr, callee, arguments)
+            return Completion.RETURN
+
         value = None
         if stmt.value is not None:
             value = self._evaluate(stmt.value)
 
-        raise ReturnException(value)
+        self._return_value = value
+        return Completion.RETURN
 
     def visit_var_stmt(self, stmt: Var) -> None:
         value = None
         if stmt.initializer is not None:
             value = self._evaluate(stmt.initializer)
 
-        self._environment.define(stmt.name.lexeme, value)
+        self._define(stmt.name.lexeme, value)
 
-    def visit_while_stmt(self, stmt: While) -> None:
+    def visit_while_stmt(self, stmt: While) -> Optional[Completion]:
         while self._is_truthy(self._evaluate(stmt.condition)):
-            self._execute(stmt.body)
+            completion = self._execute(stmt.body)
+            if completion is not None:
+                return completion
 
     def visit_call_expr(self, expr: Call) -> Expr:
         callee = self._evaluate(expr.callee)
@@ -231,6 +304,12 @@ class Interpreter(Expr.Visitor, Stmt.Visitor):
         for argument in expr.arguments:
             arguments.append(self._evaluate(argument))
 
+        return self._call(expr, callee, arguments)
+
+    def _call(self, expr: Call, callee: object, arguments: List[object]) -> object:
+        """
+        Call callee with evaluated arguments
+        """
         if not isinstance(callee, LoxCallable):
             raise PyLoxRuntimeError(expr.paren, "[Interpreter] Can only call functions and classes.")
 
@@ -260,9 +339,8 @@ class Interpreter(Expr.Visitor, Stmt.Visitor):
         return self._evaluate(expr.right)
 
     def visit_super_expr(self, expr: Super) -> object:
-        distance = self._locals[expr]
-        superclass = self._environment.get_at(distance, "super")
-        obj = self._environment.get_at(distance - 1, "this")
+        superclass = self._environment.get_at(expr.depth, expr.slot)
+        obj = self._environment.get_at(expr.depth - 1, 0)  # "this" is the only variable in its scope
         method = superclass.find_method(expr.method.lexeme)
 
         if method is None:
@@ -277,7 +355,21 @@ class Interpreter(Expr.Visitor, Stmt.Visitor):
             raise PyLoxRuntimeError(expr.name, "[Interpreter] Only instances have fields.")
 
         value = self._evaluate(expr.value)
-        obj.sett(expr.name, value)
+
+        cache = expr.cache
+        if cache is None:
+            cache = expr.cache = self._new_inline_cache()
+
+        entry = cache.entries.get(obj.shape)
+        if entry is None:
+            cache.set_miss(obj, expr.name, value)
+        elif entry.__class__ is int:
+            cache.hits += 1
+            obj.values[entry] = value
+        else:  # Adds the field
+            cache.hits += 1
+            obj.shape = entry
+            obj.values.append(value)
         return value
 
     def visit_this_expr(self, expr: This) -> object:
@@ -285,62 +377,197 @@ class Interpreter(Expr.Visitor, Stmt.Visitor):
 
     def visit_get_expr(self, expr: Get) -> object:
         obj = self._evaluate(expr.obj)
-        if isinstance(obj, LoxInstance):
-            return obj.get(expr.name)
+        if not isinstance(obj, LoxInstance):
+            raise PyLoxRuntimeError(expr.name, "[Interpreter] Only instances have properties.")
 
-        raise PyLoxRuntimeError(expr.name, "[Interpreter] Only instances have properties.")
+        cache = expr.cache
+        if cache is None:
+            cache = expr.cache = self._new_inline_cache()
+
+        entry = cache.entries.get(obj.shape)
+        if entry is None:
+            return cache.get_miss(obj, expr.name)
+        cache.hits += 1
+        if entry.__class__ is int:
+            return obj.values[entry]
+        return entry.bind(obj)
 
     def visit_grouping_expr(self, expr: Grouping) -> Expr:
         return self._evaluate(expr.expression)
 
     def visit_unary_expr(self, expr: Unary) -> Any:
-        right = self._evaluate(expr.right)
+        return self._apply_unary(expr.operator, self._evaluate(expr.right))
 
-        if expr.operator.token_type == TokenType.MINUS:
-            self._check_number_operand(expr.operator, right)
+    def _apply_unary(self, operator: Token, right: object) -> Any:
+        """
+        Apply a unary operator to its evaluated operand
+        """
+        if operator.token_type == TokenType.MINUS:
+            self._check_number_operand(operator, right)
             return -float(right)
-        elif expr.operator.token_type == TokenType.BANG:
+        elif operator.token_type == TokenType.BANG:
             return not self._is_truthy(right)
 
     def visit_variable_expr(self, expr: Variable) -> object:
         return self._lookup_variable(expr.name, expr)
 
-    def visit_binary_expr(self, expr: Binary) -> Any:  # noqa C901
-        left = self._evaluate(expr.left)
-        right = self._evaluate(expr.right)
+    def visit_binary_expr(self, expr: Binary) -> Any:
+        return self._apply_binary(expr.operator, self._evaluate(expr.left), self._evaluate(expr.right))
 
-        if expr.operator.token_type == TokenType.MINUS:
-            self._check_number_operands(expr.operator, left, right)
+    def _apply_binary(self, operator: Token, left: object, right: object) -> Any:  # noqa C901
+        """
+        Apply a binary operator to its evaluated operands
+        """
+        if operator.token_type == TokenType.MINUS:
+            self._check_number_operands(operator, left, right)
             return float(left) - float(right)
-        if expr.operator.token_type == TokenType.SLASH:
-            self._check_number_operands(expr.operator, left, right)
+        if operator.token_type == TokenType.SLASH:
+            self._check_number_operands(operator, left, right)
             return left / right
-        if expr.operator.token_type == TokenType.STAR:
-            self._check_number_operands(expr.operator, left, right)
+        if operator.token_type == TokenType.STAR:
+            self._check_number_operands(operator, left, right)
             return left * right
-        if expr.operator.token_type == TokenType.PLUS:
+        if operator.token_type == TokenType.PLUS:
             if isinstance(left, float) and isinstance(right, float):
                 return float(left) + float(right)
 
             if isinstance(left, str) and isinstance(right, str):
                 return str(left) + str(right)
 
-            raise PyLoxRuntimeError(expr.operator, "[Interpreter] Operands must be two numbers or two strings")
+            raise PyLoxRuntimeError(operator, "[Interpreter] Operands must be two numbers or two strings")
 
-        if expr.operator.token_type == TokenType.GREATER:
-            self._check_number_operands(expr.operator, left, right)
+        if operator.token_type == TokenType.GREATER:
+            self._check_number_operands(operator, left, right)
             return left > right
-        if expr.operator.token_type == TokenType.GREATER_EQUAL:
-            self._check_number_operands(expr.operator, left, right)
+        if operator.token_type == TokenType.GREATER_EQUAL:
+            self._check_number_operands(operator, left, right)
             return left >= right
-        if expr.operator.token_type == TokenType.LESS:
-            self._check_number_operands(expr.operator, left, right)
+        if operator.token_type == TokenType.LESS:
+            self._check_number_operands(operator, left, right)
             return left < right
-        if expr.operator.token_type == TokenType.LESS_EQUAL:
-            self._check_number_operands(expr.operator, left, right)
+        if operator.token_type == TokenType.LESS_EQUAL:
+            self._check_number_operands(operator, left, right)
             return left <= right
 
-        if expr.operator.token_type == TokenType.BANG_EQUAL:
+        if operator.token_type == TokenType.BANG_EQUAL:
             return not self._is_equal(left, right)
-        if expr.operator.token_type == TokenType.EQUAL_EQUAL:
+        if operator.token_type == TokenType.EQUAL_EQUAL:
             return self._is_equal(left, right)
+
+    # Operator specializations swapped in by the Specializer. Each one only does the work of its own operator, and
+    # operand checks only fall back to the generic helpers to report errors.
+
+    def visit_add_expr(self, expr: Add) -> Any:
+        left = expr.left.accept(self)
+        right = expr.right.accept(self)
+        if isinstance(left, float) and isinstance(right, float):
+            return left + right
+        if isinstance(left, str) and isinstance(right, str):
+            return left + right
+        raise PyLoxRuntimeError(expr.operator, "[Interpreter] Operands must be two numbers or two strings")
+
+    def visit_subtract_expr(self, expr: Subtract) -> Any:
+        left = expr.left.accept(self)
+        right = expr.right.accept(self)
+        if isinstance(left, float) and isinstance(right, float):
+            return left - right
+        self._check_number_operands(expr.operator, left, right)
+
+    def visit_multiply_expr(self, expr: Multiply) -> Any:
+        left = expr.left.accept(self)
+        right = expr.right.accept(self)
+        if isinstance(left, float) and isinstance(right, float):
+            return left * right
+        self._check_number_operands(expr.operator, left, right)
+
+    def visit_divide_expr(self, expr: Divide) -> Any:
+        left = expr.left.accept(self)
+        right = expr.right.accept(self)
+        if isinstance(left, float) and isinstance(right, float):
+            return left / right
+        self._check_number_operands(expr.operator, left, right)
+
+    def visit_greater_expr(self, expr: Greater) -> Any:
+        left = expr.left.accept(self)
+        right = expr.right.accept(self)
+        if isinstance(left, float) and isinstance(right, float):
+            return left > right
+        self._check_number_operands(expr.operator, left, right)
+
+    def visit_greaterequal_expr(self, expr: GreaterEqual) -> Any:
+        left = expr.left.accept(self)
+        right = expr.right.accept(self)
+        if isinstance(left, float) and isinstance(right, float):
+            return left >= right
+        self._check_number_operands(expr.operator, left, right)
+
+    def visit_less_expr(self, expr: Less) -> Any:
+        left = expr.left.accept(self)
+        right = expr.right.accept(self)
+        if isinstance(left, float) and isinstance(right, float):
+            return left < right
+        self._check_number_operands(expr.operator, left, right)
+
+    def visit_lessequal_expr(self, expr: LessEqual) -> Any:
+        left = expr.left.accept(self)
+        right = expr.right.accept(self)
+        if isinstance(left, float) and isinstance(right, float):
+            return left <= right
+        self._check_number_operands(expr.operator, left, right)
+
+    def visit_equal_expr(self, expr: Equal) -> bool:
+        # Same as _is_equal: nil only equals nil
+        return expr.left.accept(self) == expr.right.accept(self)
+
+    def visit_notequal_expr(self, expr: NotEqual) -> bool:
+        return expr.left.accept(self) != expr.right.accept(self)
+
+    def visit_and_expr(self, expr: And) -> Any:
+        left = expr.left.accept(self)
+        if left is None or left is False:
+            return left
+        return expr.right.accept(self)
+
+    def visit_or_expr(self, expr: Or) -> Any:
+        left = expr.left.accept(self)
+        if left is None or left is False:
+            return expr.right.accept(self)
+        return left
+
+    def visit_negate_expr(self, expr: Negate) -> Any:
+        right = expr.right.accept(self)
+        if isinstance(right, float):
+            return -right
+        self._check_number_operand(expr.operator, right)
+
+    def visit_not_expr(self, expr: Not) -> bool:
+        right = expr.right.accept(self)
+        return right is None or right is False
+
+    def visit_invoke_expr(self, expr: Invoke) -> object:
+        get = expr.callee
+        obj = self._evaluate(get.obj)
+        if not isinstance(obj, LoxInstance):
+            raise PyLoxRuntimeError(get.name, "[Interpreter] Only instances have properties.")
+
+        cache = get.cache
+        if cache is None:
+            cache = get.cache = self._new_inline_cache()
+
+        entry = cache.entries.get(obj.shape)
+        if entry is None or entry.__class__ is int:
+            # Fields and misses evaluate the property as a Get would
+            if entry is None:
+                callee = cache.get_miss(obj, get.name)
+            else:
+                cache.hits += 1
+                callee = obj.values[entry]
+            return self._call(expr, callee, [self._evaluate(argument) for argument in expr.arguments])
+
+        cache.hits += 1
+        arguments = [self._evaluate(argument) for argument in expr.arguments]
+        if len(arguments) != len(entry._declaration.params):
+            raise PyLoxRuntimeError(
+                expr.paren, f"[Interpreter] Expected {entry.arity()} arguments but got {len(arguments)}."
+            )
+        return entry.invoke(self, obj, arguments)
@@ -0,0 +1,111 @@
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+
+from utils.interpreter import Interpreter
+
+
+class LineProfile:
+    """
+    Counters of a source line: how many statements starting on it ran, and the time they took without the statements
+    nested in them
+    """
+
+    __slots__ = ("hits", "time")
+
+    def __init__(self):
+        self.hits = 0
+        self.time = 0.0
+
+
+class LineProfiler:
+    """
+    Counts the statements run on every source line and times them. While started, it replaces the statement visit
+    functions of the Interpreter with ones that do so, and puts the originals back when stopped.
+
+    The time of a statement doesn't include the statements nested in it, such as the body of a loop or of a called
+    function, so the times of all lines add up to the time spent running statements. A for loop runs as the
+    statements it desugars into: its initializer and increment count on their own lines, the rest on the line of the
+    "for".
+    """
+
+    def __init__(self):
+        self.lines: Dict[int, LineProfile] = {}
+        self._frames: List[List] = []  # [start time, time spent in nested statements] of running statements
+        self._patched: List[Tuple[str, Callable]] = []
+
+    def start(self) -> None:
+        for name in dir(Interpreter):
+            if name.startswith("visit_") and name.endswith("_stmt"):
+                self._patch(name)
+
+    def stop(self) -> None:
+        for name, original in reversed(self._patched):
+            setattr(Interpreter, name, original)
+        self._patched = []
+
+    def _patch(self, name: str) -> None:
+        """
+        Replace a statement visit function of the Interpreter with one that counts and times the statement
+        """
+        original = getattr(Interpreter, name)
+        frames = self._frames
+
+        def profiled(interpreter, stmt):
+            line = stmt.line
+            if line is None:
+                return original(interpreter, stmt)  # Made up by the Optimizer, its time counts for the enclosing line
+
+            frame = [time.perf_counter(), 0.0]
+            frames.append(frame)
+            try:
+                return original(interpreter, stmt)
+            finally:
+                elapsed = time.perf_counter() - frame[0]
+                frames.pop()
+                if frames:
+                    frames[-1][1] += elapsed
+
+                profile = self.lines.get(line)
+                if profile is None:
+                    profile = self.lines[line] = LineProfile()
+                profile.hits += 1
+                profile.time += elapsed - frame[1]
+
+        setattr(Interpreter, name, profiled)
+        self._patched.append((name, original))
+
+    @property
+    def total_time(self) -> float:
+        return sum(profile.time for profile in self.lines.values())
+
+    def report(self, limit: Optional[int] = 20) -> str:
+        """
+        Table of the lines taking the most time first
+        """
+        total = self.total_time
+        lines = [f"{'line':>6} {'hits':>10} {'time ms':>12} {'us/hit':>10} {'% time':>8}"]
+        hot = sorted(self.lines.items(), key=lambda item: item[1].time, reverse=True)
+        for line, profile in hot[:limit]:
+            lines.append(f"{line:>6} {self._columns(profile, total)}")
+        return "\n".join(lines)
+
+    def listing(self, source: str) -> str:
+        """
+        The source annotated with the counters of each line
+        """
+        total = self.total_time
+        lines = [f"Total time: {total * 1000:.3f} ms", ""]
+        header = f"{'line':>6} {'hits':>10} {'time ms':>12} {'us/hit':>10} {'% time':>8}  source"
+        lines += [header, "=" * len(header)]
+        for line, text in enumerate(source.splitlines(), start=1):
+            profile = self.lines.get(line)
+            columns = self._columns(profile, total) if profile is not None else " " * 43
+            lines.append(f"{line:>6} {columns}  {text}".rstrip())
+        return "\n".join(lines)
+
+    @staticmethod
+    def _columns(profile: LineProfile, total: float) -> str:
+        return (
+            f"{profile.hits:>10} {profile.time * 1000:>12.3f} {profile.time * 1_000_000 / profile.hits:>10.2f} "
+            f"{profile.time * 100 / max(total, 1e-9):>8.1f}"
+        )
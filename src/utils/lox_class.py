@@ -3,6 +3,7 @@ from typing import Dict, List
 from utils.lox_callable import LoxCallable
 from utils.lox_function import LoxFunction
 from utils.lox_instance import LoxInstance
+from utils.shape import Shape
 
 
 class LoxClass(LoxCallable):
@@ -10,12 +11,13 @@ class LoxClass(LoxCallable):
         self.superclass = superclass
         self.name = name
         self.methods = methods
+        self.instance_shape = Shape({})  # Shape of new instances
 
     def call(self, interpreter, arguments: List[object]) -> object:
         instance = LoxInstance(self)
         initializer = self.find_method("init")
         if initializer is not None:
-            initializer.bind(instance).call(interpreter, arguments)
+            initializer.invoke(interpreter, instance, arguments)
 
         return instance
 
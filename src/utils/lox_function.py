@@ -1,9 +1,9 @@
 from typing import List
 
+from utils.completion import Completion
 from utils.environment import Environment
 from utils.lox_callable import LoxCallable
 from utils.lox_instance import LoxInstance
-from utils.return_exception import ReturnException
 from utils.stmt import Function
 
 
@@ -12,32 +12,91 @@ class LoxFunction(LoxCallable):
     Implements LoxCallable so that we can call it
     """
 
+    _memo = None  # Memo of the results of its calls, for a MemoizedFunction
+
     def __init__(self, declaration: Function, closure: Environment, is_initializer: bool):
         self._declaration = declaration
         self._closure = closure
         self._is_initializer = is_initializer
 
     def call(self, interpreter, arguments: List[object]) -> None:
-        environment = Environment(self._closure)
-        for i in range(len(self._declaration.params)):
-            environment.define(self._declaration.params[i].lexeme, arguments[i])
+        return self._run(interpreter, self._closure, arguments)
+
+    def invoke(self, interpreter, instance: LoxInstance, arguments: List[object]) -> object:
+        """
+        Call the method bound to instance, without creating the bound method
+        """
+        closure = Environment(self._closure)
+        closure.define(instance)
+        return self._run(interpreter, closure, arguments)
+
+    def _run(self, interpreter, closure: Environment, arguments: List[object]) -> object:
+        """
+        Run the body in a new environment of closure holding the arguments
+        """
+        function = self
+        environment = Environment(closure)
+        for argument in arguments:
+            environment.define(argument)
+
+        # Signals are handled after calls such as append, by then the frames and current statement agree
+        frame = [function, interpreter.current_statement]
+        interpreter.current_statement = self._declaration
+        interpreter.frames.append(frame)
+
+        completion = interpreter._execute_block(self._declaration.body, environment)
+
+        # Make tail calls here in a loop instead of nesting them, so tail recursion runs in constant Python stack
+        memoized = []  # (memo, key) of the memoized tail calls made, which return what this call returns
+        while completion is Completion.TAIL_CALL:
+            callee, arguments = interpreter._tail_call
+            interpreter._tail_call = None
+
+            if callee._memo is not None and callee._lookup(interpreter, arguments, memoized):
+                completion = Completion.RETURN
+                break
+
+            if callee is function and not function._declaration.has_closures:
+                # Nothing can still see the environment, reuse it for the next call
+                environment._values[:] = arguments
+            else:
+                if callee is not function:
+                    function._tail_call_into(callee)
+                function = callee
+                closure = function._closure
+                environment = Environment(closure)
+                for argument in arguments:
+                    environment.define(argument)
+                frame[0] = function
+
+            completion = interpreter._execute_block(function._declaration.body, environment)
+
+        # Runtime errors abandon the frame, interpret clears the stack
+        interpreter.current_statement = frame[1]
+        interpreter.frames.pop()
+
+        if function._is_initializer:
+            return closure.get_at(0, 0)
 
-        try:
-            interpreter._execute_block(self._declaration.body, environment)
-        except ReturnException as e:
-            if self._is_initializer:
-                return self._closure.get_at(0, "this")
-            return e.value
+        value = None
+        if completion is not None:
+            value = interpreter._return_value
+            interpreter._return_value = None  # Don't keep the value alive
+        for memo, key in memoized:
+            memo.put(key, value)
+        return value
 
-        if self._is_initializer:
-            return self._closure.get_at(0, "this")
+    def _tail_call_into(self, callee: "LoxFunction") -> None:
+        """
+        Called when a tail call to callee, another function, replaces the frame of this one, for profilers to follow
+        """
 
     def arity(self) -> int:
         return len(self._declaration.params)
 
     def bind(self, instance: LoxInstance):
         environment = Environment(self._closure)
-        environment.define("this", instance)
+        environment.define(instance)
         return LoxFunction(self._declaration, environment, self._is_initializer)
 
     def __str__(self) -> str:
@@ -1,23 +1,48 @@
+from typing import Dict, List
+
+from utils.runtime_error import PyLoxRuntimeError
 from utils.token import Token
 
 
 class LoxInstance:
+    """
+    Instance of a Lox class. Field values are stored in a list laid out by the instance's shape.
+    """
+
+    __slots__ = ("klass", "shape", "values")
+
     def __init__(self, klass):
         self.klass = klass
-        self.fields = {}
+        self.shape = klass.instance_shape
+        self.values: List[object] = []
+
+    @property
+    def fields(self) -> Dict[str, object]:
+        """
+        Fields of the instance by name
+        """
+        return {name: self.values[slot] for name, slot in self.shape.slots.items()}
 
     def get(self, name: Token) -> object:
-        if name.lexeme in self.fields:
-            return self.fields[name.lexeme]
+        # Fields shadow methods
+        slot = self.shape.slots.get(name.lexeme)
+        if slot is not None:
+            return self.values[slot]
 
         method = self.klass.find_method(name.lexeme)
         if method is not None:
             return method.bind(self)
 
-        raise RuntimeError(name, f"Undefined property {name.lexeme}.")
+        raise PyLoxRuntimeError(name, f"[Interpreter] Undefined property {name.lexeme}.")
 
     def sett(self, name: Token, value: object) -> None:
-        self.fields[name.lexeme] = value
+        slot = self.shape.slots.get(name.lexeme)
+        if slot is not None:
+            self.values[slot] = value
+            return
+
+        self.shape = self.shape.with_field(name.lexeme)
+        self.values.append(value)
 
     def __str__(self):
         return f"{self.klass.name} instance"
@@ -0,0 +1,128 @@
+import sys
+from collections import OrderedDict
+from typing import List, Optional, Tuple
+
+from utils.environment import Environment
+from utils.lox_function import LoxFunction
+from utils.stmt import Function
+
+# Default number of results a Memo keeps
+DEFAULT_MAX_ENTRIES = 100_000
+
+# Returned by Memo.get for calls that aren't cached, None is a valid Lox value
+MISSING = object()
+
+
+def memo_key(declaration: Function, arguments: List[object]) -> Optional[Tuple]:
+    """
+    Key of a call in a Memo, None if an argument isn't a primitive. Values are paired with their class as 1 == true
+    in Python, and zeros with their sign as -0 prints differently from 0.
+    """
+    key = [declaration]
+    for argument in arguments:
+        cls = argument.__class__
+        if not (cls is float or cls is str or cls is bool or argument is None):
+            return None
+        key.append((cls, argument if argument or cls is not float else repr(argument)))
+    return tuple(key)
+
+
+class Memo:
+    """
+    Results of calls to pure functions, evicting the least recently used one when it holds max_entries
+    """
+
+    def __init__(self, max_entries: int = DEFAULT_MAX_ENTRIES):
+        self.max_entries = max_entries
+        self._entries: OrderedDict = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: Tuple) -> object:
+        """
+        Get the result of a call, or MISSING
+        """
+        value = self._entries.get(key, MISSING)
+        if value is MISSING:
+            self.misses += 1
+        else:
+            self.hits += 1
+            self._entries.move_to_end(key)
+        return value
+
+    def put(self, key: Tuple, value: object) -> None:
+        self._entries[key] = value
+        if len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def memory(self) -> int:
+        """
+        Approximate number of bytes used by the cache, its keys and its values. Declarations aren't counted as they
+        are part of the program.
+        """
+        size = sys.getsizeof(self._entries)
+        for key, value in self._entries.items():
+            size += sys.getsizeof(key) + sys.getsizeof(value)
+            for pair in key[1:]:
+                size += sys.getsizeof(pair) + sys.getsizeof(pair[1])
+        return size
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __str__(self) -> str:
+        return (
+            f"Memo: {len(self)} entries ({self.memory() / 1024:.1f} KiB), {self.hits} hits, {self.misses} misses, "
+            f"{self.hit_rate():.1%} hit rate, {self.evictions} evictions"
+        )
+
+
+class MemoizedFunction(LoxFunction):
+    """
+    Function the PurityAnalyzer found pure, whose calls with primitive arguments are looked up in a Memo first
+    """
+
+    def __init__(self, declaration: Function, closure: Environment, memo: Memo):
+        super().__init__(declaration, closure, False)
+        self._memo = memo
+
+    def call(self, interpreter, arguments: List[object]) -> object:
+        key = self._key(arguments)
+        if key is None:
+            return super().call(interpreter, arguments)
+
+        value = self._memo.get(key)
+        if value is MISSING:
+            value = super().call(interpreter, arguments)
+            self._memo.put(key, value)
+        return value
+
+    def _lookup(self, interpreter, arguments: List[object], memoized: List[Tuple[Memo, Tuple]]) -> bool:
+        """
+        Look up a tail call to this function, which LoxFunction makes without calling it. If its result is cached, it
+        becomes the returned value and True is returned. Otherwise its key is added to memoized, for the result to be
+        stored once the tail calls return.
+        """
+        key = self._key(arguments)
+        if key is None:
+            return False
+
+        value = self._memo.get(key)
+        if value is MISSING:
+            memoized.append((self._memo, key))
+            return False
+        interpreter._return_value = value
+        return True
+
+    def _key(self, arguments: List[object]) -> Optional[Tuple]:
+        """
+        Key of a call in the memo, None if it can't be cached
+        """
+        # The declaration stops being pure if a later program assigns a global it reads
+        return memo_key(self._declaration, arguments) if self._declaration.pure else None
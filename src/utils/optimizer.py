@@ -0,0 +1,239 @@
+from typing import List, Optional, Union
+
+from utils.expr import (
+    Assign,
+    Binary,
+    Call,
+    Expr,
+    Get,
+    Grouping,
+    Literal,
+    Logical,
+    Set,
+    Super,
+    This,
+    Unary,
+    Variable,
+)
+from utils.stmt import (
+    Block,
+    Class,
+    Expression,
+    Function,
+    If,
+    Print,
+    Return,
+    Stmt,
+    Var,
+    While,
+)
+from utils.token import Token
+from utils.token_type import TokenType
+
+# Returned by _fold when an operation can't be done ahead of time, None is a valid Lox value
+_NOT_CONSTANT = object()
+
+
+class Optimizer(Expr.Visitor, Stmt.Visitor):
+    """
+    Simplifies a resolved AST before it runs. Operators on literals are folded into a literal, groupings are removed,
+    branches that can't run are pruned and expression statements without effects are dropped. Operations that would
+    fail at runtime are left alone so that they still raise their error at the same line, and only when they run.
+
+    Expressions are visited for the expression that replaces them. Statements are visited for the statement that
+    replaces them, or None when they are dropped.
+    """
+
+    def optimize(self, statements: List[Stmt]) -> List[Stmt]:
+        """
+        Optimize a list of statements, returning the statements to run instead
+        """
+        optimized = []
+        for statement in statements:
+            statement = statement.accept(self)
+            if statement is None:
+                continue
+
+            optimized.append(statement)
+            if isinstance(statement, Return):
+                break  # Nothing after it in the block can run
+        return optimized
+
+    def _optimize_branch(self, stmt: Stmt) -> Stmt:
+        """
+        Optimize the body of an if or while, which has to be a statement even if it is dropped
+        """
+        stmt = stmt.accept(self)
+        return stmt if stmt is not None else Block([])
+
+    def _is_truthy(self, value: object) -> bool:
+        """
+        Same as Interpreter._is_truthy
+        """
+        return value is not None and value is not False
+
+    def _is_pure(self, expr: Expr) -> bool:
+        """
+        Check if evaluating an expression can neither have an effect nor fail
+        """
+        if isinstance(expr, (Literal, This)):
+            return True
+        if isinstance(expr, Variable):
+            return expr.depth is not None  # Globals may be undefined
+        if isinstance(expr, Logical):
+            return self._is_pure(expr.left) and self._is_pure(expr.right)
+        if isinstance(expr, Binary) and expr.operator.token_type in [TokenType.EQUAL_EQUAL, TokenType.BANG_EQUAL]:
+            return self._is_pure(expr.left) and self._is_pure(expr.right)
+        if isinstance(expr, Unary) and expr.operator.token_type == TokenType.BANG:
+            return self._is_pure(expr.right)
+        return False
+
+    def _fold(self, operator: Token, left: object, right: object) -> object:
+        """
+        Apply a binary operator to two values the way the interpreter does, or return _NOT_CONSTANT if it would fail
+        """
+        token_type = operator.token_type
+        if token_type == TokenType.EQUAL_EQUAL:
+            return left == right
+        if token_type == TokenType.BANG_EQUAL:
+            return left != right
+
+        if token_type == TokenType.PLUS and isinstance(left, str) and isinstance(right, str):
+            return left + right
+
+        if not (isinstance(left, float) and isinstance(right, float)):
+            return _NOT_CONSTANT
+
+        if token_type == TokenType.PLUS:
+            return left + right
+        if token_type == TokenType.MINUS:
+            return left - right
+        if token_type == TokenType.STAR:
+            return left * right
+        if token_type == TokenType.SLASH and right != 0:
+            return left / right
+        if token_type == TokenType.GREATER:
+            return left > right
+        if token_type == TokenType.GREATER_EQUAL:
+            return left >= right
+        if token_type == TokenType.LESS:
+            return left < right
+        if token_type == TokenType.LESS_EQUAL:
+            return left <= right
+        return _NOT_CONSTANT
+
+    def visit_block_stmt(self, stmt: Block) -> Block:
+        stmt.statements = self.optimize(stmt.statements)
+        return stmt
+
+    def visit_class_stmt(self, stmt: Class) -> Class:
+        for method in stmt.methods:
+            method.accept(self)
+        return stmt
+
+    def visit_expression_stmt(self, stmt: Expression) -> Optional[Expression]:
+        stmt.expression = stmt.expression.accept(self)
+        if self._is_pure(stmt.expression):
+            return None
+        return stmt
+
+    def visit_function_stmt(self, stmt: Function) -> Function:
+        stmt.body = self.optimize(stmt.body)
+        return stmt
+
+    def visit_if_stmt(self, stmt: If) -> Optional[Stmt]:
+        stmt.condition = stmt.condition.accept(self)
+        if isinstance(stmt.condition, Literal):
+            if self._is_truthy(stmt.condition.value):
+                return stmt.then_branch.accept(self)
+            if stmt.else_branch is not None:
+                return stmt.else_branch.accept(self)
+            return None
+
+        stmt.then_branch = self._optimize_branch(stmt.then_branch)
+        if stmt.else_branch is not None:
+            stmt.else_branch = self._optimize_branch(stmt.else_branch)
+        return stmt
+
+    def visit_print_stmt(self, stmt: Print) -> Print:
+        stmt.expression = stmt.expression.accept(self)
+        return stmt
+
+    def visit_return_stmt(self, stmt: Return) -> Return:
+        if stmt.value is not None:
+            stmt.value = stmt.value.accept(self)
+        return stmt
+
+    def visit_var_stmt(self, stmt: Var) -> Var:
+        if stmt.initializer is not None:
+            stmt.initializer = stmt.initializer.accept(self)
+        return stmt
+
+    def visit_while_stmt(self, stmt: While) -> Optional[While]:
+        stmt.condition = stmt.condition.accept(self)
+        if isinstance(stmt.condition, Literal) and not self._is_truthy(stmt.condition.value):
+            return None
+
+        stmt.body = self._optimize_branch(stmt.body)
+        return stmt
+
+    def visit_assign_expr(self, expr: Assign) -> Expr:
+        expr.value = expr.value.accept(self)
+        return expr
+
+    def visit_binary_expr(self, expr: Binary) -> Expr:
+        expr.left = expr.left.accept(self)
+        expr.right = expr.right.accept(self)
+        if isinstance(expr.left, Literal) and isinstance(expr.right, Literal):
+            value = self._fold(expr.operator, expr.left.value, expr.right.value)
+            if value is not _NOT_CONSTANT:
+                return Literal(value)
+        return expr
+
+    def visit_call_expr(self, expr: Call) -> Expr:
+        expr.callee = expr.callee.accept(self)
+        expr.arguments = [argument.accept(self) for argument in expr.arguments]
+        return expr
+
+    def visit_get_expr(self, expr: Get) -> Expr:
+        expr.obj = expr.obj.accept(self)
+        return expr
+
+    def visit_grouping_expr(self, expr: Grouping) -> Expr:
+        # Grouping only matters to the parser
+        return expr.expression.accept(self)
+
+    def visit_literal_expr(self, expr: Literal) -> Expr:
+        return expr
+
+    def visit_logical_expr(self, expr: Logical) -> Expr:
+        expr.left = expr.left.accept(self)
+        expr.right = expr.right.accept(self)
+        if isinstance(expr.left, Literal):
+            # The left operand is the result if it short-circuits, otherwise the right one is
+            short_circuits = self._is_truthy(expr.left.value) == (expr.operator.token_type == TokenType.OR)
+            return expr.left if short_circuits else expr.right
+        return expr
+
+    def visit_set_expr(self, expr: Set) -> Expr:
+        expr.obj = expr.obj.accept(self)
+        expr.value = expr.value.accept(self)
+        return expr
+
+    def visit_super_expr(self, expr: Super) -> Expr:
+        return expr
+
+    def visit_this_expr(self, expr: This) -> Expr:
+        return expr
+
+    def visit_unary_expr(self, expr: Unary) -> Expr:
+        expr.right = expr.right.accept(self)
+        if isinstance(expr.right, Literal):
+            if expr.operator.token_type == TokenType.BANG:
+                return Literal(not self._is_truthy(expr.right.value))
+            if isinstance(expr.right.value, float):
+                return Literal(-expr.right.value)
+        return expr
+
+    def visit_variable_expr(self, expr: Variable) -> Expr:
+        return expr
@@ -1,4 +1,5 @@
-from typing import List, Optional
+from enum import IntEnum
+from typing import Callable, Dict, Iterable, Iterator, List, Optional
 
 from utils.expr import (
     Assign,
@@ -35,19 +36,96 @@ class ParseError(Exception):
     pass
 
 
+class Precedence(IntEnum):
+    """
+    How tightly infix operators bind, from loosest to tightest
+    """
+
+    NONE = 0
+    ASSIGNMENT = 1
+    OR = 2
+    AND = 3
+    EQUALITY = 4
+    COMPARISON = 5
+    TERM = 6
+    FACTOR = 7
+    UNARY = 8
+    CALL = 9
+
+
+# Token type: precedence of the infix operator it is. Binary operators are left associative, their right operand binds
+# one level more tightly, while assignment is right associative.
+INFIX_PRECEDENCE: Dict[TokenType, Precedence] = {
+    TokenType.EQUAL: Precedence.ASSIGNMENT,
+    TokenType.OR: Precedence.OR,
+    TokenType.AND: Precedence.AND,
+    TokenType.EQUAL_EQUAL: Precedence.EQUALITY,
+    TokenType.BANG_EQUAL: Precedence.EQUALITY,
+    TokenType.GREATER: Precedence.COMPARISON,
+    TokenType.GREATER_EQUAL: Precedence.COMPARISON,
+    TokenType.LESS: Precedence.COMPARISON,
+    TokenType.LESS_EQUAL: Precedence.COMPARISON,
+    TokenType.MINUS: Precedence.TERM,
+    TokenType.PLUS: Precedence.TERM,
+    TokenType.SLASH: Precedence.FACTOR,
+    TokenType.STAR: Precedence.FACTOR,
+    TokenType.LEFT_PAREN: Precedence.CALL,
+    TokenType.DOT: Precedence.CALL,
+}
+
+
 class Parser:
     """
-    Parses a list of tokens using recursive descent into statements.
+    Parses a list of tokens into statements, using recursive descent for declarations and statements and Pratt
+    parsing for expressions: each token type has rules for the expressions it starts or continues, and operators
+    are applied by how tightly they bind rather than with a method for each level of precedence. The tokens are
+    pulled one at a time, keeping only the current and previous ones, so they can come straight from a scanner as it
+    scans.
     """
 
-    def __init__(self, pylox, tokens: List[Token]):
+    def __init__(self, pylox, tokens: Iterable[Token]):
         """
         :param pylox: PyLox object
-        :param tokens: List of tokens
+        :param tokens: Tokens ending with EOF, in a list or yielded as they are scanned
         """
         self._pylox = pylox
-        self._tokens: List[Token] = tokens
-        self._current: int = 0
+        self._tokens: Iterator[Token] = iter(tokens)
+        self._current: Token = next(self._tokens)
+        self._before: Optional[Token] = None
+
+        # Token type: method parsing the expression the token starts, called with the token once it is consumed
+        self._prefix_rules: Dict[TokenType, Callable[[Token], Expr]] = {
+            TokenType.FALSE: self._literal,
+            TokenType.TRUE: self._literal,
+            TokenType.NIL: self._literal,
+            TokenType.NUMBER: self._literal,
+            TokenType.STRING: self._literal,
+            TokenType.LEFT_PAREN: self._grouping,
+            TokenType.SUPER: self._super,
+            TokenType.THIS: self._this,
+            TokenType.IDENTIFIER: self._variable,
+            TokenType.BANG: self._unary,
+            TokenType.MINUS: self._unary,
+        }
+        # Token type: method parsing the rest of the expression the token continues, called with the expression to
+        # its left and the token once it is consumed. Operators bind as tightly as INFIX_PRECEDENCE says.
+        self._infix_rules: Dict[TokenType, Callable[[Expr, Token], Expr]] = {
+            TokenType.EQUAL: self._assignment,
+            TokenType.OR: self._logical,
+            TokenType.AND: self._logical,
+            TokenType.EQUAL_EQUAL: self._binary,
+            TokenType.BANG_EQUAL: self._binary,
+            TokenType.GREATER: self._binary,
+            TokenType.GREATER_EQUAL: self._binary,
+            TokenType.LESS: self._binary,
+            TokenType.LESS_EQUAL: self._binary,
+            TokenType.MINUS: self._binary,
+            TokenType.PLUS: self._binary,
+            TokenType.SLASH: self._binary,
+            TokenType.STAR: self._binary,
+            TokenType.LEFT_PAREN: self._call,
+            TokenType.DOT: self._get,
+        }
 
     def parse(self) -> Stmt:
         """
@@ -66,13 +144,18 @@ class Parser:
                      | statement
         """
         try:
+            line = self._peek().line
             if self._match([TokenType.CLASS]):
-                return self._class_declaration()
-            if self._match([TokenType.VAR]):
-                return self._var_declaration()
-            if self._match([TokenType.FUN]):
-                return self._function("function")
-            return self._statement()
+                declaration = self._class_declaration()
+            elif self._match([TokenType.VAR]):
+                declaration = self._var_declaration()
+            elif self._match([TokenType.FUN]):
+                declaration = self._function("function")
+            else:
+                return self._statement()
+
+            declaration.line = line
+            return declaration
 
         except ParseError:
             self._synchronize()
@@ -94,7 +177,10 @@ class Parser:
 
         methods = []
         while not self._check(TokenType.RIGHT_BRACE) and not self._is_at_end():
-            methods.append(self._function("method"))
+            line = self._peek().line
+            method = self._function("method")
+            method.line = line
+            methods.append(method)
 
         self._consume(TokenType.RIGHT_BRACE, "Expect '}' after class body.")
 
@@ -123,25 +209,24 @@ class Parser:
                    | whileStmt
                    | block
         """
+        line = self._peek().line
         if self._match([TokenType.FOR]):
-            return self._for_statement()
-
-        if self._match([TokenType.IF]):
-            return self._if_statement()
-
-        if self._match([TokenType.PRINT]):
-            return self._print_statement()
-
-        if self._match([TokenType.RETURN]):
-            return self._return_statement()
-
-        if self._match([TokenType.WHILE]):
-            return self._while_statement()
-
-        if self._match([TokenType.LEFT_BRACE]):
-            return Block(self._block())
+            statement = self._for_statement()
+        elif self._match([TokenType.IF]):
+            statement = self._if_statement()
+        elif self._match([TokenType.PRINT]):
+            statement = self._print_statement()
+        elif self._match([TokenType.RETURN]):
+            statement = self._return_statement()
+        elif self._match([TokenType.WHILE]):
+            statement = self._while_statement()
+        elif self._match([TokenType.LEFT_BRACE]):
+            statement = Block(self._block())
+        else:
+            statement = self._expression_statement()
 
-        return self._expression_statement()
+        statement.line = line
+        return statement
 
     def _return_statement(self) -> Return:
         """
@@ -161,14 +246,21 @@ class Parser:
         forStmt -> "for" "(" ( varDecl | exprStmt | ";" )
                  expression? ";"
                  expression? ")" statement
+
+        The statements it desugars into start on the line of the "for", except the initializer and increment, which
+        start on their own.
         """
+        line = self._previous().line
         self._consume(TokenType.LEFT_PAREN, "Expect '(' after 'for'")
+        initializer_line = self._peek().line
         if self._match([TokenType.SEMICOLON]):
             initializer = None
         elif self._match([TokenType.VAR]):
             initializer = self._var_declaration()
         else:
             initializer = self._expression_statement()
+        if initializer is not None:
+            initializer.line = initializer_line
 
         condition = None
         if not self._check(TokenType.SEMICOLON):
@@ -177,6 +269,7 @@ class Parser:
         self._consume(TokenType.SEMICOLON, "Expect ';' after loop condition.")
 
         increment = None
+        increment_line = self._peek().line
         if not self._check(TokenType.RIGHT_PAREN):
             increment = self._expression()
 
@@ -184,16 +277,21 @@ class Parser:
         body = self._statement()
 
         if increment is not None:
-            body = Block([body, Expression(increment)])
+            increment = Expression(increment)
+            increment.line = increment_line
+            body = Block([body, increment])
+            body.line = line
 
         # If condition is omitted, jam in true to make an infinite loop
         if condition is None:
             condition = Literal(True)
 
         body = While(condition, body)
+        body.line = line
 
         if initializer is not None:
             body = Block([initializer, body])
+            body.line = line
 
         return body
 
@@ -279,138 +377,71 @@ class Parser:
         """
         expression -> assignment
         """
-        return self._assignment()
+        return self._parse_precedence(Precedence.ASSIGNMENT)
 
-    def _assignment(self) -> Expr:
+    def _parse_precedence(self, precedence: Precedence) -> Expr:
         """
-        assignment -> ( call "." )? IDENTIFIER "=" assignment
-                    | logic_or ;
+        Parse an expression whose operators all bind at least as tightly as precedence: the operand starting at the
+        current token, then infix operators of that precedence or above applied to it from left to right
         """
-        expr = self._or()
-
-        if self._match([TokenType.EQUAL]):
-            equals = self._previous()
-            value = self._assignment()
+        token = self._peek()
+        prefix = self._prefix_rules.get(token.token_type)
+        if prefix is None:
+            raise self._error(token, "Expect expression.")
+        self._advance()
+        expr = prefix(token)
 
-            if isinstance(expr, Variable):
-                name = expr.name
-                return Assign(name, value)
-            elif isinstance(expr, Get):
-                return Set(expr.obj, expr.name, value)
-            self._error(equals, "Invalid assignment target")
+        while INFIX_PRECEDENCE.get(self._peek().token_type, Precedence.NONE) >= precedence:
+            token = self._advance()
+            expr = self._infix_rules[token.token_type](expr, token)
 
         return expr
 
-    def _or(self) -> Expr:
+    def _assignment(self, target: Expr, equals: Token) -> Expr:
         """
-        logic_or -> logic_and ( "or" logic_and )*
+        assignment -> ( call "." )? IDENTIFIER "=" assignment
+                    | logic_or ;
         """
-        expr = self._and()
+        value = self._parse_precedence(Precedence.ASSIGNMENT)
 
-        while self._match([TokenType.OR]):
-            operator = self._previous()
-            right = self._and()
-            expr = Logical(expr, operator, right)
+        if isinstance(target, Variable):
+            name = target.name
+            return Assign(name, value)
+        elif isinstance(target, Get):
+            return Set(target.obj, target.name, value)
+        self._error(equals, "Invalid assignment target")
 
-        return expr
+        return target
 
-    def _and(self) -> Expr:
+    def _logical(self, left: Expr, operator: Token) -> Expr:
         """
+        logic_or -> logic_and ( "or" logic_and )*
         logic_and -> equality ( "and" equality )*
         """
-        expr = self._equality()
-
-        while self._match([TokenType.AND]):
-            operator = self._previous()
-            right = self._equality()
-            expr = Logical(expr, operator, right)
-
-        return expr
+        right = self._parse_precedence(INFIX_PRECEDENCE[operator.token_type] + 1)
+        return Logical(left, operator, right)
 
-    def _equality(self) -> Expr:
+    def _binary(self, left: Expr, operator: Token) -> Expr:
         """
         equality -> comparison ( ( "!=" | "==" ) comparison )*
-        """
-        expr = self._comparison()
-
-        while self._match([TokenType.EQUAL_EQUAL, TokenType.BANG_EQUAL]):
-            operator = self._previous()
-            right = self._comparison()
-            expr = Binary(expr, operator, right)
-
-        return expr
-
-    def _comparison(self) -> Expr:
-        """
         comparison -> term ( ( ">" | ">=" | "<" | "<=" ) term )*
-        """
-        expr = self._term()
-
-        while self._match([TokenType.GREATER, TokenType.GREATER_EQUAL, TokenType.LESS_EQUAL, TokenType.LESS]):
-            operator = self._previous()
-            right = self._term()
-            expr = Binary(expr, operator, right)
-
-        return expr
-
-    def _term(self) -> Expr:
-        """
         term -> factor ( ( "-" | "+" ) factor )*
+        factor -> unary ( ( "/" | "*" ) unary )*
         """
-        expr = self._factor()
-
-        while self._match([TokenType.MINUS, TokenType.PLUS]):
-            operator = self._previous()
-            right = self._factor()
-            expr = Binary(expr, operator, right)
-
-        return expr
+        right = self._parse_precedence(INFIX_PRECEDENCE[operator.token_type] + 1)
+        return Binary(left, operator, right)
 
-    def _factor(self) -> Expr:
+    def _unary(self, operator: Token) -> Expr:
         """
-        unary ( ( "/" | "*" ) unary )*
+        unary -> ( "!" | "-" ) unary | call
         """
-        expr = self._unary()
-
-        while self._match([TokenType.SLASH, TokenType.STAR]):
-            operator = self._previous()
-            right = self._unary()
-            expr = Binary(expr, operator, right)
+        right = self._parse_precedence(Precedence.UNARY)
+        return Unary(operator, right)
 
-        return expr
-
-    def _unary(self) -> Expr:
-        """
-        unary -> ( "!" | "-" ) unary | primary
-        """
-        if self._match([TokenType.BANG, TokenType.MINUS]):
-            operator = self._previous()
-            right = self._unary()
-            return Unary(operator, right)
-
-        return self._call()
-
-    def _call(self) -> Expr:
+    def _call(self, callee: Expr, left_paren: Token) -> Call:
         """
         call -> primary ( "(" arguments? ")" | "." IDENTIFIER )*
         """
-        expr = self._primary()
-
-        while True:
-            if self._match([TokenType.LEFT_PAREN]):
-                expr = self._finish_call(expr)
-            elif self._match([TokenType.DOT]):
-                name = self._consume(TokenType.IDENTIFIER, "Expect property name after '.'.")
-                expr = Get(expr, name)
-            else:
-                break
-
-        return expr
-
-    def _finish_call(self, callee: Expr) -> Call:
-        """
-        Parse the call expression using the previously parsed expression as callee
-        """
         arguments = []
         if not self._check(TokenType.RIGHT_PAREN):
             while True:
@@ -424,43 +455,53 @@ class Parser:
 
         return Call(callee, paren, arguments)
 
-    def _primary(self) -> Expr:
+    def _get(self, obj: Expr, dot: Token) -> Get:
         """
-        primary -> "true" | "false" | "nil" | "this"
-                 | NUMBER | STRING | IDENTIFIER | "(" expression ")"
-                 | "super" "." IDENTIFIER
+        call -> primary ( "(" arguments? ")" | "." IDENTIFIER )*
         """
-        if self._match([TokenType.FALSE]):
-            return Literal(False)
+        name = self._consume(TokenType.IDENTIFIER, "Expect property name after '.'.")
+        return Get(obj, name)
 
-        if self._match([TokenType.TRUE]):
+    def _literal(self, token: Token) -> Literal:
+        """
+        primary -> "true" | "false" | "nil" | NUMBER | STRING
+        """
+        if token.token_type == TokenType.FALSE:
+            return Literal(False)
+        if token.token_type == TokenType.TRUE:
             return Literal(True)
-
-        if self._match([TokenType.NIL]):
+        if token.token_type == TokenType.NIL:
             return Literal(None)
+        return Literal(token.literal)
 
-        if self._match([TokenType.NUMBER, TokenType.STRING]):
-            return Literal(self._previous().literal)
-
-        if self._match([TokenType.LEFT_PAREN]):
-            expr = self._expression()
-            self._consume(TokenType.RIGHT_PAREN, "Expect ')' after expression.")
-            return Grouping(expr)
-
-        if self._match([TokenType.SUPER]):
-            keyword = self._previous()
-            self._consume(TokenType.DOT, "Expect '.' after 'super'.")
-            method = self._consume(TokenType.IDENTIFIER, "Expect superclass method name.")
+    def _grouping(self, paren: Token) -> Grouping:
+        """
+        primary -> "(" expression ")"
+        """
+        expr = self._expression()
+        self._consume(TokenType.RIGHT_PAREN, "Expect ')' after expression.")
+        return Grouping(expr)
 
-            return Super(keyword, method)
+    def _super(self, keyword: Token) -> Super:
+        """
+        primary -> "super" "." IDENTIFIER
+        """
+        self._consume(TokenType.DOT, "Expect '.' after 'super'.")
+        method = self._consume(TokenType.IDENTIFIER, "Expect superclass method name.")
 
-        if self._match([TokenType.THIS]):
-            return This(self._previous())
+        return Super(keyword, method)
 
-        if self._match([TokenType.IDENTIFIER]):
-            return Variable(self._previous())
+    def _this(self, keyword: Token) -> This:
+        """
+        primary -> "this"
+        """
+        return This(keyword)
 
-        raise self._error(self._peek(), "Expect expression.")
+    def _variable(self, name: Token) -> Variable:
+        """
+        primary -> IDENTIFIER
+        """
+        return Variable(name)
 
     def _match(self, types: List[Token]) -> bool:
         """
@@ -485,7 +526,8 @@ class Parser:
         Consume current token and return it
         """
         if not self._is_at_end():
-            self._current += 1
+            self._before = self._current
+            self._current = next(self._tokens)
         return self._previous()
 
     def _is_at_end(self) -> bool:
@@ -498,13 +540,13 @@ class Parser:
         """
         Return current token
         """
-        return self._tokens[self._current]
+        return self._current
 
     def _previous(self) -> Token:
         """
         Return previous token
         """
-        return self._tokens[self._current - 1]
+        return self._before
 
     def _consume(self, token_type: TokenType, message: str) -> Token:
         """
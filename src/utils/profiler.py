@@ -0,0 +1,162 @@
+import time
+from collections import Counter
+from typing import Callable, Dict, List, Tuple
+
+from utils.lox_class import LoxClass
+from utils.lox_function import LoxFunction
+from utils.lox_native import Clock
+from utils.stmt import Function
+
+# Name of the frame at the bottom of every stack, for time spent in top level code
+SCRIPT = "<script>"
+
+
+class FunctionProfile:
+    """
+    Counters of a profiled function. Inclusive time counts callees, exclusive time doesn't.
+    """
+
+    __slots__ = ("calls", "inclusive", "exclusive")
+
+    def __init__(self):
+        self.calls = 0
+        self.inclusive = 0.0
+        self.exclusive = 0.0
+
+
+class Profiler:
+    """
+    Deterministic profiler of Lox functions, methods, classes and natives. While started, it replaces the call methods
+    of LoxFunction, LoxClass and natives with ones that time the call, and puts the originals back when stopped, so
+    it costs nothing when it isn't used.
+
+    A tail call to another function replaces the frame of the call that made it, as in the interpreter, so its time
+    counts towards the callee and its stacks leave the caller out. Tail calls of a function to itself count as part of
+    the call that made the first one.
+    """
+
+    def __init__(self):
+        self.functions: Dict[str, FunctionProfile] = {}
+        self._stack_times: Counter = Counter()  # Stack id: exclusive time spent in it
+        self._stacks: Dict[Tuple[int, str], int] = {}  # (id of the stack below, name on top): stack id
+        self._stack_keys: List[Tuple[int, str]] = []  # Stack id: (id of the stack below, name on top)
+        self._frames: List[List] = []  # [name, start time, time spent in callees, stack id] from the bottom up
+        self._active: Counter = Counter()  # name: number of its frames on the stack, recursion counts inclusive once
+        self._names: Dict[Function, str] = {}  # Method declaration: name qualified by its class
+        self._patched: List[Tuple[type, str, Callable]] = []
+
+    def start(self) -> None:
+        self._patch(LoxFunction, "call", lambda function: self._function_name(function))
+        self._patch(LoxFunction, "invoke", lambda function: self._function_name(function))
+        self._patch(LoxClass, "call", lambda klass: klass.name)
+        self._patch(Clock, "call", lambda native: str(native))
+
+        original_init = LoxClass.__init__
+
+        def init(klass, name, superclass, methods):
+            original_init(klass, name, superclass, methods)
+            for method_name, method in methods.items():
+                self._names[method._declaration] = f"{name}.{method_name}"
+
+        LoxClass.__init__ = init
+        self._patched.append((LoxClass, "__init__", original_init))
+
+        def tail_call_into(function, callee):
+            self._exit()
+            self._enter(self._function_name(callee))
+
+        self._patched.append((LoxFunction, "_tail_call_into", LoxFunction._tail_call_into))
+        LoxFunction._tail_call_into = tail_call_into
+
+        self._enter(SCRIPT)
+
+    def stop(self) -> None:
+        self._exit()
+
+        for cls, method_name, original in reversed(self._patched):
+            setattr(cls, method_name, original)
+        self._patched = []
+
+    def _patch(self, cls: type, method_name: str, name_of: Callable[[object], str]) -> None:
+        """
+        Replace a call method of cls with one that profiles it
+        """
+        original = getattr(cls, method_name)
+
+        def profiled(callee, *args):
+            self._enter(name_of(callee))
+            try:
+                return original(callee, *args)
+            finally:
+                self._exit()
+
+        setattr(cls, method_name, profiled)
+        self._patched.append((cls, method_name, original))
+
+    def _function_name(self, function: LoxFunction) -> str:
+        declaration = function._declaration
+        return self._names.get(declaration, declaration.name.lexeme)
+
+    def _enter(self, name: str) -> None:
+        key = (self._frames[-1][3] if self._frames else -1, name)
+        stack = self._stacks.get(key)
+        if stack is None:
+            stack = self._stacks[key] = len(self._stack_keys)
+            self._stack_keys.append(key)
+
+        self._active[name] += 1
+        self._frames.append([name, time.perf_counter(), 0.0, stack])
+
+    def _exit(self) -> None:
+        name, start, callees, stack = self._frames.pop()
+        elapsed = time.perf_counter() - start
+        self._active[name] -= 1
+
+        profile = self.functions.get(name)
+        if profile is None:
+            profile = self.functions[name] = FunctionProfile()
+        profile.calls += 1
+        profile.exclusive += elapsed - callees
+        if self._active[name] == 0:
+            profile.inclusive += elapsed
+
+        self._stack_times[stack] += elapsed - callees
+        if self._frames:
+            self._frames[-1][2] += elapsed
+
+    def report(self) -> str:
+        """
+        Table of the profiled functions, the ones taking the most exclusive time first
+        """
+        lines = [f"{'calls':>10} {'inclusive ms':>14} {'exclusive ms':>14} {'ms/call':>10}  function"]
+        profiles = sorted(self.functions.items(), key=lambda item: item[1].exclusive, reverse=True)
+        for name, profile in profiles:
+            lines.append(
+                f"{profile.calls:>10} {profile.inclusive * 1000:>14.3f} {profile.exclusive * 1000:>14.3f} "
+                f"{profile.inclusive * 1000 / profile.calls:>10.4f}  {name}"
+            )
+        return "\n".join(lines)
+
+    def stacks(self) -> Dict[Tuple[str, ...], float]:
+        """
+        Exclusive time spent in every stack, keyed by the names on it from the bottom up
+        """
+        stacks = {}
+        for stack, seconds in self._stack_times.items():
+            names = []
+            while stack != -1:
+                stack, name = self._stack_keys[stack]
+                names.append(name)
+            stacks[tuple(reversed(names))] = seconds
+        return stacks
+
+    def folded(self) -> str:
+        """
+        Exclusive time of every stack in microseconds, in the collapsed format flame graph tools read
+        """
+        lines = []
+        for stack, seconds in sorted(self.stacks().items()):
+            microseconds = round(seconds * 1_000_000)
+            if microseconds > 0:
+                lines.append(f"{';'.join(stack)} {microseconds}")
+        return "\n".join(lines) + "\n"
@@ -0,0 +1,193 @@
+from collections import Counter
+from typing import Dict, List, Optional
+from typing import Set as SetType
+from typing import Union
+
+from utils.expr import (
+    Assign,
+    Binary,
+    Call,
+    Expr,
+    Get,
+    Grouping,
+    Literal,
+    Logical,
+    Set,
+    Super,
+    This,
+    Unary,
+    Variable,
+)
+from utils.stmt import (
+    Block,
+    Class,
+    Expression,
+    Function,
+    If,
+    Print,
+    Return,
+    Stmt,
+    Var,
+    While,
+)
+
+
+class PurityAnalyzer(Expr.Visitor, Stmt.Visitor):
+    """
+    Finds the top level functions whose result only depends on their arguments, and marks them pure so that their
+    calls can be memoized. A function is pure when it prints nothing, assigns no global, touches no property, declares
+    no function or class and only reads globals that are pure functions declared once and never assigned. That rules
+    out clock and classes, and means every value a pure call called with primitives sees is either a primitive or a
+    pure function.
+
+    The analyzer is kept between programs run by the same interpreter, as a later program can redeclare or assign a
+    global that a function marked pure before reads, which makes it impure from then on.
+    """
+
+    def __init__(self):
+        self._functions: List[Function] = []  # Top level functions of every program analyzed
+        self._declarations: Counter = Counter()  # Global name: number of declarations
+        self._assigned: SetType[str] = set()  # Globals assigned anywhere
+        self._impure: SetType[Function] = set()  # Functions whose own body has an effect
+        self._globals_read: Dict[Function, SetType[str]] = {}
+        self._function: Optional[Function] = None  # Top level function being analyzed
+
+    def analyze(self, statements: List[Stmt]) -> None:
+        """
+        Analyze a resolved program and update the pure flag of every function seen so far
+        """
+        for statement in statements:
+            if isinstance(statement, (Class, Function, Var)):
+                self._declarations[statement.name.lexeme] += 1
+
+            if isinstance(statement, Function):
+                self._functions.append(statement)
+                self._globals_read[statement] = set()
+                self._function = statement
+                self._walk(statement.body)
+                self._function = None
+            else:
+                statement.accept(self)
+
+        self._update()
+
+    def _update(self) -> None:
+        """
+        Mark functions pure, assuming they all are and removing those that read anything but pure constants until
+        nothing changes, so that recursive functions can be pure
+        """
+        constants = {
+            function.name.lexeme: function
+            for function in self._functions
+            if self._declarations[function.name.lexeme] == 1 and function.name.lexeme not in self._assigned
+        }
+        pure = set(function for function in self._functions if function not in self._impure)
+
+        changed = True
+        while changed:
+            changed = False
+            for function in list(pure):
+                if any(constants.get(name) not in pure for name in self._globals_read[function]):
+                    pure.remove(function)
+                    changed = True
+
+        for function in self._functions:
+            function.pure = function in pure
+
+    def _walk(self, target: Union[List[Stmt], Stmt, Expr]) -> None:
+        if isinstance(target, list):
+            for statement in target:
+                statement.accept(self)
+        else:
+            target.accept(self)
+
+    def _effect(self) -> None:
+        """
+        Note that the function being analyzed has an effect
+        """
+        if self._function is not None:
+            self._impure.add(self._function)
+
+    def visit_block_stmt(self, stmt: Block) -> None:
+        self._walk(stmt.statements)
+
+    def visit_class_stmt(self, stmt: Class) -> None:
+        self._effect()
+        if stmt.superclass is not None:
+            self._walk(stmt.superclass)
+        self._walk(stmt.methods)
+
+    def visit_expression_stmt(self, stmt: Expression) -> None:
+        self._walk(stmt.expression)
+
+    def visit_function_stmt(self, stmt: Function) -> None:
+        self._effect()
+        self._walk(stmt.body)
+
+    def visit_if_stmt(self, stmt: If) -> None:
+        self._walk(stmt.condition)
+        self._walk(stmt.then_branch)
+        if stmt.else_branch is not None:
+            self._walk(stmt.else_branch)
+
+    def visit_print_stmt(self, stmt: Print) -> None:
+        self._effect()
+        self._walk(stmt.expression)
+
+    def visit_return_stmt(self, stmt: Return) -> None:
+        if stmt.value is not None:
+            self._walk(stmt.value)
+
+    def visit_var_stmt(self, stmt: Var) -> None:
+        if stmt.initializer is not None:
+            self._walk(stmt.initializer)
+
+    def visit_while_stmt(self, stmt: While) -> None:
+        self._walk(stmt.condition)
+        self._walk(stmt.body)
+
+    def visit_assign_expr(self, expr: Assign) -> None:
+        if expr.depth is None:
+            self._assigned.add(expr.name.lexeme)
+            self._effect()
+        self._walk(expr.value)
+
+    def visit_binary_expr(self, expr: Binary) -> None:
+        self._walk(expr.left)
+        self._walk(expr.right)
+
+    def visit_call_expr(self, expr: Call) -> None:
+        self._walk(expr.callee)
+        self._walk(expr.arguments)
+
+    def visit_get_expr(self, expr: Get) -> None:
+        self._effect()
+        self._walk(expr.obj)
+
+    def visit_grouping_expr(self, expr: Grouping) -> None:
+        self._walk(expr.expression)
+
+    def visit_literal_expr(self, expr: Literal) -> None:
+        return None
+
+    def visit_logical_expr(self, expr: Logical) -> None:
+        self._walk(expr.left)
+        self._walk(expr.right)
+
+    def visit_set_expr(self, expr: Set) -> None:
+        self._effect()
+        self._walk(expr.obj)
+        self._walk(expr.value)
+
+    def visit_super_expr(self, expr: Super) -> None:
+        self._effect()
+
+    def visit_this_expr(self, expr: This) -> None:
+        self._effect()
+
+    def visit_unary_expr(self, expr: Unary) -> None:
+        self._walk(expr.right)
+
+    def visit_variable_expr(self, expr: Variable) -> None:
+        if expr.depth is None and self._function is not None:
+            self._globals_read[self._function].add(expr.name.lexeme)
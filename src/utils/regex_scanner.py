@@ -0,0 +1,264 @@
+import re
+from typing import Dict, Iterable, Iterator, List, TextIO
+
+from utils.token import Token
+from utils.token_store import TOKEN_CODES, TokenStore
+from utils.token_type import TokenType
+
+# One alternative per kind of lexeme, tried in order at each position. Comment markers come before the punctuators
+# they start with, and anything else is a single unexpected character.
+TOKEN_PATTERN = re.compile(
+    r"""
+      (?P<SPACE>[ \t\r\n]+)
+    | (?P<IDENTIFIER>[A-Za-z_][A-Za-z0-9_]*)
+    | (?P<NUMBER>[0-9]+(?:\.[0-9]+)?)
+    | (?P<LINE_COMMENT>//[^\n]*)
+    | (?P<BLOCK_COMMENT>/\*)
+    | (?P<COMMENT_END>\*/)
+    | (?P<PUNCTUATOR>[(){},.\-+;/*!=<>]=?)
+    | (?P<STRING>"[^"]*"?)
+    | (?P<UNEXPECTED>.)
+    """,
+    re.VERBOSE | re.DOTALL,
+)
+
+# Characters read from a file at a time when streaming it
+DEFAULT_CHUNK_SIZE = 1 << 16
+
+# Text inside a block comment that can't open, close or count a line
+COMMENT_TEXT_PATTERN = re.compile(r"[^/*\n]+")
+
+# Identifier lexeme: its type, if it isn't an identifier. Like Scanner, any name that is a token type value counts.
+KEYWORDS: Dict[str, TokenType] = {
+    value: member for value, member in TokenType._value2member_map_.items() if value.isalpha()
+}
+
+# Punctuator lexeme: its type. Like Scanner, a punctuator followed by "=" takes it into its lexeme even when that
+# doesn't make a two character token, so "(=" is a "(".
+PUNCTUATORS: Dict[str, TokenType] = {}
+for _value, _member in TokenType._value2member_map_.items():
+    if len(_value) == 1 and not _value.isalpha():
+        PUNCTUATORS[_value] = _member
+        PUNCTUATORS[_value + "="] = TokenType._value2member_map_.get(_value + "=", _member)
+
+# The same tables, to the codes a TokenStore keeps token types as
+KEYWORD_CODES: Dict[str, int] = {value: TOKEN_CODES[member] for value, member in KEYWORDS.items()}
+PUNCTUATOR_CODES: Dict[str, int] = {value: TOKEN_CODES[member] for value, member in PUNCTUATORS.items()}
+NUMBER_CODE = TOKEN_CODES[TokenType.NUMBER]
+STRING_CODE = TOKEN_CODES[TokenType.STRING]
+
+
+def read_chunks(file: TextIO, size: int = DEFAULT_CHUNK_SIZE) -> Iterator[str]:
+    """
+    Read a file size characters at a time
+    """
+    while chunk := file.read(size):
+        yield chunk
+
+
+class RegexScanner:
+    """
+    Scans the source code into the same tokens and errors as Scanner, matching each lexeme with a single compiled
+    pattern instead of a character at a time, and looking token types up in precomputed tables. It can also scan
+    source read in chunks, yielding the tokens as it goes.
+    """
+
+    def __init__(self, pylox, source: str = ""):
+        """
+        :param pylox: PyLox object
+        :param source: Source code to scan
+        """
+        self._pylox = pylox
+        self._source: str = source
+        self._tokens: TokenStore = TokenStore(source)
+        self._line: int = 1
+        self._comment_lines: List[int] = []  # Lines the block comments started on, while scanning one
+        self._comment_depth: int = 0  # Number of block comments open
+        self._in_line_comment: bool = False  # Whether the last chunk scanned ended in a line comment
+
+    def scan_tokens(self) -> List[Token]:
+        """
+        Scan and fill list with tokens
+        """
+        return list(self.scan_store())
+
+    def scan_store(self) -> TokenStore:
+        """
+        Scan into a TokenStore, which holds the same tokens as scan_tokens without making an object for each
+        """
+        self._scan(self._source, 0, len(self._source), True)
+        self._tokens.append(TokenType.EOF, len(self._source), 0, self._line)
+        return self._tokens
+
+    def scan_chunks(self, chunks: Iterable[str]) -> Iterator[Token]:
+        """
+        Scan source that comes in chunks, yielding tokens ending with EOF as soon as the characters after them show
+        they are complete. Only the last token of a chunk, which can go on in the next, is scanned again with it:
+        block and line comments carry on where they stopped, and the parts of a string are only joined and scanned
+        once its closing quote is read.
+        """
+        buffer = ""
+        string: List[str] = []  # Parts of a string whose closing quote hasn't been read yet
+        for chunk in chunks:
+            if string:
+                string.append(chunk)
+                if '"' not in chunk:
+                    continue
+                chunk = "".join(string)
+                string.clear()
+
+            buffer += chunk
+            self._tokens = TokenStore(buffer)
+            position = self._scan(buffer, 0, len(buffer), False)
+            buffer = buffer[position:]
+            if buffer.startswith('"'):
+                string.append(buffer)
+                buffer = ""
+            yield from self._tokens
+
+        buffer = "".join(string) + buffer
+        self._tokens = TokenStore(buffer)
+        self._scan(buffer, 0, len(buffer), True)
+        self._tokens.append(TokenType.EOF, len(buffer), 0, self._line)
+        yield from self._tokens
+
+    def _scan(self, source: str, position: int, end: int, at_end: bool) -> int:
+        """
+        Add the tokens of source from position to end, which is the end of the source if at_end. Otherwise more source
+        follows, so tokens that could go on past end are left for later. Returns where to carry on from: the start of
+        the first token left, which is either a string that isn't terminated yet or ends close to end, or end.
+        """
+        tokens = self._tokens
+        add_type, add_start = tokens.types.append, tokens.starts.append
+        add_length, add_line = tokens.lengths.append, tokens.lines.append
+        identifier = TOKEN_CODES[TokenType.IDENTIFIER]
+        # A token is complete if it ends before this: a number needs the two characters after it, as in "1.5"
+        complete = end + 1 if at_end else end - 1
+
+        if self._in_line_comment:
+            newline = source.find("\n", position, end)
+            if newline < 0:
+                self._in_line_comment = not at_end
+                return end
+            self._in_line_comment = False
+            position = newline
+        if self._comment_depth > 0:
+            position = self._skip_block_comment(source, position, end, at_end)
+            if self._comment_depth > 0:
+                return position
+
+        line = self._line
+        while position < end:
+            for match in TOKEN_PATTERN.finditer(source, position, end):
+                kind = match.lastgroup
+                text = match.group()
+
+                if kind == "SPACE":
+                    line += text.count("\n")
+                    continue
+                elif kind == "IDENTIFIER":
+                    code = KEYWORD_CODES.get(text, identifier)
+                elif kind == "PUNCTUATOR":
+                    code = PUNCTUATOR_CODES[text]
+                elif kind == "NUMBER":
+                    code = NUMBER_CODE
+                elif kind == "STRING":
+                    if len(text) > 1 and text[-1] == '"':
+                        line += text.count("\n")
+                        add_type(STRING_CODE)
+                        add_start(match.start())
+                        add_length(len(text))
+                        add_line(line)
+                    elif not at_end:
+                        # The rest of it hasn't been read yet
+                        self._line = line
+                        return match.start()
+                    else:
+                        line += text.count("\n")
+                        self._pylox.error_line(line, "[Scanner] Unterminated string")
+                    continue
+                elif kind == "LINE_COMMENT":
+                    # Skip the rest of it in the next chunk if it hasn't ended
+                    self._in_line_comment = match.end() == end and not at_end
+                    continue
+                elif kind == "BLOCK_COMMENT":
+                    # Nesting isn't regular, skip the comment by hand and carry on after it
+                    self._line = line
+                    self._comment_lines.append(line)
+                    self._comment_depth = 1
+                    position = self._skip_block_comment(source, match.end(), end, at_end)
+                    if self._comment_depth > 0:
+                        return position
+                    line = self._line
+                    break
+                else:
+                    if kind == "COMMENT_END":
+                        self._pylox.error_line(
+                            line, "[Scanner] Found terminated multi-line comment with no beginning '/*'"
+                        )
+                    elif kind == "UNEXPECTED":
+                        self._pylox.error_line(line, f"[Scanner] Unexpected character: {text}")
+                    continue
+
+                if match.end() >= complete:
+                    self._line = line
+                    return match.start()
+
+                # Straight into the store's columns, this runs for every token
+                add_type(code)
+                add_start(match.start())
+                add_length(len(text))
+                add_line(line)
+            else:
+                break
+
+        self._line = line
+        return end
+
+    def _skip_block_comment(self, source: str, position: int, end: int, at_end: bool) -> int:
+        """
+        Skip the open block comments, the ones nested in them and the rest of the source up to end if they don't
+        close before it, returning the position after them. Like Scanner, the start line of every comment opened is
+        kept and an unterminated one is reported on the line at the current depth, so on the same line as Scanner.
+        """
+        line = self._comment_lines
+        while self._comment_depth > 0:
+            text = COMMENT_TEXT_PATTERN.match(source, position, end)
+            if text is not None:
+                position = text.end()
+            if position >= end:
+                if at_end:
+                    self._report_unterminated_comment()
+                return end
+            if text is not None:
+                continue
+
+            cur = source[position]
+            if position + 1 == end and not at_end and cur in "/*":
+                # It may start "/*" or "*/" with the next chunk
+                return position
+            position += 1
+            if cur == "\n":
+                self._line += 1
+
+            if cur == "/" and source.startswith("*", position, end):
+                position += 1
+                line.append(self._line)
+                self._comment_depth += 1
+            elif cur == "*" and source.startswith("/", position, end):
+                position += 1
+                self._comment_depth -= 1
+            elif position >= end and at_end:
+                self._report_unterminated_comment()
+
+        line.clear()
+        return position
+
+    def _report_unterminated_comment(self) -> None:
+        """
+        Report the open block comments as unterminated and stop skipping them
+        """
+        line = self._comment_lines[self._comment_depth - 1]
+        self._pylox.error_line(line, "[Scanner] Unterminated multi-line comment")
+        self._comment_depth = 0
+        self._comment_lines.clear()
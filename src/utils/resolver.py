@@ -45,11 +45,12 @@ class FunctionType(Enum):
 
 
 class Resolver(Expr.Visitor, Stmt.Visitor):
-    def __init__(self, pylox, interpreter):
+    def __init__(self, pylox):
         self._pylox = pylox
-        self._interpreter = interpreter
         self._scopes = []  # stack: back [outer_scope, ..., inner_scope] front
+        self._slots = []  # stack of name: slot for each scope in _scopes
         self._current_function = FunctionType.NONE
+        self._current_declaration = None  # Function being resolved
         self._current_class = ClassType.NONE
 
     def visit_block_stmt(self, stmt: Block) -> None:
@@ -58,6 +59,7 @@ class Resolver(Expr.Visitor, Stmt.Visitor):
         self._end_scope()
 
     def visit_function_stmt(self, stmt: Function) -> None:
+        self._mark_closure()
         self._declare(stmt.name)
         self._define(stmt.name)
 
@@ -66,6 +68,7 @@ class Resolver(Expr.Visitor, Stmt.Visitor):
     def visit_class_stmt(self, stmt: Class) -> None:
         enclosing_class = self._current_class
         self._current_class = ClassType.CLASS
+        self._mark_closure()
 
         self._declare(stmt.name)
         self._define(stmt.name)
@@ -77,9 +80,11 @@ class Resolver(Expr.Visitor, Stmt.Visitor):
             self._current_class = ClassType.SUBCLASS
             self.resolve(stmt.superclass)
             self._begin_scope()
+            self._add_slot("super")
             self._peek_scope["super"] = True
 
         self._begin_scope()
+        self._add_slot("this")
         self._peek_scope["this"] = True
 
         for method in stmt.methods:
@@ -125,6 +130,10 @@ class Resolver(Expr.Visitor, Stmt.Visitor):
 
             self.resolve(stmt.value)
 
+            # The value of a returned call is returned as is, so the call can replace the current one
+            if isinstance(stmt.value, Call) and self._current_function != FunctionType.INITIALIZER:
+                stmt.tail_call = True
+
     def visit_while_stmt(self, stmt: While) -> None:
         self.resolve(stmt.condition)
         self.resolve(stmt.body)
@@ -201,6 +210,8 @@ class Resolver(Expr.Visitor, Stmt.Visitor):
 
         if name.lexeme in peek:
             self._pylox.error_token(name, "Already a variable with this name in this scope.")
+        else:
+            self._add_slot(name.lexeme)
 
         peek.update({name.lexeme: False})
 
@@ -214,15 +225,35 @@ class Resolver(Expr.Visitor, Stmt.Visitor):
 
         self._peek_scope.update({name.lexeme: True})
 
+    def _add_slot(self, name: str) -> None:
+        """
+        Give a variable the next slot in the innermost scope. Environments define variables in the same order they
+        are declared so this is also their index at runtime.
+        """
+        slots = self._slots[-1]
+        slots[name] = len(slots)
+
     def _begin_scope(self) -> None:
         self._scopes.append({})
+        self._slots.append({})
 
     def _end_scope(self) -> None:
         self._scopes.pop()
+        self._slots.pop()
+
+    def _mark_closure(self) -> None:
+        """
+        Mark the function being resolved as creating closures, which keep its environment alive after it returns
+        """
+        if self._current_declaration is not None:
+            self._current_declaration.has_closures = True
 
     def _resolve_function(self, function: Function, function_type: FunctionType) -> None:
         enclosing_function = self._current_function
+        enclosing_declaration = self._current_declaration
         self._current_function = function_type
+        self._current_declaration = function
+        function.has_closures = False
 
         self._begin_scope()
         for param in function.params:
@@ -232,11 +263,16 @@ class Resolver(Expr.Visitor, Stmt.Visitor):
         self.resolve(function.body)
         self._end_scope()
         self._current_function = enclosing_function
+        self._current_declaration = enclosing_declaration
 
-    def _resolve_local(self, expr: Expr, name: Token) -> None:
+    def _resolve_local(self, expr: Union[Assign, Super, This, Variable], name: Token) -> None:
+        """
+        Annotate expr with the scope depth and slot of the local it refers to, leave it unresolved for globals
+        """
         for i in reversed(range(len(self._scopes))):
             if name.lexeme in self._scopes[i]:
-                self._interpreter.resolve(expr, len(self._scopes) - 1 - i)
+                expr.depth = len(self._scopes) - 1 - i
+                expr.slot = self._slots[i][name.lexeme]
                 return
 
     def resolve(self, target: Union[Expr, Stmt, List[Stmt]]) -> None:
@@ -0,0 +1,122 @@
+import signal
+from collections import Counter
+from typing import Dict, Optional, Tuple
+
+from utils.lox_class import LoxClass
+from utils.lox_function import LoxFunction
+from utils.profiler import SCRIPT
+from utils.stmt import Function
+
+# Seconds of CPU time between samples
+DEFAULT_INTERVAL = 0.001
+
+
+class SamplingProfiler:
+    """
+    Statistical profiler of Lox code. While started, a timer signal interrupts the program every interval seconds of
+    CPU time and takes a snapshot of the interpreter's frames: the functions being called and the statement each one
+    is at. Nothing is done on calls, so the program runs at close to full speed, and the snapshots are only turned
+    into names and lines when the samples are reported. Classes created while started have their methods named after
+    them.
+
+    Only the tree-walking Interpreter keeps frames, and timer signals are only available on Unix.
+    """
+
+    def __init__(self, interpreter, interval: float = DEFAULT_INTERVAL):
+        self.interval = interval
+        self._interpreter = interpreter
+        self._samples: Counter = Counter()  # (frames, current statement): number of samples taken of them
+        self._names: Dict[Function, str] = {}  # Declaration: name qualified by its class, if a method
+        self._previous_handler = None
+        self._original_init = None
+
+    @staticmethod
+    def is_supported() -> bool:
+        return hasattr(signal, "setitimer")
+
+    def start(self) -> None:
+        original_init = self._original_init = LoxClass.__init__
+
+        def init(klass, name, superclass, methods):
+            original_init(klass, name, superclass, methods)
+            for method_name, method in methods.items():
+                self._names[method._declaration] = f"{name}.{method_name}"
+
+        LoxClass.__init__ = init
+        self._previous_handler = signal.signal(signal.SIGPROF, self._sample)
+        signal.setitimer(signal.ITIMER_PROF, self.interval, self.interval)
+
+    def stop(self) -> None:
+        signal.setitimer(signal.ITIMER_PROF, 0)
+        signal.signal(signal.SIGPROF, self._previous_handler)
+        LoxClass.__init__ = self._original_init
+
+    def _sample(self, signum, frame) -> None:
+        interpreter = self._interpreter
+        frames = tuple((function, statement) for function, statement in interpreter.frames)
+        self._samples[(frames, interpreter.current_statement)] += 1
+
+    @property
+    def sample_count(self) -> int:
+        return sum(self._samples.values())
+
+    def stacks(self) -> Dict[Tuple[str, ...], int]:
+        """
+        Number of samples of every stack, keyed by the 'function:line' of each frame from the bottom up
+        """
+        stacks = Counter()
+        for frames, count in self._frames().items():
+            stacks[tuple(name if line is None else f"{name}:{line}" for name, line in frames)] += count
+        return dict(stacks)
+
+    def _frames(self) -> Counter:
+        """
+        Number of samples of every stack, keyed by the (function name, line) of each frame from the bottom up
+        """
+        stacks = Counter()
+        for (frames, current), count in self._samples.items():
+            names = [SCRIPT] + [self._function_name(function) for function, _ in frames]
+            statements = [statement for _, statement in frames] + [current]
+            stacks[tuple(zip(names, [getattr(statement, "line", None) for statement in statements]))] += count
+        return stacks
+
+    def _function_name(self, function: LoxFunction) -> str:
+        declaration = function._declaration
+        return self._names.get(declaration, declaration.name.lexeme)
+
+    def report(self, limit: Optional[int] = 20) -> str:
+        """
+        Tables of the functions and lines most samples were taken in, with the share of samples in them or in their
+        callees
+        """
+        stacks = self._frames()
+        total = sum(stacks.values())
+        percent = 100 / max(total, 1)
+
+        functions_self, functions_total, lines_self = Counter(), Counter(), Counter()
+        for stack, count in stacks.items():
+            name, line = stack[-1]
+            functions_self[name] += count
+            lines_self[name if line is None else f"{name}:{line}"] += count
+            for name in {name for name, _ in stack}:
+                functions_total[name] += count
+
+        lines = [f"{total} samples every {self.interval * 1000:g} ms of CPU time"]
+        lines.append(f"{'samples':>10} {'self %':>8} {'total %':>8}  function")
+        names = sorted(functions_total, key=lambda name: (functions_self[name], functions_total[name]), reverse=True)
+        for name in names[:limit]:
+            lines.append(
+                f"{functions_self[name]:>10} {functions_self[name] * percent:>8.1f} "
+                f"{functions_total[name] * percent:>8.1f}  {name}"
+            )
+
+        lines.append(f"{'samples':>10} {'self %':>8}  line")
+        for label, count in lines_self.most_common(limit):
+            lines.append(f"{count:>10} {count * percent:>8.1f}  {label}")
+        return "\n".join(lines)
+
+    def folded(self) -> str:
+        """
+        Sample counts of every stack, in the collapsed format flame graph tools read
+        """
+        return "".join(f"{';'.join(stack)} {count}\n" for stack, count in sorted(self.stacks().items()))
@@ -48,6 +48,11 @@ class Scanner:
                 nested_lvl = 1
                 line = [self._line]
                 while nested_lvl > 0:
+                    if self._is_at_end():
+                        # The last character was part of a "/*" or "*/"
+                        self._pylox.error_line(line[nested_lvl - 1], "[Scanner] Unterminated multi-line comment")
+                        break
+
                     cur = self._advance()
                     if cur == "\n":
                         self._line += 1
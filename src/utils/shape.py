@@ -0,0 +1,26 @@
+from typing import Dict
+
+
+class Shape:
+    """
+    Layout shared by every instance of a class that had the same fields added in the same order (a "hidden class").
+    It maps field names to the slot holding their value in the instance. Adding a field moves the instance to the
+    next shape, and that transition is cached so instances built the same way end up sharing shapes. Each class has
+    its own empty shape to start from, so a shape also identifies the class of its instances.
+    """
+
+    __slots__ = ("slots", "_transitions")
+
+    def __init__(self, slots: Dict[str, int]):
+        self.slots = slots  # field name: slot in LoxInstance.values
+        self._transitions: Dict[str, "Shape"] = {}  # field name: shape after adding that field
+
+    def with_field(self, name: str) -> "Shape":
+        """
+        Get the shape of an instance of this shape once field name is added
+        """
+        shape = self._transitions.get(name)
+        if shape is None:
+            shape = Shape({**self.slots, name: len(self.slots)})
+            self._transitions[name] = shape
+        return shape
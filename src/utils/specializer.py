@@ -0,0 +1,170 @@
+from typing import Dict, List, Type, Union
+
+from utils.expr import (
+    Add,
+    And,
+    Assign,
+    Binary,
+    Call,
+    Divide,
+    Equal,
+    Expr,
+    Get,
+    Greater,
+    GreaterEqual,
+    Grouping,
+    Invoke,
+    Less,
+    LessEqual,
+    Literal,
+    Logical,
+    Multiply,
+    Negate,
+    Not,
+    NotEqual,
+    Or,
+    Set,
+    Subtract,
+    Super,
+    This,
+    Unary,
+    Variable,
+)
+from utils.stmt import (
+    Block,
+    Class,
+    Expression,
+    Function,
+    If,
+    Print,
+    Return,
+    Stmt,
+    Var,
+    While,
+)
+from utils.token_type import TokenType
+
+# Operator: specialized node type
+BINARY_SPECIALIZATIONS: Dict[TokenType, Type[Binary]] = {
+    TokenType.PLUS: Add,
+    TokenType.MINUS: Subtract,
+    TokenType.STAR: Multiply,
+    TokenType.SLASH: Divide,
+    TokenType.GREATER: Greater,
+    TokenType.GREATER_EQUAL: GreaterEqual,
+    TokenType.LESS: Less,
+    TokenType.LESS_EQUAL: LessEqual,
+    TokenType.EQUAL_EQUAL: Equal,
+    TokenType.BANG_EQUAL: NotEqual,
+}
+LOGICAL_SPECIALIZATIONS: Dict[TokenType, Type[Logical]] = {TokenType.AND: And, TokenType.OR: Or}
+UNARY_SPECIALIZATIONS: Dict[TokenType, Type[Unary]] = {TokenType.MINUS: Negate, TokenType.BANG: Not}
+
+
+class Specializer(Expr.Visitor, Stmt.Visitor):
+    """
+    Rewrites a resolved AST, replacing generic Binary, Logical and Unary nodes with the node type specialized for
+    their operator so that they can be evaluated without dispatching on the operator every time, and calls of a
+    property with Invoke so that methods can be called without binding them first. Specialized nodes
+    fall back to the generic visit function, so visitors that don't care about them see the same tree.
+    """
+
+    def specialize(self, target: Union[List[Stmt], Stmt, Expr]) -> None:
+        """
+        Rewrite statements in place
+        """
+        if isinstance(target, list):
+            for statement in target:
+                statement.accept(self)
+        else:
+            target.accept(self)
+
+    def _rewrite(self, expr: Expr) -> Expr:
+        """
+        Rewrite the children of an expression and return the expression that should replace it
+        """
+        return expr.accept(self)
+
+    def visit_block_stmt(self, stmt: Block) -> None:
+        self.specialize(stmt.statements)
+
+    def visit_class_stmt(self, stmt: Class) -> None:
+        self.specialize(stmt.methods)
+
+    def visit_expression_stmt(self, stmt: Expression) -> None:
+        stmt.expression = self._rewrite(stmt.expression)
+
+    def visit_function_stmt(self, stmt: Function) -> None:
+        self.specialize(stmt.body)
+
+    def visit_if_stmt(self, stmt: If) -> None:
+        stmt.condition = self._rewrite(stmt.condition)
+        self.specialize(stmt.then_branch)
+        if stmt.else_branch is not None:
+            self.specialize(stmt.else_branch)
+
+    def visit_print_stmt(self, stmt: Print) -> None:
+        stmt.expression = self._rewrite(stmt.expression)
+
+    def visit_return_stmt(self, stmt: Return) -> None:
+        if stmt.value is not None:
+            stmt.value = self._rewrite(stmt.value)
+
+    def visit_var_stmt(self, stmt: Var) -> None:
+        if stmt.initializer is not None:
+            stmt.initializer = self._rewrite(stmt.initializer)
+
+    def visit_while_stmt(self, stmt: While) -> None:
+        stmt.condition = self._rewrite(stmt.condition)
+        self.specialize(stmt.body)
+
+    def visit_assign_expr(self, expr: Assign) -> Expr:
+        expr.value = self._rewrite(expr.value)
+        return expr
+
+    def visit_binary_expr(self, expr: Binary) -> Expr:
+        left = self._rewrite(expr.left)
+        right = self._rewrite(expr.right)
+        return BINARY_SPECIALIZATIONS[expr.operator.token_type](left, expr.operator, right)
+
+    def visit_call_expr(self, expr: Call) -> Expr:
+        callee = self._rewrite(expr.callee)
+        arguments = [self._rewrite(argument) for argument in expr.arguments]
+        if isinstance(callee, Get):
+            return Invoke(callee, expr.paren, arguments)
+        expr.callee = callee
+        expr.arguments = arguments
+        return expr
+
+    def visit_get_expr(self, expr: Get) -> Expr:
+        expr.obj = self._rewrite(expr.obj)
+        return expr
+
+    def visit_grouping_expr(self, expr: Grouping) -> Expr:
+        expr.expression = self._rewrite(expr.expression)
+        return expr
+
+    def visit_literal_expr(self, expr: Literal) -> Expr:
+        return expr
+
+    def visit_logical_expr(self, expr: Logical) -> Expr:
+        left = self._rewrite(expr.left)
+        right = self._rewrite(expr.right)
+        return LOGICAL_SPECIALIZATIONS[expr.operator.token_type](left, expr.operator, right)
+
+    def visit_set_expr(self, expr: Set) -> Expr:
+        expr.obj = self._rewrite(expr.obj)
+        expr.value = self._rewrite(expr.value)
+        return expr
+
+    def visit_super_expr(self, expr: Super) -> Expr:
+        return expr
+
+    def visit_this_expr(self, expr: This) -> Expr:
+        return expr
+
+    def visit_unary_expr(self, expr: Unary) -> Expr:
+        return UNARY_SPECIALIZATIONS[expr.operator.token_type](expr.operator, self._rewrite(expr.right))
+
+    def visit_variable_expr(self, expr: Variable) -> Expr:
+        return expr
@@ -0,0 +1,379 @@
+from typing import Callable, Dict, Generator, List, Union
+
+from utils.completion import Completion
+from utils.environment import Environment
+from utils.expr import (
+    Assign,
+    Binary,
+    Call,
+    Expr,
+    Get,
+    Grouping,
+    Literal,
+    Logical,
+    Set,
+    Super,
+    This,
+    Unary,
+    Variable,
+)
+from utils.interpreter import Interpreter
+from utils.lox_callable import LoxCallable
+from utils.lox_class import LoxClass
+from utils.lox_function import LoxFunction
+from utils.lox_instance import LoxInstance
+from utils.runtime_error import PyLoxRuntimeError
+from utils.stmt import (
+    Block,
+    Class,
+    Expression,
+    Function,
+    If,
+    Print,
+    Return,
+    Stmt,
+    Var,
+    While,
+)
+from utils.token import Token
+from utils.token_type import TokenType
+
+# Lox call depth before reporting a stack overflow, the same as the VM's
+DEFAULT_MAX_DEPTH = 100000
+
+# Work on the stack: yields the nodes it needs run and receives their value or completion
+Task = Generator[Union[Expr, Stmt], object, object]
+
+
+class CallFinder(Expr.Visitor, Stmt.Visitor):
+    """
+    Checks if running a node can call Lox code. Bodies of declared functions and methods don't run when they are
+    declared, so they aren't looked at.
+    """
+
+    def find(self, target: Union[List[Union[Expr, Stmt]], Expr, Stmt, None]) -> bool:
+        if target is None:
+            return False
+        if isinstance(target, list):
+            return any(node.accept(self) for node in target)
+        return target.accept(self)
+
+    def visit_block_stmt(self, stmt: Block) -> bool:
+        return self.find(stmt.statements)
+
+    def visit_class_stmt(self, stmt: Class) -> bool:
+        return False  # The superclass is a variable
+
+    def visit_expression_stmt(self, stmt: Expression) -> bool:
+        return self.find(stmt.expression)
+
+    def visit_function_stmt(self, stmt: Function) -> bool:
+        return False
+
+    def visit_if_stmt(self, stmt: If) -> bool:
+        return self.find([stmt.condition, stmt.then_branch]) or self.find(stmt.else_branch)
+
+    def visit_print_stmt(self, stmt: Print) -> bool:
+        return self.find(stmt.expression)
+
+    def visit_return_stmt(self, stmt: Return) -> bool:
+        return self.find(stmt.value)
+
+    def visit_var_stmt(self, stmt: Var) -> bool:
+        return self.find(stmt.initializer)
+
+    def visit_while_stmt(self, stmt: While) -> bool:
+        return self.find([stmt.condition, stmt.body])
+
+    def visit_assign_expr(self, expr: Assign) -> bool:
+        return self.find(expr.value)
+
+    def visit_binary_expr(self, expr: Binary) -> bool:
+        return self.find([expr.left, expr.right])
+
+    def visit_call_expr(self, expr: Call) -> bool:
+        return True
+
+    def visit_get_expr(self, expr: Get) -> bool:
+        return self.find(expr.obj)
+
+    def visit_grouping_expr(self, expr: Grouping) -> bool:
+        return self.find(expr.expression)
+
+    def visit_literal_expr(self, expr: Literal) -> bool:
+        return False
+
+    def visit_logical_expr(self, expr: Logical) -> bool:
+        return self.find([expr.left, expr.right])
+
+    def visit_set_expr(self, expr: Set) -> bool:
+        return self.find([expr.obj, expr.value])
+
+    def visit_super_expr(self, expr: Super) -> bool:
+        return False
+
+    def visit_this_expr(self, expr: This) -> bool:
+        return False
+
+    def visit_unary_expr(self, expr: Unary) -> bool:
+        return self.find(expr.right)
+
+    def visit_variable_expr(self, expr: Variable) -> bool:
+        return False
+
+
+class StackInterpreter(Interpreter):
+    """
+    Executes statements without nesting Python calls for Lox calls, so that Lox recursion is only limited by memory
+    and max_depth, past which it reports a stack overflow.
+
+    Nodes that can call Lox code run as tasks: generators that yield the nodes they need run and receive the result.
+    A loop keeps the tasks waiting on each other in a list instead of on the Python stack. Calls run the body of the
+    callee as a task too. Nodes that can't call Lox code, such as a loop without calls, run on the tree-walking
+    Interpreter, whose recursion is then bounded by how deeply the source nests. The busiest tasks run such nodes
+    themselves instead of yielding them to save a round trip through the loop.
+    """
+
+    def __init__(self, max_depth: int = DEFAULT_MAX_DEPTH):
+        super().__init__()
+        self.max_depth = max_depth
+        self._depth = 0  # Number of Lox calls running
+        self._call_finder = CallFinder()
+        self._has_call: Dict[Union[Expr, Stmt], bool] = {}  # node: whether it can call Lox code
+        self._task_factories: Dict[type, Callable[[Union[Expr, Stmt]], Task]] = {}  # node type: function making task
+
+    def interpret(self, pylox, statements: List[Stmt]) -> None:
+        """
+        Executes a list of statements
+        """
+        try:
+            for statement in statements:
+                self._run(statement)
+
+        except PyLoxRuntimeError as error:
+            # Tasks that were running are dropped with the state they changed
+            self._environment = self.globals
+            self._depth = 0
+            pylox.runtime_error(error)
+
+    def _run(self, node: Union[Expr, Stmt]) -> object:
+        """
+        Run a node and every task it needs until it completes, returning its value or completion
+        """
+        if not self._can_call(node):
+            return node.accept(self)
+
+        stack = [self._task(node)]
+        value = None
+        while stack:
+            try:
+                node = stack[-1].send(value)
+            except StopIteration as stop:
+                stack.pop()
+                value = stop.value
+                continue
+
+            if self._can_call(node):
+                stack.append(self._task(node))
+                value = None
+            else:
+                value = node.accept(self)
+        return value
+
+    def _can_call(self, node: Union[Expr, Stmt]) -> bool:
+        has_call = self._has_call.get(node)
+        if has_call is None:
+            has_call = self._has_call[node] = self._call_finder.find(node)
+        return has_call
+
+    def _task(self, node: Union[Expr, Stmt]) -> Task:
+        """
+        Create the task running a node. Specialized nodes run as the node type they specialize.
+        """
+        factory = self._task_factories.get(type(node))
+        if factory is None:
+            for cls in type(node).__mro__:
+                name = f"_{cls.__name__.lower()}_task"
+                if hasattr(type(self), name):
+                    factory = self._task_factories[type(node)] = getattr(type(self), name)
+                    break
+        return factory(self, node)
+
+    def _callee_task(self, callee: object, arguments: List[object], paren: Token) -> Task:
+        """
+        Call a callee with evaluated arguments, running Lox functions and initializers as tasks
+        """
+        if not isinstance(callee, LoxCallable):
+            raise PyLoxRuntimeError(paren, "[Interpreter] Can only call functions and classes.")
+
+        if len(arguments) != callee.arity():
+            raise PyLoxRuntimeError(
+                paren, f"[Interpreter] Expected {callee.arity()} arguments but got {len(arguments)}."
+            )
+
+        if isinstance(callee, LoxFunction):
+            return (yield from self._function_task(callee, callee._closure, arguments, paren))
+
+        if isinstance(callee, LoxClass):
+            instance = LoxInstance(callee)
+            initializer = callee.find_method("init")
+            if initializer is not None:
+                closure = Environment(initializer._closure)
+                closure.define(instance)
+                yield from self._function_task(initializer, closure, arguments, paren)
+            return instance
+
+        return callee.call(self, arguments)
+
+    def _function_task(
+        self, function: LoxFunction, closure: Environment, arguments: List[object], paren: Token
+    ) -> Task:
+        """
+        Run the body of a function in a new environment of closure, the same way as LoxFunction.call
+        """
+        if self._depth == self.max_depth:
+            raise PyLoxRuntimeError(paren, "[Interpreter] Stack overflow.")
+
+        self._depth += 1
+        previous = self._environment
+
+        while True:
+            environment = Environment(closure)
+            environment._values.extend(arguments)
+            self._environment = environment
+
+            completion = None
+            for statement in function._declaration.body:
+                completion = (yield statement) if self._can_call(statement) else statement.accept(self)
+                if completion is not None:
+                    break
+
+            if completion is not Completion.TAIL_CALL:
+                break
+
+            # The tail call replaces this one instead of running on top of it
+            function, arguments = self._tail_call
+            self._tail_call = None
+            closure = function._closure
+
+        # Errors drop the task without restoring these, interpret resets them
+        self._environment = previous
+        self._depth -= 1
+
+        if function._is_initializer:
+            return closure.get_at(0, 0)
+
+        if completion is not None:
+            value = self._return_value
+            self._return_value = None  # Don't keep the value alive
+            return value
+
+    def _block_task(self, stmt: Block) -> Task:
+        previous = self._environment
+        self._environment = Environment(previous)
+
+        completion = None
+        for statement in stmt.statements:
+            completion = yield statement
+            if completion is not None:
+                break
+
+        self._environment = previous
+        return completion
+
+    def _expression_task(self, stmt: Expression) -> Task:
+        yield stmt.expression
+
+    def _if_task(self, stmt: If) -> Task:
+        if self._is_truthy((yield stmt.condition)):
+            return (yield stmt.then_branch)
+        elif stmt.else_branch is not None:
+            return (yield stmt.else_branch)
+
+    def _print_task(self, stmt: Print) -> Task:
+        value = yield stmt.expression
+        print(self._stringify(value))
+
+    def _return_task(self, stmt: Return) -> Task:
+        if not stmt.tail_call:
+            self._return_value = yield stmt.value
+            return Completion.RETURN
+
+        # Same as Interpreter.visit_return_stmt
+        expr = stmt.value
+        callee = yield expr.callee
+        arguments = []
+        for argument in expr.arguments:
+            arguments.append((yield argument))
+
+        if isinstance(callee, LoxFunction) and len(arguments) == callee.arity():
+            self._tail_call = (callee, arguments)
+            return Completion.TAIL_CALL
+
+        self._return_value = yield from self._callee_task(callee, arguments, expr.paren)
+        return Completion.RETURN
+
+    def _var_task(self, stmt: Var) -> Task:
+        value = yield stmt.initializer
+        self._define(stmt.name.lexeme, value)
+
+    def _while_task(self, stmt: While) -> Task:
+        while self._is_truthy((yield stmt.condition)):
+            completion = yield stmt.body
+            if completion is not None:
+                return completion
+
+    def _assign_task(self, expr: Assign) -> Task:
+        value = yield expr.value
+
+        if expr.depth is not None:
+            self._environment.assign_at(expr.depth, expr.slot, value)
+        else:
+            self.globals.assign(expr.name, value)
+        return value
+
+    def _binary_task(self, expr: Binary) -> Task:
+        left = (yield expr.left) if self._can_call(expr.left) else expr.left.accept(self)
+        right = (yield expr.right) if self._can_call(expr.right) else expr.right.accept(self)
+        return self._apply_binary(expr.operator, left, right)
+
+    def _call_task(self, expr: Call) -> Task:
+        callee = (yield expr.callee) if self._can_call(expr.callee) else expr.callee.accept(self)
+        arguments = []
+        for argument in expr.arguments:
+            arguments.append((yield argument) if self._can_call(argument) else argument.accept(self))
+
+        return (yield from self._callee_task(callee, arguments, expr.paren))
+
+    def _get_task(self, expr: Get) -> Task:
+        obj = yield expr.obj
+        if not isinstance(obj, LoxInstance):
+            raise PyLoxRuntimeError(expr.name, "[Interpreter] Only instances have properties.")
+        return obj.get(expr.name)
+
+    def _grouping_task(self, expr: Grouping) -> Task:
+        return (yield expr.expression)
+
+    def _logical_task(self, expr: Logical) -> Task:
+        left = yield expr.left
+
+        if expr.operator.token_type == TokenType.OR:
+            if self._is_truthy(left):
+                return left
+        else:  # AND
+            if not self._is_truthy(left):
+                return left
+
+        return (yield expr.right)
+
+    def _set_task(self, expr: Set) -> Task:
+        obj = yield expr.obj
+        if not isinstance(obj, LoxInstance):
+            raise PyLoxRuntimeError(expr.name, "[Interpreter] Only instances have fields.")
+
+        value = yield expr.value
+        obj.sett(expr.name, value)
+        return value
+
+    def _unary_task(self, expr: Unary) -> Task:
+        return self._apply_unary(expr.operator, (yield expr.right))
@@ -52,6 +52,7 @@ class Stmt(ABC):
 class Block(Stmt):
     def __init__(self, statements: List[Stmt]):
         self.statements = statements
+        self.line = None
 
     def accept(self, visitor: Expr.Visitor):
         return visitor.visit_block_stmt(self)
@@ -60,6 +61,7 @@ class Block(Stmt):
 class Expression(Stmt):
     def __init__(self, expression: Expr):
         self.expression = expression
+        self.line = None
 
     def accept(self, visitor: Expr.Visitor):
         return visitor.visit_expression_stmt(self)
@@ -70,6 +72,9 @@ class Function(Stmt):
         self.name = name
         self.params = params
         self.body = body
+        self.line = None
+        self.has_closures = True
+        self.pure = False
 
     def accept(self, visitor: Expr.Visitor):
         return visitor.visit_function_stmt(self)
@@ -80,6 +85,7 @@ class Class(Stmt):
         self.name = name
         self.superclass = superclass
         self. methods =  methods
+        self.line = None
 
     def accept(self, visitor: Expr.Visitor):
         return visitor.visit_class_stmt(self)
@@ -90,6 +96,7 @@ class If(Stmt):
         self.condition = condition
         self.then_branch = then_branch
         self.else_branch = else_branch
+        self.line = None
 
     def accept(self, visitor: Expr.Visitor):
         return visitor.visit_if_stmt(self)
@@ -98,6 +105,7 @@ class If(Stmt):
 class Print(Stmt):
     def __init__(self, expression: Expr):
         self.expression = expression
+        self.line = None
 
     def accept(self, visitor: Expr.Visitor):
         return visitor.visit_print_stmt(self)
@@ -107,6 +115,8 @@ class Return(Stmt):
     def __init__(self, keyword: Token, value: Expr):
         self.keyword = keyword
         self.value = value
+        self.line = None
+        self.tail_call = False
 
     def accept(self, visitor: Expr.Visitor):
         return visitor.visit_return_stmt(self)
@@ -116,6 +126,7 @@ class Var(Stmt):
     def __init__(self, name: Token, initializer: Expr):
         self.name = name
         self.initializer = initializer
+        self.line = None
 
     def accept(self, visitor: Expr.Visitor):
         return visitor.visit_var_stmt(self)
@@ -125,6 +136,7 @@ class While(Stmt):
     def __init__(self, condition: Expr, body: Stmt):
         self.condition = condition
         self.body = body
+        self.line = None
 
     def accept(self, visitor: Expr.Visitor):
         return visitor.visit_while_stmt(self)
@@ -6,6 +6,8 @@ class Token:
     Represents a token at a given line
     """
 
+    __slots__ = ("token_type", "lexeme", "literal", "line")
+
     def __init__(self, token_type: TokenType, lexeme: str, literal: object, line: int):
         """
         :param token_type: Type of token used
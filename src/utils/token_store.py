@@ -0,0 +1,92 @@
+import sys
+from array import array
+from typing import Iterator, List
+
+from utils.token import Token
+from utils.token_type import TokenType
+
+# Token type of each code kept in a TokenStore
+TOKEN_TYPES: List[TokenType] = list(TokenType)
+
+TOKEN_CODES = {token_type: code for code, token_type in enumerate(TOKEN_TYPES)}
+
+
+class TokenStore:
+    """
+    Keeps the tokens scanned from a source in parallel arrays of type codes, start offsets, lengths and lines rather
+    than as a Token object each. Tokens are made when they are accessed, as views of the source: lexemes are sliced
+    out of it then, and identifiers are interned so that every token naming a variable shares one string.
+    """
+
+    def __init__(self, source: str):
+        """
+        :param source: Source code the tokens are in
+        """
+        self.source: str = source
+        self.types = array("B")
+        self.starts = array("l")
+        self.lengths = array("l")
+        self.lines = array("l")
+
+    def append(self, token_type: TokenType, start: int, length: int, line: int) -> None:
+        """
+        Add a token whose lexeme is length characters of the source from start
+        """
+        self.types.append(TOKEN_CODES[token_type])
+        self.starts.append(start)
+        self.lengths.append(length)
+        self.lines.append(line)
+
+    def lexeme(self, index: int) -> str:
+        """
+        Lexeme of the token at index
+        """
+        start = self.starts[index]
+        lexeme = self.source[start : start + self.lengths[index]]
+        if TOKEN_TYPES[self.types[index]] == TokenType.IDENTIFIER:
+            return sys.intern(lexeme)
+        return lexeme
+
+    def nbytes(self) -> int:
+        """
+        Bytes taken by the arrays, not counting the source
+        """
+        return sum(len(column) * column.itemsize for column in (self.types, self.starts, self.lengths, self.lines))
+
+    def __len__(self) -> int:
+        return len(self.types)
+
+    def __getitem__(self, index: int) -> Token:
+        token_type = TOKEN_TYPES[self.types[index]]
+        lexeme = self.lexeme(index)
+        # Like Scanner, names like NUMBER scan as tokens of that type, but without a literal
+        if token_type == TokenType.NUMBER and lexeme[0].isdigit():
+            literal = float(lexeme)
+        elif token_type == TokenType.STRING and lexeme[0] == '"':
+            literal = lexeme[1:-1]
+        else:
+            literal = None
+        return Token(token_type, lexeme, literal, self.lines[index])
+
+    def __iter__(self) -> Iterator[Token]:
+        return self.tokens(0, len(self.types))
+
+    def tokens(self, start: int, stop: int) -> Iterator[Token]:
+        """
+        Tokens from index start up to stop. Same as indexing each one, without looking up the columns again for every
+        token.
+        """
+        source = self.source
+        intern = sys.intern
+        columns = (self.types[start:stop], self.starts[start:stop], self.lengths[start:stop], self.lines[start:stop])
+        for code, offset, length, line in zip(*columns):
+            token_type = TOKEN_TYPES[code]
+            lexeme = source[offset : offset + length]
+            literal = None
+            if token_type == TokenType.IDENTIFIER:
+                lexeme = intern(lexeme)
+            elif token_type == TokenType.NUMBER and lexeme[0].isdigit():
+                literal = float(lexeme)
+            elif token_type == TokenType.STRING and lexeme[0] == '"':
+                literal = lexeme[1:-1]
+            yield Token(token_type, lexeme, literal, line)
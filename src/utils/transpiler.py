@@ -0,0 +1,524 @@
+import hashlib
+import math
+from importlib.machinery import SourceFileLoader
+from pathlib import Path
+from typing import Dict, List, Optional, Set
+
+from utils.expr import (
+    Assign,
+    Binary,
+    Call,
+    Expr,
+    Get,
+    Grouping,
+    Literal,
+    Logical,
+    Set,
+    Super,
+    This,
+    Unary,
+    Variable,
+)
+from utils.interpreter import Interpreter
+from utils.lox_native import Clock
+from utils.runtime_error import PyLoxRuntimeError
+from utils.stmt import (
+    Block,
+    Class,
+    Expression,
+    Function,
+    If,
+    Print,
+    Return,
+    Stmt,
+    Var,
+    While,
+)
+from utils.token import Token
+from utils.token_type import TokenType
+
+# Bump when the generated code changes so that modules cached on disk are generated again
+TRANSPILER_VERSION = 1
+
+_HEADER = """# Generated by pylox
+from utils.lox_class import LoxClass
+from utils.lox_instance import LoxInstance
+from utils.token import Token
+from utils.token_type import TokenType
+from utils.transpiler_runtime import (
+    TranspiledFunction,
+    add_error,
+    assign_global,
+    call,
+    check_superclass,
+    fields_error,
+    get_property,
+    get_super,
+    operand_error,
+    operands_error,
+    set_box,
+    set_property,
+    stringify,
+    undefined_variable,
+)
+
+_G = globals()
+"""
+
+# Operators that only accept numbers: Python operator
+_NUMBER_OPERATORS = {
+    TokenType.MINUS: "-",
+    TokenType.SLASH: "/",
+    TokenType.STAR: "*",
+    TokenType.GREATER: ">",
+    TokenType.GREATER_EQUAL: ">=",
+    TokenType.LESS: "<",
+    TokenType.LESS_EQUAL: "<=",
+}
+
+# Operators whose result is always a bool, so it can be used as a condition as is
+_BOOL_OPERATORS = [
+    TokenType.GREATER,
+    TokenType.GREATER_EQUAL,
+    TokenType.LESS,
+    TokenType.LESS_EQUAL,
+    TokenType.EQUAL_EQUAL,
+    TokenType.BANG_EQUAL,
+]
+
+
+class FunctionState:
+    """
+    Python function being generated
+    """
+
+    def __init__(self, enclosing: Optional["FunctionState"], header: int, this: Optional[str]):
+        self.enclosing = enclosing
+        self.header = header  # Index of the line to insert nonlocal declarations at
+        self.this = this  # Name of "this" if the function is an initializer, which always returns it
+        self.nonlocals: Set[str] = set()  # Locals of enclosing functions assigned here
+        self.loop_depth = 0  # Number of whiles around the code being generated
+
+
+class Local:
+    """
+    Local variable and the Python variable it is transpiled to
+    """
+
+    def __init__(self, name: str, key: Optional[int], function: FunctionState, boxed: bool):
+        self.name = name
+        self.key = key  # Id of the node declaring the variable, the same in both passes
+        self.function = function  # Function the variable is a local of
+        self.boxed = boxed  # Stored as the only item of a list, see Transpiler
+
+
+class Transpiler(Expr.Visitor, Stmt.Visitor):
+    """
+    Translates resolved statements into the source of a Python module whose _main function runs them.
+
+    Lox globals become module globals prefixed with "v_". Lox locals become Python locals, named after the variable
+    with a unique suffix as a Python function has a single scope where Lox blocks nest. Lox functions become nested
+    Python functions, so Lox closures are Python closures, with one exception: a Lox block in a loop gets new
+    variables every time it runs while a Python function keeps the same ones. Variables declared in a loop and
+    captured by a closure are therefore stored as the only item of a list (a box), and functions take every box they
+    can see as a default argument to keep the box of the iteration that created them. Which variables are captured
+    is only known once every reference has been seen, so statements are transpiled twice.
+    """
+
+    def __init__(self, first_token: int = 0):
+        """
+        :param first_token: Number of the first token constant, so that modules run in the same namespace don't
+            overwrite each other's
+        """
+        self.token_count = first_token
+        self._captured: Set[int] = set()  # Keys of locals referenced from another function
+
+    def transpile(self, statements: List[Stmt]) -> str:
+        """
+        Generate the source of a module running statements
+        """
+        first_token = self.token_count
+        self._generate(statements)
+        self.token_count = first_token
+        return self._generate(statements)
+
+    def _generate(self, statements: List[Stmt]) -> str:
+        self._lines: List[str] = []
+        self._indent = 0
+        self._count = 0  # Used to make names unique
+        self._tokens: Dict[int, str] = {}  # id(token): name of the constant holding it
+        self._token_lines: List[str] = []
+        self._scopes: List[List[Local]] = []  # Same scopes as the Resolver's
+        self._function: Optional[FunctionState] = None
+
+        self._begin_function("_main", [], None)
+        self._statements(statements)
+        self._end_function()
+
+        return "\n".join([_HEADER] + self._token_lines + [""] + self._lines) + "\n"
+
+    def _emit(self, line: str) -> None:
+        self._lines.append("    " * self._indent + line)
+
+    def _unique(self, name: str) -> str:
+        self._count += 1
+        return f"{name}_{self._count}"
+
+    def _temp(self) -> str:
+        """
+        Name of a new temporary, for values used more than once in an expression
+        """
+        self._count += 1
+        return f"_t{self._count}"
+
+    def _token(self, token: Token) -> str:
+        """
+        Name of the module constant holding a token, used to report runtime errors
+        """
+        if id(token) not in self._tokens:
+            name = f"_k{self.token_count}"
+            self.token_count += 1
+            self._tokens[id(token)] = name
+            self._token_lines.append(
+                f"{name} = Token(TokenType.{token.token_type.name}, {token.lexeme!r}, None, {token.line})"
+            )
+        return self._tokens[id(token)]
+
+    def _statements(self, statements: List[Stmt]) -> None:
+        """
+        Generate statements as a Python suite, which can't be empty
+        """
+        start = len(self._lines)
+        for statement in statements:
+            statement.accept(self)
+        if len(self._lines) == start:
+            self._emit("pass")
+
+    def _begin_function(self, name: str, params: List[Local], this: Optional[Local], is_initializer=False) -> None:
+        """
+        Start a Python function taking this (for methods), params and every box in scope
+        """
+        arguments = [this.name] if this is not None else []
+        arguments += [param.name for param in params]
+        arguments += [f"{local.name}={local.name}" for scope in self._scopes for local in scope if local.boxed]
+        self._emit(f"def {name}({', '.join(arguments)}):")
+
+        self._indent += 1
+        self._function = FunctionState(self._function, len(self._lines), this.name if is_initializer else None)
+        for local in params + ([this] if this is not None else []):
+            local.function = self._function
+
+    def _end_function(self) -> None:
+        if self._function.this is not None:
+            self._emit(f"return {self._function.this}")
+        if self._function.nonlocals:
+            line = "    " * self._indent + f"nonlocal {', '.join(sorted(self._function.nonlocals))}"
+            self._lines.insert(self._function.header, line)
+
+        self._function = self._function.enclosing
+        self._indent -= 1
+
+    def _declare(self, name: str, key: int) -> Optional[Local]:
+        """
+        Declare a variable in the innermost scope, None for globals
+        """
+        if not self._scopes:
+            return None
+
+        boxed = key in self._captured and self._function.loop_depth > 0
+        local = Local(self._unique(name), key, self._function, boxed)
+        self._scopes[-1].append(local)
+        if boxed:
+            self._emit(f"{local.name} = [None]")  # Before the value is created, in case it captures itself
+        return local
+
+    def _define(self, name: Token, local: Optional[Local], value: str) -> None:
+        """
+        Generate the definition of a declared variable
+        """
+        if local is None:
+            self._emit(f"_G['v_{name.lexeme}'] = {value}")
+        elif local.boxed:
+            self._emit(f"{local.name}[0] = {value}")
+        else:
+            self._emit(f"{local.name} = {value}")
+
+    def _resolve(self, depth: int, slot: int) -> Local:
+        """
+        Get the local a resolved variable refers to, noting if it is captured
+        """
+        local = self._scopes[-1 - depth][slot]
+        if local.function is not self._function:
+            self._captured.add(local.key)
+        return local
+
+    def _read(self, local: Local) -> str:
+        return f"{local.name}[0]" if local.boxed else local.name
+
+    def _condition(self, expr: Expr) -> str:
+        """
+        Generate an expression checking if expr is truthy
+        """
+        code = expr.accept(self)
+        if isinstance(expr, Binary) and expr.operator.token_type in _BOOL_OPERATORS:
+            return code
+        if isinstance(expr, Unary) and expr.operator.token_type == TokenType.BANG:
+            return code
+
+        temp = self._temp()
+        return f"({temp} := {code}) is not None and {temp} is not False"
+
+    def _function_value(self, stmt: Function, this: Optional[Local] = None, is_initializer: bool = False) -> str:
+        """
+        Generate the Python function for a Lox function and return the expression creating its Lox value
+        """
+        name = self._unique("_def")
+        params = [Local(self._unique(param.lexeme), id(param), None, False) for param in stmt.params]
+        self._begin_function(name, params, this, is_initializer)
+        self._scopes.append(params)
+        self._statements(stmt.body)
+        self._scopes.pop()
+        self._end_function()
+        return f"TranspiledFunction({name}, {len(stmt.params)}, {stmt.name.lexeme!r}, {is_initializer})"
+
+    def visit_block_stmt(self, stmt: Block) -> None:
+        self._scopes.append([])
+        for statement in stmt.statements:
+            statement.accept(self)
+        self._scopes.pop()
+
+    def visit_class_stmt(self, stmt: Class) -> None:
+        local = self._declare(stmt.name.lexeme, id(stmt))
+
+        superclass = "None"
+        if stmt.superclass is not None:
+            superclass_local = self._declare_scope("super", id(stmt.superclass))
+            superclass = self._read(superclass_local)
+            value = f"check_superclass({stmt.superclass.accept(self)}, {self._token(stmt.superclass.name)})"
+            self._define(stmt.superclass.name, superclass_local, value)
+
+        methods = []
+        for method in stmt.methods:
+            self._scopes.append([])
+            this = Local(self._unique("this"), None, None, False)
+            self._scopes[-1].append(this)
+            is_initializer = method.name.lexeme == "init"
+            methods.append(f"{method.name.lexeme!r}: {self._function_value(method, this, is_initializer)}")
+            self._scopes.pop()
+
+        if stmt.superclass is not None:
+            self._scopes.pop()
+
+        self._define(stmt.name, local, f"LoxClass({stmt.name.lexeme!r}, {superclass}, {{{', '.join(methods)}}})")
+
+    def _declare_scope(self, name: str, key: int) -> Local:
+        """
+        Begin a scope holding a single variable
+        """
+        self._scopes.append([])
+        return self._declare(name, key)
+
+    def visit_expression_stmt(self, stmt: Expression) -> None:
+        self._emit(stmt.expression.accept(self))
+
+    def visit_function_stmt(self, stmt: Function) -> None:
+        local = self._declare(stmt.name.lexeme, id(stmt))
+        self._define(stmt.name, local, self._function_value(stmt))
+
+    def visit_if_stmt(self, stmt: If) -> None:
+        self._emit(f"if {self._condition(stmt.condition)}:")
+        self._indent += 1
+        self._statements([stmt.then_branch])
+        self._indent -= 1
+
+        if stmt.else_branch is not None:
+            self._emit("else:")
+            self._indent += 1
+            self._statements([stmt.else_branch])
+            self._indent -= 1
+
+    def visit_print_stmt(self, stmt: Print) -> None:
+        self._emit(f"print(stringify({stmt.expression.accept(self)}))")
+
+    def visit_return_stmt(self, stmt: Return) -> None:
+        if self._function.this is not None:
+            self._emit(f"return {self._function.this}")
+        elif stmt.value is not None:
+            self._emit(f"return {stmt.value.accept(self)}")
+        else:
+            self._emit("return None")
+
+    def visit_var_stmt(self, stmt: Var) -> None:
+        value = stmt.initializer.accept(self) if stmt.initializer is not None else "None"
+        local = self._declare(stmt.name.lexeme, id(stmt))
+        self._define(stmt.name, local, value)
+
+    def visit_while_stmt(self, stmt: While) -> None:
+        self._emit(f"while {self._condition(stmt.condition)}:")
+        self._indent += 1
+        self._function.loop_depth += 1
+        self._statements([stmt.body])
+        self._function.loop_depth -= 1
+        self._indent -= 1
+
+    def visit_assign_expr(self, expr: Assign) -> str:
+        value = expr.value.accept(self)
+        if expr.depth is None:
+            return f"assign_global(_G, 'v_{expr.name.lexeme}', {value}, {self._token(expr.name)})"
+
+        local = self._resolve(expr.depth, expr.slot)
+        if local.boxed:
+            return f"set_box({local.name}, {value})"
+        if local.function is not self._function:
+            self._function.nonlocals.add(local.name)
+        return f"({local.name} := {value})"
+
+    def visit_binary_expr(self, expr: Binary) -> str:
+        left = expr.left.accept(self)
+        right = expr.right.accept(self)
+        token_type = expr.operator.token_type
+
+        if token_type == TokenType.EQUAL_EQUAL:
+            return f"({left} == {right})"
+        if token_type == TokenType.BANG_EQUAL:
+            return f"({left} != {right})"
+
+        # Both operands are evaluated before their types are checked, as in the Interpreter
+        a, b = self._temp(), self._temp()
+        operator = self._token(expr.operator)
+        if token_type == TokenType.PLUS:
+            return (
+                f"({a} + {b} if ({a} := {left}).__class__ is ({b} := {right}).__class__ "
+                f"and ({a}.__class__ is float or {a}.__class__ is str) else add_error({operator}))"
+            )
+
+        return (
+            f"({a} {_NUMBER_OPERATORS[token_type]} {b} if ({a} := {left}).__class__ is ({b} := {right}).__class__ "
+            f"is float else operands_error({operator}))"
+        )
+
+    def visit_call_expr(self, expr: Call) -> str:
+        arguments = "".join(f", {argument.accept(self)}" for argument in expr.arguments)
+        return f"call({expr.callee.accept(self)}, {self._token(expr.paren)}{arguments})"
+
+    def visit_get_expr(self, expr: Get) -> str:
+        return f"get_property({expr.obj.accept(self)}, {self._token(expr.name)})"
+
+    def visit_grouping_expr(self, expr: Grouping) -> str:
+        return f"({expr.expression.accept(self)})"
+
+    def visit_literal_expr(self, expr: Literal) -> str:
+        if isinstance(expr.value, float) and not math.isfinite(expr.value):
+            return f"float('{expr.value}')"  # Folded constants can overflow
+        return repr(expr.value)
+
+    def visit_logical_expr(self, expr: Logical) -> str:
+        left = expr.left.accept(self)
+        right = expr.right.accept(self)
+        temp = self._temp()
+
+        if expr.operator.token_type == TokenType.OR:
+            return f"({temp} if ({temp} := {left}) is not None and {temp} is not False else {right})"
+        return f"({temp} if ({temp} := {left}) is None or {temp} is False else {right})"
+
+    def visit_set_expr(self, expr: Set) -> str:
+        # The value is only evaluated once the object is known to be an instance, as in the Interpreter
+        obj = self._temp()
+        name = self._token(expr.name)
+        return (
+            f"(set_property({obj}, {name}, {expr.value.accept(self)}) "
+            f"if ({obj} := {expr.obj.accept(self)}).__class__ is LoxInstance else fields_error({name}))"
+        )
+
+    def visit_super_expr(self, expr: Super) -> str:
+        superclass = self._read(self._resolve(expr.depth, expr.slot))
+        this = self._read(self._resolve(expr.depth - 1, 0))
+        return f"get_super({superclass}, {this}, {self._token(expr.method)})"
+
+    def visit_this_expr(self, expr: This) -> str:
+        return self._read(self._resolve(expr.depth, expr.slot))
+
+    def visit_unary_expr(self, expr: Unary) -> str:
+        right = expr.right.accept(self)
+        temp = self._temp()
+
+        if expr.operator.token_type == TokenType.MINUS:
+            operator = self._token(expr.operator)
+            return f"(-{temp} if ({temp} := {right}).__class__ is float else operand_error({operator}))"
+        return f"(({temp} := {right}) is None or {temp} is False)"
+
+    def visit_variable_expr(self, expr: Variable) -> str:
+        if expr.depth is None:
+            key = f"v_{expr.name.lexeme}"
+            return f"({key} if '{key}' in _G else undefined_variable({self._token(expr.name)}))"
+        return self._read(self._resolve(expr.depth, expr.slot))
+
+
+class PythonInterpreter(Interpreter):
+    """
+    Executes statements by transpiling them to a Python module and running it. Lox globals live in the module's
+    namespace, which is kept between runs.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.cache_dir: Optional[Path] = None  # Where to write modules, see run_cached
+        self._cache_path: Optional[Path] = None
+        self._namespace: Dict[str, object] = {"v_clock": Clock()}
+        self._token_count = 0
+
+    def transpile(self, statements: List[Stmt]) -> str:
+        """
+        Generate the Python module for statements
+        """
+        transpiler = Transpiler(self._token_count)
+        source = transpiler.transpile(statements)
+        self._token_count = transpiler.token_count
+        return source
+
+    def run_cached(self, pylox, source: str) -> bool:
+        """
+        Run the module transpiled from Lox source if it was written to cache_dir before, returns whether it was.
+        Otherwise the next call to interpret writes it there. Modules are loaded by CPython's own loader, which
+        keeps their compiled bytecode in a __pycache__ next to them.
+        """
+        if self.cache_dir is None:
+            return False
+
+        key = hashlib.sha256(f"{TRANSPILER_VERSION}\n{source}".encode()).hexdigest()[:16]
+        self._cache_path = Path(self.cache_dir) / f"lox_{key}.py"
+        if not self._cache_path.exists():
+            return False
+
+        self._run(pylox, self._load(self._cache_path))
+        return True
+
+    def interpret(self, pylox, statements: List[Stmt]) -> None:
+        """
+        Transpiles and executes a list of statements
+        """
+        source = self.transpile(statements)
+
+        if self._cache_path is not None:
+            self._cache_path.parent.mkdir(parents=True, exist_ok=True)
+            self._cache_path.write_text(source)
+            code = self._load(self._cache_path)
+            self._cache_path = None
+        else:
+            code = compile(source, "<lox>", "exec")
+
+        self._run(pylox, code)
+
+    def _load(self, path: Path):
+        """
+        Get the code of a module written to disk, compiling it only if its cached bytecode is out of date
+        """
+        return SourceFileLoader(path.stem, str(path)).get_code(path.stem)
+
+    def _run(self, pylox, code) -> None:
+        try:
+            exec(code, self._namespace)
+            self._namespace["_main"]()
+
+        except PyLoxRuntimeError as error:
+            pylox.runtime_error(error)
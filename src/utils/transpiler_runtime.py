@@ -0,0 +1,139 @@
+"""
+Objects and helpers used by the Python code the Transpiler generates. Generated code inlines the common paths and
+calls these for everything else, mostly to raise the same runtime errors as the Interpreter.
+"""
+
+from functools import partial
+from typing import Callable, Dict, List
+
+from utils.lox_callable import LoxCallable
+from utils.lox_class import LoxClass
+from utils.lox_instance import LoxInstance
+from utils.runtime_error import PyLoxRuntimeError
+from utils.token import Token
+
+
+class TranspiledFunction(LoxCallable):
+    """
+    Lox function value wrapping the Python function it was transpiled to. Methods take "this" as their first
+    parameter, binding them fills it in.
+    """
+
+    __slots__ = ("function", "parameter_count", "name", "is_initializer")
+
+    def __init__(self, function: Callable, parameter_count: int, name: str, is_initializer: bool):
+        self.function = function
+        self.parameter_count = parameter_count
+        self.name = name
+        self.is_initializer = is_initializer
+
+    def call(self, interpreter, arguments: List[object]) -> object:
+        return self.function(*arguments)
+
+    def arity(self) -> int:
+        return self.parameter_count
+
+    def bind(self, instance: LoxInstance):
+        function = partial(self.function, instance)
+        return TranspiledFunction(function, self.parameter_count, self.name, self.is_initializer)
+
+    def invoke(self, interpreter, instance: LoxInstance, arguments: List[object]) -> object:
+        """
+        Call the method bound to instance, without creating the bound method
+        """
+        return self.function(instance, *arguments)
+
+    def __str__(self) -> str:
+        return f"<fn {self.name}"
+
+
+def stringify(obj: object) -> str:
+    """
+    Same as Interpreter._stringify
+    """
+    if obj is None:
+        return "nil"
+
+    if obj.__class__ is float:
+        text = str(obj)
+        if text[-2:] == ".0":
+            text = text[:-2]
+        return text
+
+    return str(obj)
+
+
+def call(callee: object, token: Token, *arguments: object) -> object:
+    """
+    Call a Lox value, checking it can be called with that many arguments
+    """
+    if callee.__class__ is TranspiledFunction:
+        if len(arguments) == callee.parameter_count:
+            return callee.function(*arguments)
+
+    elif not isinstance(callee, LoxCallable):
+        raise PyLoxRuntimeError(token, "[Interpreter] Can only call functions and classes.")
+
+    if len(arguments) != callee.arity():
+        raise PyLoxRuntimeError(token, f"[Interpreter] Expected {callee.arity()} arguments but got {len(arguments)}.")
+
+    return callee.call(None, list(arguments))
+
+
+def get_property(obj: object, name: Token) -> object:
+    if obj.__class__ is LoxInstance:
+        return obj.get(name)
+    raise PyLoxRuntimeError(name, "[Interpreter] Only instances have properties.")
+
+
+def set_property(obj: LoxInstance, name: Token, value: object) -> object:
+    obj.sett(name, value)
+    return value
+
+
+def get_super(superclass: LoxClass, obj: LoxInstance, method: Token) -> object:
+    function = superclass.find_method(method.lexeme)
+    if function is None:
+        raise PyLoxRuntimeError(method, f"[Interpreter] Undefined property {method.lexeme}.")
+    return function.bind(obj)
+
+
+def check_superclass(superclass: object, name: Token) -> LoxClass:
+    if isinstance(superclass, LoxClass):
+        return superclass
+    raise PyLoxRuntimeError(name, "[Interpreter] Superclass must be a class")
+
+
+def assign_global(namespace: Dict[str, object], key: str, value: object, name: Token) -> object:
+    if key in namespace:
+        namespace[key] = value
+        return value
+    raise PyLoxRuntimeError(name, f"Undefined variable {name.lexeme}")
+
+
+def set_box(box: List[object], value: object) -> object:
+    """
+    Assign a variable that lives in a box, see Transpiler
+    """
+    box[0] = value
+    return value
+
+
+def undefined_variable(name: Token):
+    raise PyLoxRuntimeError(name, f"Undefined variable {name.lexeme}")
+
+
+def fields_error(name: Token):
+    raise PyLoxRuntimeError(name, "[Interpreter] Only instances have fields.")
+
+
+def operand_error(operator: Token):
+    raise PyLoxRuntimeError(operator, "[Interpreter] Operand must be a number")
+
+
+def operands_error(operator: Token):
+    raise PyLoxRuntimeError(operator, "[Interpreter] Operands must be numbers")
+
+
+def add_error(operator: Token):
+    raise PyLoxRuntimeError(operator, "[Interpreter] Operands must be two numbers or two strings")
@@ -0,0 +1,446 @@
+from typing import Dict, List
+
+from utils.bytecode_compiler import BytecodeCompiler
+from utils.chunk import OpCode
+from utils.disassembler import disassemble
+from utils.lox_callable import LoxCallable
+from utils.lox_class import LoxClass
+from utils.lox_instance import LoxInstance
+from utils.lox_native import Clock
+from utils.runtime_error import PyLoxRuntimeError
+from utils.stmt import Stmt
+from utils.token import Token
+from utils.vm_objects import Upvalue, VMBoundMethod, VMClosure, VMFunction
+
+FRAMES_MAX = 100000  # Lox call depth before reporting a stack overflow
+
+# Plain ints for the dispatch loop as looking up enum members for every instruction is slow
+OP_CONSTANT = int(OpCode.CONSTANT)
+OP_NIL = int(OpCode.NIL)
+OP_TRUE = int(OpCode.TRUE)
+OP_FALSE = int(OpCode.FALSE)
+OP_POP = int(OpCode.POP)
+OP_GET_LOCAL = int(OpCode.GET_LOCAL)
+OP_SET_LOCAL = int(OpCode.SET_LOCAL)
+OP_GET_GLOBAL = int(OpCode.GET_GLOBAL)
+OP_DEFINE_GLOBAL = int(OpCode.DEFINE_GLOBAL)
+OP_SET_GLOBAL = int(OpCode.SET_GLOBAL)
+OP_GET_UPVALUE = int(OpCode.GET_UPVALUE)
+OP_SET_UPVALUE = int(OpCode.SET_UPVALUE)
+OP_GET_PROPERTY = int(OpCode.GET_PROPERTY)
+OP_SET_PROPERTY = int(OpCode.SET_PROPERTY)
+OP_GET_SUPER = int(OpCode.GET_SUPER)
+OP_EQUAL = int(OpCode.EQUAL)
+OP_NOT_EQUAL = int(OpCode.NOT_EQUAL)
+OP_GREATER = int(OpCode.GREATER)
+OP_GREATER_EQUAL = int(OpCode.GREATER_EQUAL)
+OP_LESS = int(OpCode.LESS)
+OP_LESS_EQUAL = int(OpCode.LESS_EQUAL)
+OP_ADD = int(OpCode.ADD)
+OP_SUBTRACT = int(OpCode.SUBTRACT)
+OP_MULTIPLY = int(OpCode.MULTIPLY)
+OP_DIVIDE = int(OpCode.DIVIDE)
+OP_NOT = int(OpCode.NOT)
+OP_NEGATE = int(OpCode.NEGATE)
+OP_PRINT = int(OpCode.PRINT)
+OP_JUMP = int(OpCode.JUMP)
+OP_JUMP_IF_FALSE = int(OpCode.JUMP_IF_FALSE)
+OP_LOOP = int(OpCode.LOOP)
+OP_CALL = int(OpCode.CALL)
+OP_CLOSURE = int(OpCode.CLOSURE)
+OP_CLOSE_UPVALUE = int(OpCode.CLOSE_UPVALUE)
+OP_RETURN = int(OpCode.RETURN)
+OP_CLASS = int(OpCode.CLASS)
+OP_METHOD = int(OpCode.METHOD)
+
+
+class CallFrame:
+    """
+    Function invocation in progress
+    """
+
+    __slots__ = ("closure", "ip", "base")
+
+    def __init__(self, closure: VMClosure, base: int):
+        self.closure = closure
+        self.ip = 0  # Offset of the next instruction to execute
+        self.base = base  # Stack index of slot 0
+
+
+class VM:
+    """
+    Executes statements by compiling them to bytecode and running it in a dispatch loop with its own value stack
+    and call frames, so Lox calls don't nest Python calls
+    """
+
+    def __init__(self):
+        self.globals: Dict[str, object] = {"clock": Clock()}
+        self._stack: List[object] = []
+        self._frames: List[CallFrame] = []
+        self._open_upvalues: Dict[int, Upvalue] = {}  # stack index: upvalue still pointing into the stack
+
+    def compile(self, statements: List[Stmt]) -> VMFunction:
+        return BytecodeCompiler().compile(statements)
+
+    def disassemble(self, statements: List[Stmt]) -> str:
+        return disassemble(self.compile(statements))
+
+    def interpret(self, pylox, statements: List[Stmt]) -> None:
+        """
+        Compiles and executes a list of statements
+        """
+        script = VMClosure(self.compile(statements), [])
+
+        try:
+            self._stack.append(script)
+            self._frames.append(CallFrame(script, 0))
+            self._run(0)
+
+        except PyLoxRuntimeError as error:
+            self._stack.clear()
+            self._frames.clear()
+            self._open_upvalues.clear()
+            pylox.runtime_error(error)
+
+    def call_from_host(self, callee: LoxCallable, arguments: List[object]) -> object:
+        """
+        Call a Lox value from Python code and run it to completion
+        """
+        depth = len(self._frames)
+        self._stack.append(callee)
+        self._stack.extend(arguments)
+
+        if self._call_value(callee, len(arguments), None):
+            return self._run(depth)
+        return self._stack.pop()
+
+    def _stringify(self, obj: object) -> str:
+        if obj is None:
+            return "nil"
+
+        if isinstance(obj, float):
+            text = str(obj)
+            if text[-2:] == ".0":
+                text = text[:-2]
+
+            return text
+
+        return str(obj)
+
+    def _call_value(self, callee: object, arg_count: int, token: Token) -> bool:
+        """
+        Call callee with the arguments on top of the stack. Returns True if a new frame was pushed, otherwise the
+        result has already replaced the callee and arguments on the stack.
+        """
+        stack = self._stack
+
+        if isinstance(callee, VMBoundMethod):
+            stack[-1 - arg_count] = callee.receiver
+            callee = callee.method
+
+        elif isinstance(callee, LoxClass):
+            stack[-1 - arg_count] = LoxInstance(callee)
+            initializer = callee.find_method("init")
+            if initializer is None:
+                if arg_count != 0:
+                    raise PyLoxRuntimeError(token, f"[Interpreter] Expected 0 arguments but got {arg_count}.")
+                return False
+            callee = initializer
+
+        if isinstance(callee, VMClosure):
+            if arg_count != callee.function.arity:
+                raise PyLoxRuntimeError(
+                    token, f"[Interpreter] Expected {callee.function.arity} arguments but got {arg_count}."
+                )
+            if len(self._frames) == FRAMES_MAX:
+                raise PyLoxRuntimeError(token, "[Interpreter] Stack overflow.")
+
+            self._frames.append(CallFrame(callee, len(stack) - arg_count - 1))
+            return True
+
+        if not isinstance(callee, LoxCallable):
+            raise PyLoxRuntimeError(token, "[Interpreter] Can only call functions and classes.")
+
+        if arg_count != callee.arity():
+            raise PyLoxRuntimeError(token, f"[Interpreter] Expected {callee.arity()} arguments but got {arg_count}.")
+
+        arguments = stack[len(stack) - arg_count :]
+        del stack[len(stack) - arg_count - 1 :]
+        stack.append(callee.call(self, arguments))
+        return False
+
+    def _capture_upvalue(self, index: int) -> Upvalue:
+        """
+        Get the upvalue for a stack slot, sharing it between closures capturing the same variable
+        """
+        upvalue = self._open_upvalues.get(index)
+        if upvalue is None:
+            upvalue = Upvalue(self._stack, index)
+            self._open_upvalues[index] = upvalue
+        return upvalue
+
+    def _close_upvalues(self, last: int) -> None:
+        """
+        Close every open upvalue pointing at or above stack index last
+        """
+        for index in [index for index in self._open_upvalues if index >= last]:
+            self._open_upvalues.pop(index).close()
+
+    def _run(self, stop_depth: int) -> object:  # noqa C901
+        """
+        Execute instructions until returning from the frame that brings the call depth back to stop_depth
+        """
+        stack = self._stack
+        frames = self._frames
+        global_values = self.globals
+
+        frame = frames[-1]
+        closure = frame.closure
+        chunk = closure.function.chunk
+        code = chunk.code
+        constants = chunk.constants
+        tokens = chunk.tokens
+        ip = frame.ip
+        base = frame.base
+
+        while True:
+            op = code[ip]
+            ip += 1
+
+            # Most frequent instructions first
+            if op == OP_GET_LOCAL:
+                stack.append(stack[base + code[ip]])
+                ip += 1
+
+            elif op == OP_CONSTANT:
+                stack.append(constants[code[ip]])
+                ip += 1
+
+            elif op == OP_GET_GLOBAL:
+                name = constants[code[ip]]
+                if name not in global_values:
+                    raise PyLoxRuntimeError(tokens[ip], f"Undefined variable {name}")
+                stack.append(global_values[name])
+                ip += 1
+
+            elif op == OP_JUMP_IF_FALSE:
+                value = stack[-1]
+                if value is None or value is False:
+                    ip += code[ip]
+                ip += 1
+
+            elif op == OP_POP:
+                stack.pop()
+
+            elif op == OP_CALL:
+                arg_count = code[ip]
+                ip += 1
+                frame.ip = ip
+                callee = stack[-1 - arg_count]
+
+                # Fast path for plain function calls, everything else goes through _call_value
+                if callee.__class__ is VMClosure and arg_count == callee.function.arity and len(frames) < FRAMES_MAX:
+                    frame = CallFrame(callee, len(stack) - arg_count - 1)
+                    frames.append(frame)
+                elif not self._call_value(callee, arg_count, tokens[ip - 1]):
+                    continue
+                else:
+                    frame = frames[-1]
+
+                closure = frame.closure
+                chunk = closure.function.chunk
+                code = chunk.code
+                constants = chunk.constants
+                tokens = chunk.tokens
+                ip = 0
+                base = frame.base
+
+            elif op == OP_LESS:
+                b = stack.pop()
+                a = stack[-1]
+                if a.__class__ is not float or b.__class__ is not float:
+                    raise PyLoxRuntimeError(tokens[ip - 1], "[Interpreter] Operands must be numbers")
+                stack[-1] = a < b
+
+            elif op == OP_ADD:
+                b = stack.pop()
+                a = stack[-1]
+                if (a.__class__ is float and b.__class__ is float) or (a.__class__ is str and b.__class__ is str):
+                    stack[-1] = a + b
+                else:
+                    raise PyLoxRuntimeError(tokens[ip - 1], "[Interpreter] Operands must be two numbers or two strings")
+
+            elif op == OP_SUBTRACT:
+                b = stack.pop()
+                a = stack[-1]
+                if a.__class__ is not float or b.__class__ is not float:
+                    raise PyLoxRuntimeError(tokens[ip - 1], "[Interpreter] Operands must be numbers")
+                stack[-1] = a - b
+
+            elif op == OP_RETURN:
+                result = stack.pop()
+                if self._open_upvalues:
+                    self._close_upvalues(base)
+                frames.pop()
+                del stack[base:]
+
+                if len(frames) == stop_depth:
+                    return result
+
+                stack.append(result)
+                frame = frames[-1]
+                closure = frame.closure
+                chunk = closure.function.chunk
+                code = chunk.code
+                constants = chunk.constants
+                tokens = chunk.tokens
+                ip = frame.ip
+                base = frame.base
+
+            elif op == OP_MULTIPLY:
+                b = stack.pop()
+                a = stack[-1]
+                if a.__class__ is not float or b.__class__ is not float:
+                    raise PyLoxRuntimeError(tokens[ip - 1], "[Interpreter] Operands must be numbers")
+                stack[-1] = a * b
+
+            elif op == OP_DIVIDE:
+                b = stack.pop()
+                a = stack[-1]
+                if a.__class__ is not float or b.__class__ is not float:
+                    raise PyLoxRuntimeError(tokens[ip - 1], "[Interpreter] Operands must be numbers")
+                stack[-1] = a / b
+
+            elif op == OP_LESS_EQUAL:
+                b = stack.pop()
+                a = stack[-1]
+                if a.__class__ is not float or b.__class__ is not float:
+                    raise PyLoxRuntimeError(tokens[ip - 1], "[Interpreter] Operands must be numbers")
+                stack[-1] = a <= b
+
+            elif op == OP_GREATER:
+                b = stack.pop()
+                a = stack[-1]
+                if a.__class__ is not float or b.__class__ is not float:
+                    raise PyLoxRuntimeError(tokens[ip - 1], "[Interpreter] Operands must be numbers")
+                stack[-1] = a > b
+
+            elif op == OP_GREATER_EQUAL:
+                b = stack.pop()
+                a = stack[-1]
+                if a.__class__ is not float or b.__class__ is not float:
+                    raise PyLoxRuntimeError(tokens[ip - 1], "[Interpreter] Operands must be numbers")
+                stack[-1] = a >= b
+
+            elif op == OP_SET_LOCAL:
+                stack[base + code[ip]] = stack[-1]
+                ip += 1
+
+            elif op == OP_GET_UPVALUE:
+                upvalue = closure.upvalues[code[ip]]
+                stack.append(upvalue.cells[upvalue.index])
+                ip += 1
+
+            elif op == OP_SET_UPVALUE:
+                upvalue = closure.upvalues[code[ip]]
+                upvalue.cells[upvalue.index] = stack[-1]
+                ip += 1
+
+            elif op == OP_JUMP:
+                ip += code[ip] + 1
+
+            elif op == OP_LOOP:
+                ip -= code[ip] - 1
+
+            elif op == OP_NIL:
+                stack.append(None)
+
+            elif op == OP_TRUE:
+                stack.append(True)
+
+            elif op == OP_FALSE:
+                stack.append(False)
+
+            elif op == OP_EQUAL:
+                b = stack.pop()
+                stack[-1] = stack[-1] == b
+
+            elif op == OP_NOT_EQUAL:
+                b = stack.pop()
+                stack[-1] = not stack[-1] == b
+
+            elif op == OP_NOT:
+                value = stack[-1]
+                stack[-1] = value is None or value is False
+
+            elif op == OP_NEGATE:
+                value = stack[-1]
+                if value.__class__ is not float:
+                    raise PyLoxRuntimeError(tokens[ip - 1], "[Interpreter] Operand must be a number")
+                stack[-1] = -value
+
+            elif op == OP_PRINT:
+                print(self._stringify(stack.pop()))
+
+            elif op == OP_SET_GLOBAL:
+                name = constants[code[ip]]
+                ip += 1
+                if name not in global_values:
+                    raise PyLoxRuntimeError(tokens[ip - 1], f"Undefined variable {name}")
+                global_values[name] = stack[-1]
+
+            elif op == OP_DEFINE_GLOBAL:
+                global_values[constants[code[ip]]] = stack.pop()
+                ip += 1
+
+            elif op == OP_GET_PROPERTY:
+                obj = stack[-1]
+                if not isinstance(obj, LoxInstance):
+                    raise PyLoxRuntimeError(tokens[ip], "[Interpreter] Only instances have properties.")
+                stack[-1] = obj.get(tokens[ip])
+                ip += 1
+
+            elif op == OP_SET_PROPERTY:
+                value = stack.pop()
+                obj = stack[-1]
+                if not isinstance(obj, LoxInstance):
+                    raise PyLoxRuntimeError(tokens[ip], "[Interpreter] Only instances have fields.")
+                obj.sett(tokens[ip], value)
+                stack[-1] = value
+                ip += 1
+
+            elif op == OP_GET_SUPER:
+                superclass = stack.pop()
+                method = superclass.find_method(constants[code[ip]])
+                if method is None:
+                    raise PyLoxRuntimeError(tokens[ip], f"[Interpreter] Undefined property {constants[code[ip]]}.")
+                stack[-1] = method.bind(stack[-1])
+                ip += 1
+
+            elif op == OP_CLOSURE:
+                function = constants[code[ip]]
+                ip += 1
+                upvalues = []
+                for _ in range(function.upvalue_count):
+                    if code[ip]:
+                        upvalues.append(self._capture_upvalue(base + code[ip + 1]))
+                    else:
+                        upvalues.append(closure.upvalues[code[ip + 1]])
+                    ip += 2
+                stack.append(VMClosure(function, upvalues))
+
+            elif op == OP_CLOSE_UPVALUE:
+                self._close_upvalues(len(stack) - 1)
+                stack.pop()
+
+            elif op == OP_CLASS:
+                superclass = stack[-1]
+                if superclass is not None and not isinstance(superclass, LoxClass):
+                    raise PyLoxRuntimeError(tokens[ip], "[Interpreter] Superclass must be a class")
+                stack[-1] = LoxClass(constants[code[ip]], superclass, {})
+                ip += 1
+
+            elif op == OP_METHOD:
+                method = stack.pop()
+                stack[-1].methods[constants[code[ip]]] = method
+                ip += 1
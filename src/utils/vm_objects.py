@@ -0,0 +1,83 @@
+from typing import List
+
+from utils.chunk import Chunk
+from utils.lox_callable import LoxCallable
+
+
+class VMFunction:
+    """
+    Compiled function: its bytecode and what the VM needs to call it
+    """
+
+    def __init__(self, name: str, arity: int):
+        """
+        :param name: Function name, None for the top-level script
+        :param arity: Number of parameters
+        """
+        self.name = name
+        self.arity = arity
+        self.upvalue_count = 0
+        self.chunk = Chunk()
+
+    def __str__(self) -> str:
+        if self.name is None:
+            return "<script>"
+        return f"<fn {self.name}"
+
+
+class Upvalue:
+    """
+    Variable captured by a closure. While the variable is still on the VM stack the upvalue reads and writes it
+    there, once it goes out of scope it is closed over and moved into the upvalue itself.
+    """
+
+    __slots__ = ("cells", "index")
+
+    def __init__(self, stack: List[object], index: int):
+        self.cells = stack
+        self.index = index
+
+    def close(self) -> None:
+        self.cells = [self.cells[self.index]]
+        self.index = 0
+
+
+class VMClosure(LoxCallable):
+    """
+    Runtime function value: a compiled function with the variables it captured
+    """
+
+    def __init__(self, function: VMFunction, upvalues: List[Upvalue]):
+        self.function = function
+        self.upvalues = upvalues
+
+    def call(self, interpreter, arguments: List[object]) -> object:
+        return interpreter.call_from_host(self, arguments)
+
+    def arity(self) -> int:
+        return self.function.arity
+
+    def bind(self, instance):
+        return VMBoundMethod(instance, self)
+
+    def __str__(self) -> str:
+        return str(self.function)
+
+
+class VMBoundMethod(LoxCallable):
+    """
+    Method closure together with the instance that "this" refers to
+    """
+
+    def __init__(self, receiver, method: VMClosure):
+        self.receiver = receiver
+        self.method = method
+
+    def call(self, interpreter, arguments: List[object]) -> object:
+        return interpreter.call_from_host(self, arguments)
+
+    def arity(self) -> int:
+        return self.method.function.arity
+
+    def __str__(self) -> str:
+        return str(self.method)